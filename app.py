@@ -1,8 +1,18 @@
 # app.py - VERSÃO ORIGINAL FUNCIONAL
 import streamlit as st
-import os
-import json
 import streamlit.components.v1 as components
+from restaurante import catalogo, cozinha, imagens, metricas, perfil, previsao
+from restaurante.busca import obter_busca
+from restaurante.carrinho import Carrinho
+from restaurante.disponibilidade import obter_disponibilidade
+from restaurante.envio import FINAIS, obter_envio
+from restaurante.indice import obter_indice
+from restaurante.producao import LIMITE_ULTIMAS, obter_producao
+
+# Perfil desta execução (só quando ligado pelo admin ou por BURGER_PERFIL)
+perfil.iniciar("app.py")
+previsao.iniciar_periodico()  # só com BURGER_PREVISAO; uma thread por processo
+cozinha.iniciar()  # só com BURGER_COZINHA; agendador da fila da cozinha (só o processo líder agenda)
 
 # =============== CONFIGURAÇÃO INICIAL ===============
 st.set_page_config(page_title="Burger Express", layout="centered")
@@ -18,41 +28,25 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# =============== CATÁLOGO VÁLIDO ===============
+# Catálogo ausente, ou corrompido e sem versão boa para servir: erro claro em vez de cardápio vazio
+try:
+    catalogo.verificar()
+except catalogo.CatalogoInvalido as erro:
+    st.error(f"❌ Cardápio indisponível: {erro}")
+    perfil.concluir()
+    st.stop()
+
 # =============== CARREGA PRATOS ===============
 def carregar_pratos():
-    if os.path.exists("pratos.json"):
-        try:
-            with open("pratos.json", "r", encoding="utf-8") as f:
-                return json.load(f)
-        except:
-            return []
-    else:
-        pratos_padrao = [
-            {"nome": "Burger Classic", "preco": 18.90, "cat": "hamburgers", "img": "burger-classic.jpg"},
-            {"nome": "Burger Bacon", "preco": 22.90, "cat": "hamburgers", "img": "burger-bacon.jpg"},
-            {"nome": "Double Cheese", "preco": 26.90, "cat": "hamburgers", "img": "cheese-duplo.jpg"},
-            {"nome": "Refrigerante", "preco": 8.90, "cat": "bebidas", "img": "refri.jpg"},
-            {"nome": "Suco Natural", "preco": 12.90, "cat": "bebidas", "img": "suco.jpg"},
-            {"nome": "Batata Frita", "preco": 12.90, "cat": "acompanhamentos", "img": "batata-frita.jpg"},
-            {"nome": "Onion Rings", "preco": 15.90, "cat": "acompanhamentos", "img": "onion-rings.jpg"},
-            {"nome": "Milk Shake", "preco": 16.90, "cat": "sobremesas", "img": "milkshake.jpg"},
-            {"nome": "Brownie", "preco": 14.90, "cat": "sobremesas", "img": "brownie.jpg"},
-        ]
-        with open("pratos.json", "w", encoding="utf-8") as f:
-            json.dump(pratos_padrao, f, ensure_ascii=False, indent=2)
-        return pratos_padrao
+    # Leitura via cache do processo: só relê os dados quando eles mudam
+    return catalogo.carregar_pratos()
 
 pratos = carregar_pratos()
 
 # =============== FUNÇÕES DE ESTOQUE ===============
 def carregar_estoque():
-    if os.path.exists("estoque.json"):
-        try:
-            with open("estoque.json", "r", encoding="utf-8") as f:
-                return json.load(f)
-        except:
-            return {}
-    return {}
+    return catalogo.carregar_estoque()
 
 def produto_disponivel(nome_prato):
     estoque = carregar_estoque()
@@ -63,28 +57,19 @@ def produto_disponivel(nome_prato):
 
 # =============== FUNÇÕES DE INGREDIENTES ===============
 def carregar_ingredientes():
-    if os.path.exists("ingredientes.json"):
-        try:
-            with open("ingredientes.json", "r", encoding="utf-8") as f:
-                return json.load(f)
-        except:
-            return []
-    return []
+    return catalogo.carregar_ingredientes()
 
+@metricas.medido("app.disponibilidade")
 def verificar_disponibilidade_prato(prato):
     """Verifica se o prato pode ser feito com os ingredientes disponíveis"""
-    ingredientes = carregar_ingredientes()
-    
-    for ing_prato in prato.get('ingredientes', []):
-        ingrediente = next((i for i in ingredientes if i['nome'] == ing_prato['nome']), None)
-        if not ingrediente or ingrediente['estoque'] < ing_prato['quantidade']:
-            return False, ing_prato['nome']
+    faltantes = obter_disponibilidade().faltantes(prato['nome'])
+    if faltantes:
+        return False, faltantes[0]
     return True, None
 
 def produto_disponivel(nome_prato):
     """Verifica se um prato está disponível"""
-    pratos = carregar_pratos()
-    prato = next((p for p in pratos if p["nome"] == nome_prato), None)
+    prato = obter_indice().prato(nome_prato)
     if prato:
         disponivel, _ = verificar_disponibilidade_prato(prato)
         return disponivel
@@ -122,48 +107,135 @@ st.markdown('<link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs
 
 # =============== GESTÃO DE ESTADO SIMPLIFICADA ===============
 if "carrinho" not in st.session_state: 
-    st.session_state.carrinho = {}
+    st.session_state.carrinho = Carrinho()
 if "categoria_atual" not in st.session_state: 
     st.session_state.categoria_atual = "hamburgers"
+if "pagina_menu" not in st.session_state:
+    st.session_state.pagina_menu = {}  # categoria -> página atual (o carrinho não depende dela)
+if "pedidos_enviados" not in st.session_state:
+    st.session_state.pedidos_enviados = {}  # código -> última situação mostrada
+
+# Cards montados por rerun: só a página visível (widgets e imagens) é construída
+PRATOS_POR_PAGINA = 12
+ATUALIZAR_PEDIDOS = 2  # segundos entre consultas da situação dos pedidos em andamento
 
 # Função para adicionar/remover itens do carrinho
+# (o subtotal do carrinho é ajustado só pela diferença do item alterado)
+@perfil.callback("app.py")
 def atualizar_item_carrinho(nome_prato, quantidade):
-    if quantidade > 0:
-        st.session_state.carrinho[nome_prato] = quantidade
-    else:
-        if nome_prato in st.session_state.carrinho:
-            del st.session_state.carrinho[nome_prato]
+    st.session_state.carrinho.definir(nome_prato, quantidade, obter_indice().preco(nome_prato))
 
+@perfil.callback("app.py")
 def limpar_carrinho():
-    st.session_state.carrinho = {}
+    st.session_state.carrinho.limpar()
+
+@perfil.callback("app.py")
+def selecionar_categoria(categoria):
+    st.session_state.categoria_atual = categoria
+    st.session_state.busca = ""  # escolher uma categoria sai da busca
+
+@perfil.callback("app.py")
+def nova_busca():
+    st.session_state.pagina_menu["busca"] = 0
+
+@perfil.callback("app.py")
+def mudar_pagina(categoria, pagina):
+    st.session_state.pagina_menu[categoria] = pagina
+
+@perfil.callback("app.py")
+def confirmar_pedido():
+    # Só registra o pedido: baixa de estoque e comanda rodam no pool de envio (sem esperar o disco)
+    codigo = obter_envio().enviar(st.session_state.carrinho)
+    if codigo is None:
+        st.session_state.aviso_pedido = "⏳ Muitos pedidos neste momento. Seu carrinho foi mantido: tente de novo em alguns segundos."
+        return
+    st.session_state.pedidos_enviados[codigo] = "enviando"
+    limpar_carrinho()
+
+# =============== SITUAÇÃO DOS PEDIDOS ===============
+def encerrar_pedidos(indice):
+    """Tira do acompanhamento os pedidos concluídos; recusados voltam para o carrinho"""
+    envio = obter_envio()
+    encerrados = []
+    for codigo, anterior in list(st.session_state.pedidos_enviados.items()):
+        situacao = envio.situacao(codigo)
+        if situacao is not None and situacao[0] not in FINAIS:
+            continue
+        del st.session_state.pedidos_enviados[codigo]
+        if situacao is None:  # processo reiniciado: o pedido não é mais conhecido aqui
+            continue
+        estado, pedido = situacao
+        # Só volta ao carrinho o que não ficou baixado do estoque (senão a nova tentativa baixaria de novo)
+        if estado in ("recusado", "erro") and not pedido.baixado:
+            carrinho = st.session_state.carrinho
+            for nome, quantidade in pedido.itens.items():
+                carrinho.definir(nome, carrinho.get(nome, 0) + quantidade, indice.preco(nome))
+        encerrados.append((codigo, estado, pedido, anterior))
+    return encerrados
+
+def mostrar_pedido(codigo, estado, pedido, anterior):
+    if estado == "enviando":
+        st.info(f"⏳ Pedido {codigo} enviado: conferindo o estoque...")
+    elif estado == "recusado":
+        resultado = pedido.resultado
+        st.error(f"❌ Pedido {codigo}: estoque insuficiente para: {', '.join(resultado.recusados)}"
+                 + (f" (falta {', '.join(resultado.faltantes)})" if resultado.faltantes else "")
+                 + ". Os itens voltaram para o carrinho.")
+    elif estado == "erro" and pedido.baixado:
+        st.error(f"❌ O pedido {codigo} não chegou à cozinha e o estoque já foi baixado. "
+                 "Fale com o atendimento antes de pedir de novo.")
+    elif estado == "erro":
+        st.error(f"❌ Não foi possível registrar o pedido {codigo}. Os itens voltaram para o carrinho: tente de novo.")
+    else:
+        if anterior == "enviando":
+            st.balloons()
+        numero = f"#{pedido.resultado.comanda}" if pedido.resultado.comanda else codigo
+        rotulo = cozinha.ESTADOS.get(estado, "🎉 Enviado para a cozinha")
+        st.success(f"Pedido {numero}: {rotulo}" + ("" if estado == "saiu" else " • Tempo de entrega: 30-40 minutos"))
+
+# Só roda enquanto há pedido em andamento; ao concluir um, o app inteiro re-executa
+# (encerrar_pedidos devolve recusados ao carrinho e o fragmento deixa de ser chamado)
+@st.fragment(run_every=ATUALIZAR_PEDIDOS)
+def acompanhar_pedidos():
+    envio = obter_envio()
+    for codigo, anterior in list(st.session_state.pedidos_enviados.items()):
+        situacao = envio.situacao(codigo)
+        if situacao is None or situacao[0] in FINAIS:
+            st.rerun(scope="app")
+        estado, pedido = situacao
+        mostrar_pedido(codigo, estado, pedido, anterior)
+        st.session_state.pedidos_enviados[codigo] = estado
 
 # =============== HEADER COM CARRINHO CLICÁVEL ===============
-st.markdown(f"""
-<header class="header">
-    <div style="max-width:1200px;margin:0 auto;padding:0 20px;display:flex;justify-content:space-between;align-items:center;height:100%;">
-        <div style="color:#2e2e2e;font-size:1.9rem;font-weight:700;">Burger Express</div>
-        <nav>
-            <a href="#inicio" style="color:#2e2e2e;text-decoration:none;margin:0 20px;font-weight:600;">Início</a>
-            <a href="#menu" style="color:#2e2e2e;text-decoration:none;margin:0 20px;font-weight:600;">Menu</a>
-            <a href="#sobre" style="color:#2e2e2e;text-decoration:none;margin:0 20px;font-weight:600;">Sobre</a>
-        </nav>
-        <div style="display:flex;gap:20px;align-items:center;">
-            <a href="/admin" target="_self" class="admin-btn">
-                <i class="fas fa-lock"></i> Admin
-            </a>
-            <a href="#carrinho" style="text-decoration:none;position:relative;cursor:pointer;">
-                <i class="fas fa-shopping-cart" style="font-size:1.8rem;color:#2e2e2e;"></i>
-                <span style="position:absolute;top:-10px;right:-10px;background:#EA1D2C;color:white;width:24px;height:24px;border-radius:50%;font-size:0.8rem;display:flex;align-items:center;justify-content:center;">
-                    {sum(st.session_state.carrinho.values())}
-                </span>
-            </a>
+@metricas.medido("app.header")
+def renderizar_header():
+    st.markdown(f"""
+    <header class="header">
+        <div style="max-width:1200px;margin:0 auto;padding:0 20px;display:flex;justify-content:space-between;align-items:center;height:100%;">
+            <div style="color:#2e2e2e;font-size:1.9rem;font-weight:700;">Burger Express</div>
+            <nav>
+                <a href="#inicio" style="color:#2e2e2e;text-decoration:none;margin:0 20px;font-weight:600;">Início</a>
+                <a href="#menu" style="color:#2e2e2e;text-decoration:none;margin:0 20px;font-weight:600;">Menu</a>
+                <a href="#sobre" style="color:#2e2e2e;text-decoration:none;margin:0 20px;font-weight:600;">Sobre</a>
+            </nav>
+            <div style="display:flex;gap:20px;align-items:center;">
+                <a href="/admin" target="_self" class="admin-btn">
+                    <i class="fas fa-lock"></i> Admin
+                </a>
+                <a href="#carrinho" style="text-decoration:none;position:relative;cursor:pointer;">
+                    <i class="fas fa-shopping-cart" style="font-size:1.8rem;color:#2e2e2e;"></i>
+                    <span style="position:absolute;top:-10px;right:-10px;background:#EA1D2C;color:white;width:24px;height:24px;border-radius:50%;font-size:0.8rem;display:flex;align-items:center;justify-content:center;">
+                        {sum(st.session_state.carrinho.values())}
+                    </span>
+                </a>
+            </div>
         </div>
-    </div>
-</header>
-""", unsafe_allow_html=True)
+    </header>
+    """, unsafe_allow_html=True)
 
 # =============== HERO ===============
-st.markdown("""
+with metricas.span("app.hero"):
+    st.markdown("""
 <section id="inicio" class="hero full-width-section">
     <div style="max-width:800px;margin:0 auto;">
         <h2>Os Melhores Hambúrgueres da Cidade!</h2>
@@ -180,133 +252,186 @@ st.markdown("""
         <h2 class="section-title">Nosso Menu</h2>
 """, unsafe_allow_html=True)
 
-# Botões de categoria
-cols = st.columns(4)
-categorias = [
-    ("hamburgers", "🍔 Hambúrgueres"), 
-    ("bebidas", "🥤 Bebidas"), 
-    ("acompanhamentos", "🍟 Acomp."), 
-    ("sobremesas", "🍰 Sobremesas")
-]
-
-for i, (key, nome) in enumerate(categorias):
-    with cols[i]:
-        if st.button(nome, use_container_width=True, 
-                     type="primary" if st.session_state.categoria_atual == key else "secondary",
-                     key=f"cat_{key}"):
-            st.session_state.categoria_atual = key
-            st.rerun()
-
-st.markdown('<div class="products-grid">', unsafe_allow_html=True)
-
-# No loop que mostra os produtos, substitua por:
-for prato in [p for p in pratos if p["cat"] == st.session_state.categoria_atual]:
-    disponivel, ingrediente_faltante = verificar_disponibilidade_prato(prato)
-    
-    with st.container():
-        # Card do produto
-        if not disponivel:
-            st.markdown('<div class="product-card" style="opacity:0.6;position:relative;">', unsafe_allow_html=True)
-            st.markdown(f'<div style="position:absolute;top:10px;right:10px;background:#EA1D2C;color:white;padding:4px 8px;border-radius:4px;font-size:0.8rem;z-index:10;">SEM {ingrediente_faltante.upper()}</div>', unsafe_allow_html=True)
+# =============== MENU + CARRINHO (FRAGMENTO) ===============
+# Cliques em ➕/➖, categorias e carrinho re-executam só este fragmento: CSS, hero,
+# "Sobre" (com o iframe do mapa) e rodapé não são reenviados. O header é fixo no topo,
+# então fica dentro do fragmento para o contador do carrinho acompanhar.
+@st.fragment
+@perfil.fragmento("app.py (menu)")
+@metricas.medido("app.menu")
+def secao_menu():
+    # Em reruns do fragmento o topo do script não roda: o índice é obtido aqui
+    indice = obter_indice()
+    producao = obter_producao()
+    encerrados = encerrar_pedidos(indice)  # antes do header: recusados voltam ao contador do carrinho
+    renderizar_header()
+
+    # Busca por nome, categoria ou ingrediente (sem acentos, por prefixo: "pao" acha "Pão")
+    st.text_input("🔍 Buscar no cardápio", key="busca", placeholder="Ex.: bacon, queijo, batata",
+                  on_change=nova_busca)
+    busca = st.session_state.busca.strip()
+
+    # Botões de categoria
+    cols = st.columns(4)
+    categorias = [
+        ("hamburgers", "🍔 Hambúrgueres"), 
+        ("bebidas", "🥤 Bebidas"), 
+        ("acompanhamentos", "🍟 Acomp."), 
+        ("sobremesas", "🍰 Sobremesas")
+    ]
+
+    for i, (key, nome) in enumerate(categorias):
+        with cols[i]:
+            st.button(nome, use_container_width=True, 
+                      type="primary" if st.session_state.categoria_atual == key and not busca else "secondary",
+                      key=f"cat_{key}", on_click=selecionar_categoria, args=(key,))
+
+    st.markdown('<div class="products-grid">', unsafe_allow_html=True)
+
+    # Só a página atual da categoria (fatia do índice categoria -> pratos) ou da busca
+    if busca:
+        categoria = "busca"
+        with metricas.span("app.busca"):
+            pratos_categoria = obter_busca().buscar(busca)
+        if pratos_categoria:
+            st.caption(f"{len(pratos_categoria)} resultado(s) para \"{busca}\"")
         else:
-            st.markdown('<div class="product-card">', unsafe_allow_html=True)
+            st.info(f"Nenhum prato encontrado para \"{busca}\".")
+    else:
+        categoria = st.session_state.categoria_atual
+        pratos_categoria = indice.pratos_da_categoria(categoria)
+    total_paginas = max(1, -(-len(pratos_categoria) // PRATOS_POR_PAGINA))
+    pagina = min(st.session_state.pagina_menu.get(categoria, 0), total_paginas - 1)
+    inicio = pagina * PRATOS_POR_PAGINA
+
+    for prato in pratos_categoria[inicio:inicio + PRATOS_POR_PAGINA]:
+        disponivel, ingrediente_faltante = verificar_disponibilidade_prato(prato)
+        # Porções que o estoque atual ainda permite (None: prato sem receita)
+        porcoes = producao.porcoes_do_prato(prato["nome"])
+    
+        with st.container(), metricas.span("app.card"):
+            # Card do produto
+            if not disponivel:
+                st.markdown('<div class="product-card" style="opacity:0.6;position:relative;">', unsafe_allow_html=True)
+                st.markdown(f'<div style="position:absolute;top:10px;right:10px;background:#EA1D2C;color:white;padding:4px 8px;border-radius:4px;font-size:0.8rem;z-index:10;">SEM {ingrediente_faltante.upper()}</div>', unsafe_allow_html=True)
+            elif porcoes is not None and porcoes <= LIMITE_ULTIMAS:
+                st.markdown('<div class="product-card" style="position:relative;">', unsafe_allow_html=True)
+                st.markdown(f'<div style="position:absolute;top:10px;right:10px;background:#FF9800;color:white;padding:4px 8px;border-radius:4px;font-size:0.8rem;z-index:10;">{"ÚLTIMA UNIDADE" if porcoes == 1 else f"ÚLTIMAS {porcoes} UNIDADES"}</div>', unsafe_allow_html=True)
+            else:
+                st.markdown('<div class="product-card">', unsafe_allow_html=True)
         
-        # Imagem
-        caminho_imagem = os.path.join("images", prato["img"])
-        if os.path.exists(caminho_imagem):
-            st.image(caminho_imagem, use_container_width=True)
-        else:
-            st.image("https://via.placeholder.com/400x240/EA1D2C/white?text=Imagem+Indisponível", 
-                    use_container_width=True)
+            # Imagem (miniatura em cache; a original só se não der para gerar)
+            imagem = imagens.miniatura(prato["img"])
+            if imagem is not None:
+                st.image(imagem, use_container_width=True)
+            else:
+                st.image("https://via.placeholder.com/400x240/EA1D2C/white?text=Imagem+Indisponível", 
+                        use_container_width=True)
         
-        # Informações com ingredientes
-        with st.expander(f"🍔 {prato['nome']} - R$ {prato['preco']:.2f}", expanded=False):
-            st.write("**Ingredientes:**")
-            for ing in prato.get('ingredientes', []):
-                st.write(f"• {ing['nome']}")
+            # Informações com ingredientes
+            with st.expander(f"🍔 {prato['nome']} - R$ {prato['preco']:.2f}", expanded=False):
+                st.write("**Ingredientes:**")
+                for ing in prato.get('ingredientes', []):
+                    st.write(f"• {ing['nome']}")
         
-        # Controle de quantidade
-        quantidade_atual = st.session_state.carrinho.get(prato["nome"], 0)
+            # Controle de quantidade
+            quantidade_atual = st.session_state.carrinho.get(prato["nome"], 0)
         
-        col1, col2, col3 = st.columns([1, 2, 1])
+            col1, col2, col3 = st.columns([1, 2, 1])
         
-        with col1:
-            if st.button("➖", key=f"menos_{prato['nome']}", use_container_width=True, disabled=not disponivel):
-                nova_quantidade = max(0, quantidade_atual - 1)
-                atualizar_item_carrinho(prato["nome"], nova_quantidade)
-                st.rerun()
+            with col1:
+                st.button("➖", key=f"menos_{prato['nome']}", use_container_width=True, disabled=not disponivel,
+                          on_click=atualizar_item_carrinho, args=(prato["nome"], max(0, quantidade_atual - 1)))
         
-        with col2:
-            if disponivel:
-                st.markdown(f"<div style='text-align:center;padding:8px;background:#f5f5f5;border-radius:4px;font-weight:bold;'>{quantidade_atual}</div>", unsafe_allow_html=True)
-            else:
-                st.markdown(f"<div style='text-align:center;padding:8px;background:#ffcccc;border-radius:4px;font-weight:bold;color:#cc0000;'>INDISPONÍVEL</div>", unsafe_allow_html=True)
+            with col2:
+                if disponivel:
+                    st.markdown(f"<div style='text-align:center;padding:8px;background:#f5f5f5;border-radius:4px;font-weight:bold;'>{quantidade_atual}</div>", unsafe_allow_html=True)
+                else:
+                    st.markdown(f"<div style='text-align:center;padding:8px;background:#ffcccc;border-radius:4px;font-weight:bold;color:#cc0000;'>INDISPONÍVEL</div>", unsafe_allow_html=True)
         
-        with col3:
-            if st.button("➕", key=f"mais_{prato['nome']}", use_container_width=True, disabled=not disponivel):
-                nova_quantidade = quantidade_atual + 1
-                atualizar_item_carrinho(prato["nome"], nova_quantidade)
-                st.rerun()
+            with col3:
+                st.button("➕", key=f"mais_{prato['nome']}", use_container_width=True,
+                          disabled=not disponivel or (porcoes is not None and quantidade_atual >= porcoes),
+                          on_click=atualizar_item_carrinho, args=(prato["nome"], quantidade_atual + 1))
         
-        st.markdown('</div>', unsafe_allow_html=True)
+            st.markdown('</div>', unsafe_allow_html=True)
+
+    # Paginação (só aparece quando a categoria tem mais de uma página)
+    if total_paginas > 1:
+        col_anterior, col_pagina, col_proxima = st.columns([1, 2, 1])
+        with col_anterior:
+            st.button("◀ Anterior", key="pagina_anterior", use_container_width=True, disabled=pagina == 0,
+                      on_click=mudar_pagina, args=(categoria, pagina - 1))
+        with col_pagina:
+            st.markdown(f"<div style='text-align:center;padding:8px;'>Página {pagina + 1} de {total_paginas} "
+                        f"• {len(pratos_categoria)} itens</div>", unsafe_allow_html=True)
+        with col_proxima:
+            st.button("Próxima ▶", key="pagina_proxima", use_container_width=True,
+                      disabled=pagina == total_paginas - 1, on_click=mudar_pagina, args=(categoria, pagina + 1))
 
-# =============== CARRINHO COM ID ===============
-if st.session_state.carrinho:
-    total = 0
-    itens_detalhados = []
+    # =============== CARRINHO COM ID ===============
+    aviso = st.session_state.pop("aviso_pedido", None)
+    if aviso is not None:
+        st.warning(aviso)
+    for encerrado in encerrados:
+        mostrar_pedido(*encerrado)
+    if st.session_state.pedidos_enviados:
+        acompanhar_pedidos()
+
+    if st.session_state.carrinho:
+        carrinho = st.session_state.carrinho
+        with metricas.span("app.carrinho.precos"):
+            carrinho.reprecificar(indice.precos)
+            itens_detalhados = carrinho.itens()
     
-    for nome, qtd in st.session_state.carrinho.items():
-        preco = next((p["preco"] for p in pratos if p["nome"] == nome), 0)
-        subtotal = qtd * preco
-        total += subtotal
-        itens_detalhados.append((nome, qtd, subtotal))
+        # Exibe o carrinho COM ID para o link
+        st.markdown("""
+        <div id="carrinho" style='background:white;padding:30px;border-radius:12px;box-shadow:0 4px 20px rgba(0,0,0,0.1);margin:40px 0;'>
+            <h2 style='color:#EA1D2C;text-align:center;margin-bottom:25px;'>🛒 Seu Pedido</h2>
+        """, unsafe_allow_html=True)
     
-    # Exibe o carrinho COM ID para o link
-    st.markdown("""
-    <div id="carrinho" style='background:white;padding:30px;border-radius:12px;box-shadow:0 4px 20px rgba(0,0,0,0.1);margin:40px 0;'>
-        <h2 style='color:#EA1D2C;text-align:center;margin-bottom:25px;'>🛒 Seu Pedido</h2>
-    """, unsafe_allow_html=True)
+        for nome, qtd, subtotal in itens_detalhados:
+            st.markdown(f"""
+            <div style='display:flex;justify-content:space-between;align-items:center;padding:12px 0;border-bottom:1px solid #f0f0f0;'>
+                <div>
+                    <strong>{nome}</strong>
+                    <br>
+                    <small>Quantidade: {qtd}</small>
+                </div>
+                <strong style='color:#EA1D2C;'>R$ {subtotal:.2f}</strong>
+            </div>
+            """, unsafe_allow_html=True)
     
-    for nome, qtd, subtotal in itens_detalhados:
         st.markdown(f"""
-        <div style='display:flex;justify-content:space-between;align-items:center;padding:12px 0;border-bottom:1px solid #f0f0f0;'>
-            <div>
-                <strong>{nome}</strong>
-                <br>
-                <small>Quantidade: {qtd}</small>
+            <div style='display:flex;justify-content:space-between;align-items:center;padding:12px 0;'>
+                <span>Taxa de entrega</span>
+                <strong>R$ {carrinho.taxa_entrega():.2f}</strong>
+            </div>
+            <div style='display:flex;justify-content:space-between;align-items:center;padding:20px 0;margin-top:15px;border-top:2px solid #EA1D2C;font-size:1.4rem;font-weight:bold;'>
+                <span>TOTAL:</span>
+                <span style='color:#EA1D2C;'>R$ {carrinho.total():.2f}</span>
             </div>
-            <strong style='color:#EA1D2C;'>R$ {subtotal:.2f}</strong>
         </div>
         """, unsafe_allow_html=True)
     
-    st.markdown(f"""
-        <div style='display:flex;justify-content:space-between;align-items:center;padding:20px 0;margin-top:15px;border-top:2px solid #EA1D2C;font-size:1.4rem;font-weight:bold;'>
-            <span>TOTAL:</span>
-            <span style='color:#EA1D2C;'>R$ {total:.2f}</span>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # Botões de ação
-    col1, col2, col3 = st.columns([1, 2, 1])
-    with col2:
-        col_confirm, col_clear = st.columns(2)
-        with col_confirm:
-            if st.button("✅ Finalizar Pedido", type="primary", use_container_width=True):
-                st.balloons()
-                st.success("🎉 Pedido enviado com sucesso! Tempo de entrega: 30-40 minutos")
-                limpar_carrinho()
-                st.rerun()
-        with col_clear:
-            if st.button("🗑️ Limpar Tudo", use_container_width=True):
-                limpar_carrinho()
-                st.rerun()
+        # Botões de ação
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col2:
+            col_confirm, col_clear = st.columns(2)
+            with col_confirm:
+                st.button("✅ Finalizar Pedido", type="primary", use_container_width=True, on_click=confirmar_pedido)
+            with col_clear:
+                st.button("🗑️ Limpar Tudo", use_container_width=True, on_click=limpar_carrinho)
+
+secao_menu()
 
 # =============== SOBRE NÓS – SEM QUEBRAS ===============
-st.markdown("""<section id="sobre" class="about full-width-section"><div style="max-width:1400px;margin:0 auto;padding:100px 40px;"><h2 class="section-title">Sobre Nós</h2><div style="display:grid;grid-template-columns:1fr 1fr;gap:80px;align-items:start;margin-bottom:100px;"><div style="font-size:1.2rem;line-height:1.8;color:#333;"><p style="margin-bottom:25px;">Há mais de 10 anos servindo os melhores hambúrgueres da região, o <strong style="color:#EA1D2C;">Burger Express</strong> se consolidou como referência em qualidade e sabor.</p><p style="margin-bottom:25px;">Utilizamos apenas carne 100% bovina, pães artesanais frescos diariamente e ingredientes selecionados para garantir a melhor experiência gastronômica.</p><p style="margin-bottom:25px;">Nossa missão é proporcionar momentos especiais através de hambúrgueres excepcionais, com atendimento diferenciado e ambiente acolhedor.</p></div><div style="border-radius:20px;overflow:hidden;box-shadow:0 12px 40px rgba(0,0,0,0.15);"><iframe src="https://www.google.com/maps/embed?pb=!1m18!1m12!1m3!1d3838.683491753089!2d-48.07228762408775!3d-15.820634523603314!2m3!1f0!2f0!3f0!3m2!1i1024!2i768!4f13.1!3m3!1m2!1s0x935a3391b366fc47%3A0x88c16b784a3ad98f!2sSenai%20Taguatinga!5e0!3m2!1spt-BR!2sbr!4v1762945909470!5m2!1spt-BR!2sbr" width="100%" height="450" style="border:0;" allowfullscreen="" loading="lazy"></iframe></div></div><div style="display:grid;grid-template-columns:repeat(auto-fit,minmax(400px,1fr));gap:60px;"><div style="background:white;padding:50px 40px;border-radius:24px;box-shadow:0 10px 35px rgba(0,0,0,0.1);text-align:center;"><h3 style="color:#EA1D2C;font-size:1.8rem;margin-bottom:30px;">🕒 Horário de Funcionamento</h3><p style="font-size:1.2rem;margin:20px 0;padding:10px 0;border-bottom:1px solid #f0f0f0;"><strong>Segunda a Sábado:</strong><br>11h às 23h</p><p style="font-size:1.2rem;margin:20px 0;padding:10px 0;"><strong>Domingo:</strong><br>12h às 22h</p></div><div style="background:white;padding:50px 40px;border-radius:24px;box-shadow:0 10px 35px rgba(0,0,0,0.1);text-align:center;"><h3 style="color:#EA1D2C;font-size:1.8rem;margin-bottom:30px;">🚚 Delivery</h3><p style="font-size:1.2rem;margin:20px 0;padding:10px 0;border-bottom:1px solid #f0f0f0;">Entregamos em toda a região</p><p style="font-size:1.2rem;margin:20px 0;padding:10px 0;border-bottom:1px solid #f0f0f0;"><strong>Taxa:</strong> R$ 5,00</p><p style="font-size:1.2rem;margin:20px 0;padding:10px 0;"><strong>Telefone:</strong><br>(61) 9999-9999</p></div></div></div></section>""", unsafe_allow_html=True)
+with metricas.span("app.sobre"):
+    st.markdown("""<section id="sobre" class="about full-width-section"><div style="max-width:1400px;margin:0 auto;padding:100px 40px;"><h2 class="section-title">Sobre Nós</h2><div style="display:grid;grid-template-columns:1fr 1fr;gap:80px;align-items:start;margin-bottom:100px;"><div style="font-size:1.2rem;line-height:1.8;color:#333;"><p style="margin-bottom:25px;">Há mais de 10 anos servindo os melhores hambúrgueres da região, o <strong style="color:#EA1D2C;">Burger Express</strong> se consolidou como referência em qualidade e sabor.</p><p style="margin-bottom:25px;">Utilizamos apenas carne 100% bovina, pães artesanais frescos diariamente e ingredientes selecionados para garantir a melhor experiência gastronômica.</p><p style="margin-bottom:25px;">Nossa missão é proporcionar momentos especiais através de hambúrgueres excepcionais, com atendimento diferenciado e ambiente acolhedor.</p></div><div style="border-radius:20px;overflow:hidden;box-shadow:0 12px 40px rgba(0,0,0,0.15);"><iframe src="https://www.google.com/maps/embed?pb=!1m18!1m12!1m3!1d3838.683491753089!2d-48.07228762408775!3d-15.820634523603314!2m3!1f0!2f0!3f0!3m2!1i1024!2i768!4f13.1!3m3!1m2!1s0x935a3391b366fc47%3A0x88c16b784a3ad98f!2sSenai%20Taguatinga!5e0!3m2!1spt-BR!2sbr!4v1762945909470!5m2!1spt-BR!2sbr" width="100%" height="450" style="border:0;" allowfullscreen="" loading="lazy"></iframe></div></div><div style="display:grid;grid-template-columns:repeat(auto-fit,minmax(400px,1fr));gap:60px;"><div style="background:white;padding:50px 40px;border-radius:24px;box-shadow:0 10px 35px rgba(0,0,0,0.1);text-align:center;"><h3 style="color:#EA1D2C;font-size:1.8rem;margin-bottom:30px;">🕒 Horário de Funcionamento</h3><p style="font-size:1.2rem;margin:20px 0;padding:10px 0;border-bottom:1px solid #f0f0f0;"><strong>Segunda a Sábado:</strong><br>11h às 23h</p><p style="font-size:1.2rem;margin:20px 0;padding:10px 0;"><strong>Domingo:</strong><br>12h às 22h</p></div><div style="background:white;padding:50px 40px;border-radius:24px;box-shadow:0 10px 35px rgba(0,0,0,0.1);text-align:center;"><h3 style="color:#EA1D2C;font-size:1.8rem;margin-bottom:30px;">🚚 Delivery</h3><p style="font-size:1.2rem;margin:20px 0;padding:10px 0;border-bottom:1px solid #f0f0f0;">Entregamos em toda a região</p><p style="font-size:1.2rem;margin:20px 0;padding:10px 0;border-bottom:1px solid #f0f0f0;"><strong>Taxa:</strong> R$ 5,00</p><p style="font-size:1.2rem;margin:20px 0;padding:10px 0;"><strong>Telefone:</strong><br>(61) 9999-9999</p></div></div></div></section>""", unsafe_allow_html=True)
 
 # ==# =============== FOOTER ORIGINAL ===============
-st.markdown("""
+with metricas.span("app.rodape"):
+    st.markdown("""
 <style>
     .footer::before {content:'';position:absolute;top:0;left:0;right:0;height:5px;background:linear-gradient(90deg,#EA1D2C,#ff4757);}
     .footer-content {display:grid;grid-template-columns:repeat(auto-fit,minmax(250px,1fr));gap:50px;max-width:1200px;margin:0 auto;padding:0 20px;position:relative;}
@@ -340,7 +465,7 @@ st.markdown("""
 </footer>
 """, unsafe_allow_html=True)
 
-st.markdown("""
+    st.markdown("""
 <div style="
     width:100%;
     box-sizing:border-box;
@@ -354,3 +479,5 @@ st.markdown("""
     </p>
 </div>
 """, unsafe_allow_html=True)
+
+perfil.concluir()
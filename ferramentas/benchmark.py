@@ -0,0 +1,330 @@
+# ferramentas/benchmark.py - MICROBENCHMARKS DE ESCALA DO CATÁLOGO (SAÍDA EM JSON)
+# Uso: python ferramentas/benchmark.py [--tamanhos 10,100,1000,10000,50000] [--casos custo,json]
+#      [--json bench.json] [--comparar bench-anterior.json]
+# Para cada tamanho gera um catálogo sintético com N pratos e N ingredientes e mede o tempo por
+# chamada de cada caso. O expoente entre dois tamanhos (tempo ~ N^k) mostra onde o custo deixa de
+# ser linear; casos que passam de --limite segundos não são medidos nos tamanhos seguintes.
+# As funções das páginas (app.py e pages/admin.py) são lidas do próprio arquivo, então o
+# benchmark acompanha o código atual sem executar a interface.
+import argparse
+import ast
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from catalogo_sintetico import CATEGORIAS_PRATOS, gerar_catalogo, salvar_catalogo
+from restaurante import armazenamento, catalogo
+from restaurante.busca import IndiceBusca
+from restaurante.carrinho import Carrinho
+from restaurante.custos import MatrizCustos
+from restaurante.producao import Producao
+from restaurante.receitas import MatrizReceitas
+from restaurante.disponibilidade import TabelaDisponibilidade
+from restaurante.indice import IndiceCatalogo
+
+def funcao_da_pagina(arquivo, nome, **globais):
+    """Compila só a função `nome` de um script do Streamlit, com os nomes globais informados.
+    Decoradores (metricas.medido, perfil.callback) são descartados: mede-se só o corpo."""
+    caminho = os.path.join(BASE_DIR, arquivo)
+    with open(caminho, "r", encoding="utf-8") as f:
+        arvore = ast.parse(f.read(), caminho)
+    definicao = next(n for n in arvore.body if isinstance(n, ast.FunctionDef) and n.name == nome)
+    definicao.decorator_list = []
+    namespace = dict(globais)
+    exec(compile(ast.Module(body=[definicao], type_ignores=[]), caminho, "exec"), namespace)
+    return namespace[nome]
+
+# =============== VERSÕES ORIGINAIS (REFERÊNCIA) ===============
+# Como eram antes dos índices: busca linear na lista de ingredientes/pratos a cada item.
+# No app original a lista ainda era relida do JSON a cada chamada; aqui ela vem pronta.
+def _verificar_original(prato, ingredientes):
+    faltantes = []
+    for ing_prato in prato.get('ingredientes', []):
+        ingrediente = next((i for i in ingredientes if i['nome'] == ing_prato['nome']), None)
+        if not ingrediente or ingrediente['estoque'] < ing_prato['quantidade']:
+            faltantes.append(ing_prato['nome'])
+    return len(faltantes) == 0, faltantes
+
+def _custo_original(prato):
+    # Tabela fixa de preços recriada a cada chamada, como era em pages/admin.py
+    precos_ingredientes = {
+        "Pão de Hambúrguer": 1.50, "Pão Brioche": 2.00, "Carne Bovina 180g": 6.00,
+        "Queijo Cheddar": 1.50, "Queijo Mussarela": 1.20, "Bacon": 2.00,
+        "Alface": 0.50, "Tomate": 0.30, "Cebola Roxa": 0.20, "Molho Especial": 1.00,
+        "Maionese": 0.80, "Ketchup": 0.30, "Mostarda": 0.30, "Batata Palha": 1.50,
+        "Coca-Cola 2L": 8.00, "Guaraná 2L": 7.00
+    }
+    custo_total = 0
+    for ing_prato in prato.get('ingredientes', []):
+        custo_total += precos_ingredientes.get(ing_prato['nome'], 1.00) * ing_prato['quantidade']
+    return custo_total
+
+def _total_original(carrinho, pratos):
+    total = 0
+    for nome, qtd in carrinho.items():
+        preco = next((p["preco"] for p in pratos if p["nome"] == nome), 0)
+        total += qtd * preco
+    return total
+
+# =============== CASOS ===============
+# Cada caso recebe o contexto de um tamanho e devolve a função que será cronometrada
+def caso_verificar_app(ctx):
+    tabela = TabelaDisponibilidade(ctx["pratos"])
+    tabela.sincronizar(ctx["ingredientes"])
+    verificar = funcao_da_pagina("app.py", "verificar_disponibilidade_prato",
+                                 obter_disponibilidade=lambda: tabela)
+    return lambda: [verificar(p) for p in ctx["pratos"]]
+
+def caso_verificar_admin(ctx):
+    tabela = TabelaDisponibilidade(ctx["pratos"])
+    tabela.sincronizar(ctx["ingredientes"])
+    verificar = funcao_da_pagina("pages/admin.py", "verificar_disponibilidade_prato")
+    return lambda: [verificar(p, tabela) for p in ctx["pratos"]]
+
+def caso_verificar_original(ctx):
+    return lambda: [_verificar_original(p, ctx["ingredientes"]) for p in ctx["pratos"]]
+
+def caso_disponibilidade_construir(ctx):
+    def construir():
+        TabelaDisponibilidade(ctx["pratos"]).sincronizar(ctx["ingredientes"])
+    return construir
+
+def caso_disponibilidade_baixa(ctx):
+    """Recalcular depois da baixa de um pedido (estoque de 6 ingredientes muda)"""
+    tabela = TabelaDisponibilidade(ctx["pratos"])
+    tabela.sincronizar(ctx["ingredientes"])
+    receita = ctx["pratos"][0]["ingredientes"]
+    return lambda: tabela.aplicar_estoque({i["nome"]: 1 for i in receita})
+
+def caso_custo_original(ctx):
+    return lambda: [_custo_original(p) for p in ctx["pratos"]]
+
+def caso_custo_matriz(ctx):
+    """Montar a matriz de receitas (uma vez por versão do catálogo)"""
+    return lambda: MatrizReceitas(ctx["pratos"], ctx["ingredientes"])
+
+def caso_custo(ctx):
+    """Custo, lucro e margem de todos os pratos com a matriz pronta (mudança de custo unitário)"""
+    matriz = MatrizCustos(MatrizReceitas(ctx["pratos"], ctx["ingredientes"]))
+    return matriz._calcular
+
+def caso_porcoes(ctx):
+    """Porções possíveis de todos os pratos (refeito a cada versão do estoque)"""
+    receitas = MatrizReceitas(ctx["pratos"], ctx["ingredientes"])
+    return lambda: Producao(receitas, ctx["ingredientes"])
+
+def caso_plano(ctx):
+    """Plano com participação igual, sem o cache de planos"""
+    receitas = MatrizReceitas(ctx["pratos"], ctx["ingredientes"])
+    participacoes = [1.0] * len(ctx["pratos"])
+    return lambda: Producao(receitas, ctx["ingredientes"]).planejar(participacoes)
+
+def caso_filtro_categoria(ctx):
+    pratos = ctx["pratos"]
+    return lambda: [[p for p in pratos if p['cat'] == cat] for cat in CATEGORIAS_PRATOS]
+
+def caso_filtro_categoria_indice(ctx):
+    indice = IndiceCatalogo(ctx["pratos"], ctx["ingredientes"])
+    return lambda: [indice.pratos_da_categoria(cat) for cat in CATEGORIAS_PRATOS]
+
+def caso_indice_construir(ctx):
+    return lambda: IndiceCatalogo(ctx["pratos"], ctx["ingredientes"])
+
+CONSULTAS = ("prato 0004", "ingrediente 0123", "hamb", "sobremesa ingred 00")
+
+def caso_busca_construir(ctx):
+    return lambda: IndiceBusca(ctx["pratos"])
+
+def caso_busca_consulta(ctx):
+    """As 4 CONSULTAS com o cache de prefixos vazio, incluindo a fatia da primeira página"""
+    indice = IndiceBusca(ctx["pratos"])
+
+    def consultar():
+        for consulta in CONSULTAS:
+            indice._cache.clear()
+            indice.buscar(consulta)[:12]
+    return consultar
+
+def caso_carrinho_original(ctx):
+    carrinho = {p["nome"]: 1 for p in ctx["pratos"]}
+    return lambda: _total_original(carrinho, ctx["pratos"])
+
+def caso_carrinho(ctx):
+    """Um ➕ (definir) e a renderização das linhas e do total, com N itens no carrinho"""
+    indice = IndiceCatalogo(ctx["pratos"], ctx["ingredientes"])
+    carrinho = Carrinho()
+    for prato in ctx["pratos"]:
+        carrinho.definir(prato["nome"], 1, indice.preco(prato["nome"]))
+    nome = ctx["pratos"][0]["nome"]
+
+    def clicar():
+        carrinho.definir(nome, carrinho[nome] % 5 + 1, indice.preco(nome))
+        return carrinho.itens(), carrinho.total()
+    return clicar
+
+def _casos_json(tabela):
+    def carregar(ctx):
+        return lambda: ctx["backend"].ler(tabela)
+
+    def fonte(ctx):
+        return lambda: ctx["backend"].ler_fonte(tabela)
+
+    def gravar(ctx):
+        dados = ctx["backend"].ler(tabela)
+
+        def executar():
+            with ctx["backend"].transacao() as tx:
+                tx.substituir(tabela, dados)
+        return executar
+    return carregar, fonte, gravar
+
+def _caso_catalogo_frio(snapshots):
+    """Cache do processo vazio (como um processo recém-iniciado): lê e congela todas as tabelas"""
+    def caso(ctx):
+        backend = armazenamento.ArmazenamentoJSON(ctx["backend"].base_dir)
+        if not snapshots:
+            backend.snapshots = None
+
+        def executar():
+            armazenamento.configurar(backend)
+            catalogo.invalidar()
+            catalogo.verificar()
+        return executar
+    return caso
+
+CASOS = {
+    "verificar_app": caso_verificar_app,
+    "verificar_admin": caso_verificar_admin,
+    "verificar_original": caso_verificar_original,
+    "disponibilidade_construir": caso_disponibilidade_construir,
+    "disponibilidade_baixa": caso_disponibilidade_baixa,
+    "custo_original": caso_custo_original,
+    "custo_matriz": caso_custo_matriz,
+    "custo": caso_custo,
+    "porcoes": caso_porcoes,
+    "plano": caso_plano,
+    "filtro_categoria": caso_filtro_categoria,
+    "filtro_categoria_indice": caso_filtro_categoria_indice,
+    "indice_construir": caso_indice_construir,
+    "busca_construir": caso_busca_construir,
+    "busca_consulta": caso_busca_consulta,
+    "carrinho_original": caso_carrinho_original,
+    "carrinho": caso_carrinho,
+    "catalogo_frio": _caso_catalogo_frio(True),
+    "catalogo_frio_sem_snapshot": _caso_catalogo_frio(False),
+}
+for _tabela in armazenamento.TABELAS:
+    CASOS[f"json_carregar_{_tabela}"], CASOS[f"json_fonte_{_tabela}"], CASOS[f"json_gravar_{_tabela}"] = _casos_json(_tabela)
+
+# =============== MEDIÇÃO ===============
+def cronometrar(funcao, repeticoes=5, minimo=0.05):
+    """Melhor tempo por chamada entre `repeticoes` rodadas de pelo menos `minimo` segundos"""
+    inicio = time.perf_counter()
+    funcao()
+    chamadas = max(1, int(minimo / max(time.perf_counter() - inicio, 1e-9)))
+    melhor = math.inf
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        for _ in range(chamadas):
+            funcao()
+        melhor = min(melhor, (time.perf_counter() - inicio) / chamadas)
+    return melhor
+
+def expoentes(medidas):
+    """k em tempo ~ N^k entre tamanhos consecutivos medidos"""
+    pontos = [(int(n), t) for n, t in medidas.items() if t]
+    resultado = {}
+    for (n1, t1), (n2, t2) in zip(pontos, pontos[1:]):
+        resultado[f"{n1}->{n2}"] = round(math.log(t2 / t1) / math.log(n2 / n1), 2)
+    return resultado
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def comparar(atual, anterior, tolerancia):
+    """Casos/tamanhos que ficaram mais lentos que `tolerancia` (1.2 = 20%)"""
+    regressoes = []
+    for caso, medidas in atual["casos"].items():
+        antes = anterior.get("casos", {}).get(caso, {}).get("segundos", {})
+        for n, t in medidas["segundos"].items():
+            if t and antes.get(n) and t / antes[n] > tolerancia:
+                regressoes.append((caso, n, antes[n], t))
+    return regressoes
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tempos do catálogo em função do número de pratos e ingredientes")
+    parser.add_argument("--tamanhos", default="10,100,1000,10000,50000")
+    parser.add_argument("--casos", help="prefixos separados por vírgula (padrão: todos)")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--limite", type=float, default=2.0,
+                        help="segundos por chamada a partir dos quais o caso para de crescer")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--json", help="grava o resultado neste arquivo")
+    parser.add_argument("--comparar", help="resultado anterior (JSON) para apontar regressões")
+    parser.add_argument("--tolerancia", type=float, default=1.2)
+    args = parser.parse_args(argv)
+
+    tamanhos = [int(t) for t in args.tamanhos.split(",")]
+    prefixos = args.casos.split(",") if args.casos else None
+    casos = {nome: f for nome, f in CASOS.items() if not prefixos or any(nome.startswith(p) for p in prefixos)}
+    segundos = {nome: {} for nome in casos}
+    lentos = set()
+
+    for n in tamanhos:
+        pratos, ingredientes = gerar_catalogo(n, n, semente=args.semente)
+        with tempfile.TemporaryDirectory(prefix="bench-") as pasta:
+            backend = armazenamento.ArmazenamentoJSON(pasta)
+            salvar_catalogo(backend, pratos, ingredientes)
+            ctx = {"pratos": pratos, "ingredientes": ingredientes, "backend": backend}
+            for nome, caso in casos.items():
+                if nome in lentos:
+                    segundos[nome][str(n)] = None
+                    continue
+                tempo = cronometrar(caso(ctx), args.repeticoes)
+                segundos[nome][str(n)] = tempo
+                if tempo > args.limite:
+                    lentos.add(nome)
+                print(f"{nome:<28}{n:>7}  {tempo * 1000:>12.3f} ms", flush=True)
+
+    resultado = {
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "tamanhos": tamanhos,
+        "casos": {nome: {"segundos": s, "expoentes": expoentes(s)} for nome, s in segundos.items()},
+    }
+
+    print(f"\n{'caso':<28}expoente k (tempo ~ N^k) entre tamanhos")
+    for nome, dados in resultado["casos"].items():
+        curva = "  ".join(f"{faixa}: {k}" for faixa, k in dados["expoentes"].items())
+        alerta = "  ⚠️ superlinear" if any(k > 1.5 for k in dados["expoentes"].values()) else ""
+        print(f"{nome:<28}{curva}{alerta}")
+
+    codigo = 0
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as f:
+            regressoes = comparar(resultado, json.load(f), args.tolerancia)
+        for caso, n, antes, depois in regressoes:
+            print(f"❌ {caso} N={n}: {antes * 1000:.3f} ms -> {depois * 1000:.3f} ms")
+        codigo = 1 if regressoes else 0
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2)
+    return codigo
+
+if __name__ == "__main__":
+    sys.exit(main())
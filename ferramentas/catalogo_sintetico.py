@@ -0,0 +1,39 @@
+# ferramentas/catalogo_sintetico.py - CATÁLOGOS SINTÉTICOS PARA CARGA E BENCHMARKS
+import random
+
+CATEGORIAS_PRATOS = ["hamburgers", "bebidas", "acompanhamentos", "sobremesas"]
+CATEGORIAS_INGREDIENTES = ["paes", "carnes", "queijos", "saladas", "molhos", "complementos", "bebidas", "acompanhamentos"]
+IMAGENS = ["burger-classic.jpg", "burger-bacon.jpg", "cheese-duplo.jpg", "refri.jpg", "suco.jpg",
+           "batata-frita.jpg", "onion-rings.jpg", "milkshake.jpg", "brownie.jpg"]
+
+def gerar_catalogo(n_pratos, n_ingredientes, ingredientes_por_prato=6, semente=0):
+    """Listas (pratos, ingredientes) no mesmo formato de pratos.json / ingredientes.json"""
+    aleatorio = random.Random(semente)
+    ingredientes = [
+        {
+            "nome": f"Ingrediente {i:05d}",
+            "categoria": CATEGORIAS_INGREDIENTES[i % len(CATEGORIAS_INGREDIENTES)],
+            "unidade": "unidade",
+            "estoque": aleatorio.randint(0, 500),
+            "minimo": aleatorio.randint(5, 50),
+            "custo": round(aleatorio.uniform(0.1, 5), 2),
+        }
+        for i in range(n_ingredientes)
+    ]
+    pratos = []
+    for i in range(n_pratos):
+        receita = aleatorio.sample(range(n_ingredientes), min(ingredientes_por_prato, n_ingredientes))
+        pratos.append({
+            "nome": f"Prato {i:05d}",
+            "preco": round(aleatorio.uniform(8, 40), 2),
+            "cat": CATEGORIAS_PRATOS[i % len(CATEGORIAS_PRATOS)],
+            "img": IMAGENS[i % len(IMAGENS)],
+            "ingredientes": [{"nome": ingredientes[j]["nome"], "quantidade": aleatorio.randint(1, 3)} for j in receita],
+        })
+    return pratos, ingredientes
+
+def salvar_catalogo(backend, pratos, ingredientes):
+    with backend.transacao() as tx:
+        tx.substituir("pratos", pratos)
+        tx.substituir("ingredientes", ingredientes)
+        tx.substituir("estoque", {p["nome"]: {"quantidade": 10, "minimo": 5, "ativo": True} for p in pratos})
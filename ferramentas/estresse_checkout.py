@@ -0,0 +1,212 @@
+# ferramentas/estresse_checkout.py - TESTE DE ESTRESSE DA FINALIZAÇÃO DE PEDIDOS
+# Uso: python ferramentas/estresse_checkout.py --pedidos 500 --sessoes 200 [--processos 4] [--backend sqlite] [--diario]
+#                                              [--assincrono] [--saturar-disco 4] [--falha-cozinha 0.2]
+# Cada sessão faz o que o botão "Finalizar" faz (baixa de estoque + comanda da cozinha) e mede quanto
+# o clique espera. --assincrono usa o pool de envio (o clique só registra o pedido; recusado por
+# sobrecarga, a sessão tenta de novo) e mede também o pedido completo. --saturar-disco N põe N
+# threads gravando e fazendo fsync sem parar na mesma pasta, disputando o disco com o checkout.
+# --falha-cozinha P faz a fila da cozinha falhar em P dos envios (depois da baixa): o pedido tem
+# de ser estornado, e a conferência de estoque no fim pega baixa em dobro ou perdida.
+import argparse
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from restaurante import armazenamento
+from restaurante.cozinha import FilaCozinha, configurar_fila
+from restaurante.diario import Diario, configurar_diario
+from restaurante.envio import FILA_MAXIMA, TRABALHADORES, EnvioPedidos, configurar_envio, obter_envio
+
+ESPERA_SOBRECARGA = 0.1  # pausa da sessão antes de tentar de novo um envio recusado por sobrecarga
+TENTATIVAS = 50          # cliques por sessão antes de desistir do pedido
+BLOCO_DISCO = 1 << 20    # bytes por escrita das threads que saturam o disco
+
+INGREDIENTES = [
+    {"nome": "Pão", "categoria": "paes", "unidade": "unidade", "estoque": 300, "minimo": 10},
+    {"nome": "Carne", "categoria": "carnes", "unidade": "unidade", "estoque": 400, "minimo": 10},
+    {"nome": "Queijo", "categoria": "queijos", "unidade": "fatia", "estoque": 500, "minimo": 10},
+]
+PRATOS = [
+    {"nome": "Simples", "preco": 10.0, "cat": "hamburgers", "img": "x.jpg",
+     "ingredientes": [{"nome": "Pão", "quantidade": 1}, {"nome": "Carne", "quantidade": 1}]},
+    {"nome": "Duplo", "preco": 15.0, "cat": "hamburgers", "img": "x.jpg",
+     "ingredientes": [{"nome": "Pão", "quantidade": 1}, {"nome": "Carne", "quantidade": 2},
+                      {"nome": "Queijo", "quantidade": 2}]},
+    {"nome": "Queijo Quente", "preco": 8.0, "cat": "acompanhamentos", "img": "x.jpg",
+     "ingredientes": [{"nome": "Pão", "quantidade": 1}, {"nome": "Queijo", "quantidade": 3}]},
+]
+
+def criar_backend(tipo, pasta):
+    if tipo == "sqlite":
+        return armazenamento.ArmazenamentoSQLite(os.path.join(pasta, "estresse.db"))
+    return armazenamento.ArmazenamentoJSON(pasta)
+
+def gerar_carrinhos(total, semente):
+    aleatorio = random.Random(semente)
+    return [{p["nome"]: aleatorio.randint(1, 3) for p in aleatorio.sample(PRATOS, aleatorio.randint(1, 3))}
+            for _ in range(total)]
+
+class _FilaInstavel(FilaCozinha):
+    """Fila da cozinha que falha em parte dos envios (banco travado/disco cheio), depois da baixa"""
+
+    def __init__(self, caminho, falha):
+        super().__init__(caminho)
+        self.falha = falha
+
+    def enfileirar(self, itens, tarefas, agora=None):
+        if random.random() < self.falha:
+            raise sqlite3.OperationalError("database is locked (falha injetada)")
+        return super().enfileirar(itens, tarefas, agora)
+
+def _iniciar_processo(tipo, pasta, diario, trabalhadores=TRABALHADORES, fila_maxima=FILA_MAXIMA, falha=0.0):
+    armazenamento.configurar(criar_backend(tipo, pasta))
+    configurar_diario(Diario(os.path.join(pasta, "diario"), eventos_por_snapshot=100) if diario else None)
+    configurar_fila(_FilaInstavel(os.path.join(pasta, "cozinha.db"), falha))
+    configurar_envio(EnvioPedidos(trabalhadores, fila_maxima))
+
+def _saturar_disco(pasta, numero, parar):
+    """Grava e faz fsync sem parar (arquivo reciclado a cada 64 MiB)"""
+    bloco = os.urandom(BLOCO_DISCO)
+    with open(os.path.join(pasta, f"saturacao-{numero}.bin"), "wb") as f:
+        while not parar.is_set():
+            if f.tell() >= 64 * BLOCO_DISCO:
+                f.seek(0)
+            f.write(bloco)
+            f.flush()
+            os.fsync(f.fileno())
+
+def _finalizar(carrinho, parcial):
+    """Clica em "Finalizar" até o pedido passar, como o cliente: de novo se recusado por sobrecarga
+    ou se deu erro e os itens voltaram ao carrinho (o estorno devolveu a baixa).
+    (atendidos, cliques, pedido completo, sobrecargas, erros)"""
+    envio, cliques, sobrecargas, erros = obter_envio(), [], 0, 0
+    comeco = time.perf_counter()
+    for _ in range(TENTATIVAS):
+        clique = time.perf_counter()
+        codigo = envio.enviar(carrinho, parcial)
+        cliques.append(time.perf_counter() - clique)  # sem pool, inclui a finalização inteira
+        if codigo is None:
+            sobrecargas += 1
+            time.sleep(ESPERA_SOBRECARGA)
+            continue
+        pedido = envio.pedido(codigo)
+        pedido.concluido.wait()
+        if pedido.situacao != "erro":
+            return pedido.resultado.atendidos, cliques, time.perf_counter() - comeco, sobrecargas, erros
+        if pedido.baixado:  # estorno também falhou: o estoque não tem mais como fechar
+            raise RuntimeError(f"pedido {codigo} baixado sem comanda e sem estorno") from pedido.erro
+        erros += 1
+    return {}, cliques, time.perf_counter() - comeco, sobrecargas, erros
+
+def _executar_lote(args):
+    carrinhos, sessoes, parcial = args
+    with ThreadPoolExecutor(max_workers=sessoes) as executor:
+        return list(executor.map(lambda c: _finalizar(c, parcial), carrinhos))
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))] if ordenados else 0.0
+
+def _latencias(valores):
+    return (f"p50={_percentil(valores, 50) * 1000:.1f}ms p99={_percentil(valores, 99) * 1000:.1f}ms "
+            f"max={max(valores) * 1000:.1f}ms")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Finalizações simultâneas contra um catálogo sintético")
+    parser.add_argument("--pedidos", type=int, default=500)
+    parser.add_argument("--sessoes", type=int, default=200, help="threads simultâneas por processo")
+    parser.add_argument("--processos", type=int, default=1)
+    parser.add_argument("--backend", choices=["json", "sqlite"], default="json")
+    parser.add_argument("--parcial", action="store_true", help="permite atendimento parcial")
+    parser.add_argument("--diario", action="store_true", help="baixa o estoque pelo diário de movimentos")
+    parser.add_argument("--assincrono", action="store_true", help="envia pelo pool de envio (clique não espera)")
+    parser.add_argument("--trabalhadores", type=int, default=TRABALHADORES, help="threads do pool de envio")
+    parser.add_argument("--fila", type=int, default=FILA_MAXIMA, help="pedidos esperando no pool antes de recusar")
+    parser.add_argument("--saturar-disco", type=int, default=0, help="threads gravando com fsync em paralelo")
+    parser.add_argument("--falha-cozinha", type=float, default=0.0, help="fração dos envios à cozinha que falham")
+    parser.add_argument("--estoque", type=int, default=1, help="multiplica o estoque inicial")
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args(argv)
+    ingredientes = [dict(ing, estoque=ing["estoque"] * args.estoque) for ing in INGREDIENTES]
+
+    with tempfile.TemporaryDirectory() as pasta:
+        backend = criar_backend(args.backend, pasta)
+        with backend.transacao() as tx:
+            tx.substituir("ingredientes", ingredientes)
+            tx.substituir("pratos", PRATOS)
+        # Sem --assincrono o envio processa no próprio clique (BURGER_CHECKOUT_THREADS=0)
+        iniciar = (args.backend, pasta, args.diario, args.trabalhadores if args.assincrono else 0, args.fila,
+                   args.falha_cozinha)
+        _iniciar_processo(*iniciar)
+
+        parar = threading.Event()
+        saturadores = [threading.Thread(target=_saturar_disco, args=(pasta, n, parar))
+                       for n in range(args.saturar_disco)]
+        for thread in saturadores:
+            thread.start()
+
+        carrinhos = gerar_carrinhos(args.pedidos, args.semente)
+        lotes = [(carrinhos[i::args.processos], args.sessoes, args.parcial) for i in range(args.processos)]
+
+        inicio = time.perf_counter()
+        try:
+            if args.processos == 1:
+                resultados = _executar_lote(lotes[0])
+            else:
+                contexto = multiprocessing.get_context("spawn")
+                with contexto.Pool(args.processos, _iniciar_processo, iniciar) as pool:
+                    resultados = [r for parte in pool.map(_executar_lote, lotes) for r in parte]
+        finally:
+            parar.set()
+            for thread in saturadores:
+                thread.join()
+        duracao = time.perf_counter() - inicio
+        atendidos = [r[0] for r in resultados]
+        cliques = [c for r in resultados for c in r[1]]
+        completos = [r[2] for r in resultados]
+        sobrecargas = sum(r[3] for r in resultados)
+        estornados = sum(r[4] for r in resultados)
+
+        # Confere: estoque final == inicial - tudo que foi atendido, e nunca negativo
+        receitas = {p["nome"]: p["ingredientes"] for p in PRATOS}
+        consumo = {i["nome"]: 0 for i in ingredientes}
+        for pedido in atendidos:
+            for nome_prato, quantidade in pedido.items():
+                for ing in receitas[nome_prato]:
+                    consumo[ing["nome"]] += ing["quantidade"] * quantidade
+        final = {i["nome"]: i["estoque"] for i in criar_backend(args.backend, pasta).ler("ingredientes")}
+        if args.diario:  # reconstrói do zero: snapshot + cauda
+            final.update(Diario(os.path.join(pasta, "diario")).estoque())
+        erros = []
+        for ing in ingredientes:
+            esperado = ing["estoque"] - consumo[ing["nome"]]
+            if final[ing["nome"]] != esperado or final[ing["nome"]] < 0:
+                erros.append(f"{ing['nome']}: final={final[ing['nome']]} esperado={esperado}")
+
+    aceitos = sum(1 for a in atendidos if a)
+    print(f"backend={args.backend} diario={args.diario} processos={args.processos} sessoes={args.sessoes} pedidos={args.pedidos} "
+          f"assincrono={args.assincrono} saturar_disco={args.saturar_disco} falha_cozinha={args.falha_cozinha:g}")
+    print(f"aceitos={aceitos} recusados={args.pedidos - aceitos} estoque_final={final}")
+    print(f"{args.pedidos / duracao:.0f} pedidos/s ({duracao:.2f}s)")
+    print(f"clique: {_latencias(cliques)} ({len(cliques)} cliques, {sobrecargas} recusados por sobrecarga)")
+    print(f"pedido completo: {_latencias(completos)}")
+    if args.falha_cozinha:
+        print(f"envios à cozinha que falharam (baixa estornada, cliente tentou de novo): {estornados}")
+    if erros:
+        print("❌ VENDA ACIMA DO ESTOQUE / INCONSISTÊNCIA: " + "; ".join(erros))
+        return 1
+    print("✅ Nenhuma venda acima do estoque")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
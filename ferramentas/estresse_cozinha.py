@@ -0,0 +1,157 @@
+# ferramentas/estresse_cozinha.py - VAZÃO DA FILA DA COZINHA COM O AGENDADOR RODANDO
+# Uso: python ferramentas/estresse_cozinha.py [--comandas 5000] [--sessoes 32] [--processos 1] [--aceleracao 600]
+# Sessões simultâneas enfileiram comandas (como o checkout faz) enquanto o agendador roda numa
+# thread e um painel da cozinha consulta a fila a cada 100 ms. O relógio da cozinha é acelerado
+# (--aceleracao 600: 1 s real = 10 min de cozinha) para as comandas andarem durante o teste.
+# Confere no fim: toda comanda agendada uma única vez e nenhuma estação acima da capacidade.
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from restaurante.cozinha import ESTACOES, TEMPOS_PREPARO, Agendador, FilaCozinha, tarefas_do_pedido
+
+class _Indice:
+    """Só o que tarefas_do_pedido usa do índice do catálogo: a categoria de cada prato"""
+    pratos = {f"{categoria} {i}": {"cat": categoria} for categoria in TEMPOS_PREPARO for i in range(5)}
+
+    def prato(self, nome):
+        return self.pratos.get(nome)
+
+def gerar_pedidos(total, semente):
+    aleatorio = random.Random(semente)
+    nomes = list(_Indice.pratos)
+    return [{nome: aleatorio.randint(1, 3) for nome in aleatorio.sample(nomes, aleatorio.randint(1, 4))}
+            for _ in range(total)]
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))] if ordenados else 0.0
+
+def _relogio(inicio, aceleracao):
+    return lambda: inicio + (time.time() - inicio) * aceleracao
+
+def _enfileirar_lote(args):
+    caminho, pedidos, sessoes, inicio, aceleracao = args
+    fila, indice, relogio = FilaCozinha(caminho), _Indice(), _relogio(inicio, aceleracao)
+
+    def enfileirar(itens):
+        comeco = time.perf_counter()
+        fila.enfileirar(itens, tarefas_do_pedido(itens, indice), agora=relogio())
+        return time.perf_counter() - comeco
+
+    with ThreadPoolExecutor(max_workers=sessoes) as executor:
+        return list(executor.map(enfileirar, pedidos))
+
+def conferir_capacidade(caminho):
+    """Maior ocupação simultânea de cada estação, pelos inícios gravados"""
+    conexao = sqlite3.connect(caminho)
+    eventos = {}
+    for inicio, tarefas in conexao.execute("SELECT inicio, tarefas FROM comandas WHERE inicio IS NOT NULL"):
+        for estacao, duracao in json.loads(tarefas).items():
+            eventos.setdefault(estacao, []).extend([(inicio + duracao, -1), (inicio, 1)])
+    ocupacao = {}
+    for estacao, lista in eventos.items():
+        atual = maximo = 0
+        for _, delta in sorted(lista):  # no mesmo instante, quem sai (-1) vem antes de quem entra
+            atual += delta
+            maximo = max(maximo, atual)
+        ocupacao[estacao] = maximo
+    estados = dict(conexao.execute("SELECT estado, COUNT(*) FROM comandas GROUP BY estado").fetchall())
+    conexao.close()
+    return ocupacao, estados
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Comandas simultâneas contra a fila da cozinha")
+    parser.add_argument("--comandas", type=int, default=5000)
+    parser.add_argument("--sessoes", type=int, default=32, help="threads simultâneas por processo")
+    parser.add_argument("--processos", type=int, default=1)
+    parser.add_argument("--aceleracao", type=float, default=600, help="minutos de cozinha por minuto real")
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "cozinha.db")
+        fila = FilaCozinha(caminho)
+        inicio = time.time()
+        agendador = Agendador(fila, automatico=True, relogio=_relogio(inicio, args.aceleracao))
+        agendador.carregar()
+
+        # Agendador e painel em threads, como no processo do app
+        parar = threading.Event()
+        passos, paineis = [], []
+
+        def agendar():
+            while not parar.is_set():
+                fila.acordar.clear()
+                comeco = time.perf_counter()
+                resultado = agendador.passo()
+                passos.append((time.perf_counter() - comeco, resultado))
+                fila.acordar.wait(0.5)
+
+        def consultar_painel():
+            while not parar.is_set():
+                comeco = time.perf_counter()
+                fila.painel(30)
+                paineis.append(time.perf_counter() - comeco)
+                time.sleep(0.1)
+
+        threads = [threading.Thread(target=agendar), threading.Thread(target=consultar_painel)]
+        for thread in threads:
+            thread.start()
+
+        pedidos = gerar_pedidos(args.comandas, args.semente)
+        lotes = [(caminho, pedidos[i::args.processos], args.sessoes, inicio, args.aceleracao)
+                 for i in range(args.processos)]
+        comeco = time.perf_counter()
+        if args.processos == 1:
+            latencias = _enfileirar_lote(lotes[0])
+        else:
+            with multiprocessing.get_context("spawn").Pool(args.processos) as pool:
+                latencias = [l for parte in pool.map(_enfileirar_lote, lotes) for l in parte]
+        duracao = time.perf_counter() - comeco
+
+        # Espera o agendador consumir todas as comandas (mais um passo depois da última)
+        prazo = time.time() + 60
+        while time.time() < prazo and (agendador.ultima_mudanca < args.comandas or passos[-1][1]["mudancas"]):
+            time.sleep(0.1)
+        parar.set()
+        fila.acordar.set()
+        for thread in threads:
+            thread.join()
+        ocupacao, estados = conferir_capacidade(caminho)
+
+    duracoes = [d for d, _ in passos]
+    maior_espera = max((r["esperando"] for _, r in passos), default=0)
+    print(f"comandas={args.comandas} processos={args.processos} sessoes={args.sessoes} aceleracao={args.aceleracao:g}x")
+    print(f"enfileirar: {args.comandas / duracao * 60:,.0f} comandas/min ({duracao:.2f}s) "
+          f"p50={_percentil(latencias, 50) * 1000:.2f}ms p99={_percentil(latencias, 99) * 1000:.2f}ms "
+          f"max={max(latencias) * 1000:.2f}ms")
+    print(f"agendador: {len(passos)} passos p50={_percentil(duracoes, 50) * 1000:.2f}ms "
+          f"max={max(duracoes) * 1000:.2f}ms, maior espera={maior_espera} comandas")
+    print(f"painel: {len(paineis)} consultas p50={_percentil(paineis, 50) * 1000:.3f}ms max={max(paineis) * 1000:.2f}ms")
+    print(f"estados finais: {estados} ocupação máxima por estação: {ocupacao}")
+
+    erros = [f"{estacao}: {ocupacao[estacao]} > {dados['capacidade']}"
+             for estacao, dados in ESTACOES.items() if ocupacao.get(estacao, 0) > dados["capacidade"]]
+    if sum(estados.values()) != args.comandas:
+        erros.append(f"{sum(estados.values())} comandas gravadas, esperado {args.comandas}")
+    if erros:
+        print("❌ ESTAÇÃO ACIMA DA CAPACIDADE / COMANDA PERDIDA: " + "; ".join(erros))
+        return 1
+    print("✅ Todas as comandas gravadas e nenhuma estação acima da capacidade")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
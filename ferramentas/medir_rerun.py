@@ -0,0 +1,68 @@
+# ferramentas/medir_rerun.py - CUSTO (CPU E BYTES ENVIADOS) DE UM CLIQUE EM ➕ NO CARDÁPIO
+# Uso: python ferramentas/medir_rerun.py [--script app.py] [--cliques 20]
+# Roda o app com o AppTest do Streamlit (sem navegador) e soma o tamanho das mensagens
+# que o servidor enviaria ao navegador. Se o app tiver o fragmento do menu, o clique é
+# executado como rerun do fragmento, do mesmo jeito que o servidor faz.
+import argparse
+import functools
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+from streamlit.runtime.forward_msg_queue import ForwardMsgQueue
+from streamlit.testing.v1 import AppTest, local_script_runner
+
+_bytes_enviados = 0
+_enqueue_original = ForwardMsgQueue.enqueue
+
+def _enqueue_contando(self, msg):
+    global _bytes_enviados
+    _bytes_enviados += msg.ByteSize()
+    return _enqueue_original(self, msg)
+
+ForwardMsgQueue.enqueue = _enqueue_contando
+_RerunData = local_script_runner.RerunData
+
+def _medir(executar):
+    global _bytes_enviados
+    _bytes_enviados = 0
+    cpu, parede = time.process_time(), time.perf_counter()
+    executar()
+    return time.process_time() - cpu, time.perf_counter() - parede, _bytes_enviados
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede CPU e bytes por clique em ➕")
+    parser.add_argument("--script", default=os.path.join(BASE_DIR, "app.py"))
+    parser.add_argument("--prato", default="Burger Classic")
+    parser.add_argument("--cliques", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    os.chdir(BASE_DIR)
+    at = AppTest.from_file(os.path.abspath(args.script), default_timeout=60)
+    cpu, parede, enviados = _medir(at.run)
+    print(f"carga inicial: cpu={cpu * 1000:.1f}ms parede={parede * 1000:.1f}ms bytes={enviados}")
+
+    fragmentos = list(getattr(at._fragment_storage, "_fragments", {}))
+    if fragmentos:
+        # Reproduz o rerun com escopo de fragmento que o servidor faz num clique dentro dele
+        local_script_runner.RerunData = functools.partial(_RerunData, fragment_id_queue=fragmentos)
+
+    total_cpu = total_parede = total_bytes = 0
+    for _ in range(args.cliques):
+        cpu, parede, enviados = _medir(lambda: at.button(key=f"mais_{args.prato}").click().run())
+        total_cpu, total_parede, total_bytes = total_cpu + cpu, total_parede + parede, total_bytes + enviados
+    local_script_runner.RerunData = _RerunData
+
+    if at.exception:
+        print(at.exception)
+        return 1
+    n = args.cliques
+    print(f"por clique ({'fragmento' if fragmentos else 'app inteiro'}): cpu={total_cpu / n * 1000:.1f}ms "
+          f"parede={total_parede / n * 1000:.1f}ms bytes={total_bytes // n}")
+    print(f"carrinho: {at.session_state.carrinho}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
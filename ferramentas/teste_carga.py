@@ -0,0 +1,206 @@
+# ferramentas/teste_carga.py - TESTE DE CARGA COM SESSÕES SIMULTÂNEAS (SEM NAVEGADOR)
+# Uso: python ferramentas/teste_carga.py --clientes 20 --admins 2 --acoes 30 --pratos 200 --ingredientes 500
+#      [--backend sqlite] [--diario] [--json resultado.json]
+# Cada sessão roda o app de verdade pelo AppTest do Streamlit, num processo próprio (o AppTest
+# troca o Runtime global a cada execução e não pode ser usado por várias threads ao mesmo tempo).
+# As sessões disputam a mesma CPU e os mesmos arquivos de dados, então a latência medida cresce
+# com o número de sessões como cresceria num servidor carregado.
+# Clientes trocam de categoria, usam ➕/➖ e finalizam pedidos; admins filtram e salvam estoque em lote.
+import argparse
+import functools
+import json
+import logging
+import multiprocessing
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from catalogo_sintetico import CATEGORIAS_PRATOS, gerar_catalogo, salvar_catalogo
+
+# =============== SESSÕES ===============
+def _percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+def _modo_fragmento(at):
+    """Cliques dentro do fragmento do menu reexecutam só o fragmento, como no servidor"""
+    from streamlit.testing.v1 import local_script_runner
+    fragmentos = list(getattr(at._fragment_storage, "_fragments", {}))
+    if fragmentos:
+        local_script_runner.RerunData = functools.partial(local_script_runner.RerunData,
+                                                          fragment_id_queue=fragmentos)
+
+def _sessao_cliente(at, acoes, aleatorio, medir):
+    medir("inicial", at.run)
+    _modo_fragmento(at)
+    for _ in range(acoes):
+        mais = [b for b in at.button if b.key and b.key.startswith("mais_") and not b.disabled]
+        # ➖ só aparece nos cards da categoria atual
+        menos = [b for b in at.button if b.key and b.key.startswith("menos_") and not b.disabled
+                 and b.key[len("menos_"):] in at.session_state.carrinho]
+        sorteio = aleatorio.random()
+        if sorteio < 0.15:
+            categoria = aleatorio.choice(CATEGORIAS_PRATOS)
+            medir("categoria", lambda: at.button(key=f"cat_{categoria}").click().run())
+        elif sorteio < 0.25 and menos:
+            botao = aleatorio.choice(menos)
+            medir("menos", lambda: botao.click().run())
+        elif sorteio < 0.35 and at.session_state.carrinho:
+            finalizar = next(b for b in at.button if b.label == "✅ Finalizar Pedido")
+            medir("finalizar", lambda: finalizar.click().run())
+        elif mais:
+            botao = aleatorio.choice(mais)
+            medir("mais", lambda: botao.click().run())
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+
+def _sessao_admin(at, acoes, aleatorio, medir):
+    # O AppTest não consegue editar o st.data_editor da grade de estoque: a gravação em lote é
+    # chamada direto (a mesma função do botão "💾 Salvar alterações") e medida junto com o rerun
+    from restaurante.indice import obter_indice
+    from restaurante.pedidos import ajustar_ingredientes
+
+    at.session_state.admin_logado = True
+    medir("admin_inicial", at.run)
+    for _ in range(acoes):
+        if aleatorio.random() < 0.3:
+            filtro = at.selectbox(key="filtro_ingredientes")
+            medir("admin_filtro", lambda: filtro.select_index(aleatorio.randrange(len(filtro.options))).run())
+        else:
+            linhas = aleatorio.sample(obter_indice().ingredientes, 5)
+            alteracoes = {ing['nome']: {"estoque": aleatorio.randint(50, 500)} for ing in linhas}
+            medir("admin_salvar", lambda: (ajustar_ingredientes(alteracoes), at.run()))
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+
+def _executar_sessao(args):
+    tipo, indice, acoes, semente, inicio = args
+    from streamlit.testing.v1 import AppTest
+
+    # Sem os avisos repetidos a cada rerun (depreciação e execução fora do servidor)
+    for nome in ("streamlit.deprecation_util", "streamlit.runtime.scriptrunner_utils.script_run_context"):
+        logging.getLogger(nome).disabled = True
+
+    os.chdir(BASE_DIR)
+    script = os.path.join(BASE_DIR, "app.py" if tipo == "cliente" else os.path.join("pages", "admin.py"))
+    at = AppTest.from_file(script, default_timeout=300)
+    aleatorio = random.Random(semente * 1000 + indice)
+    tempos = []
+
+    def medir(acao, executar):
+        comeco = time.perf_counter()
+        executar()
+        tempos.append((acao, time.perf_counter() - comeco))
+
+    # Todas as sessões começam juntas (o import do Streamlit fica fora da medição)
+    time.sleep(max(0.0, inicio - time.time()))
+    erro = None
+    try:
+        (_sessao_cliente if tipo == "cliente" else _sessao_admin)(at, acoes, aleatorio, medir)
+    except Exception as e:
+        erro = f"{tipo} {indice}: {type(e).__name__}: {e}"
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return tipo, tempos, rss_kb, erro
+
+def _iniciar_processo(ambiente):
+    os.environ.update(ambiente)
+
+# =============== RELATÓRIO ===============
+def _resumo(tempos):
+    return {
+        "n": len(tempos),
+        "p50_ms": round(_percentil(tempos, 50) * 1000, 1),
+        "p95_ms": round(_percentil(tempos, 95) * 1000, 1),
+        "p99_ms": round(_percentil(tempos, 99) * 1000, 1),
+        "max_ms": round(max(tempos, default=0) * 1000, 1),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sessões simultâneas de clientes e admins contra um catálogo sintético")
+    parser.add_argument("--clientes", type=int, default=10)
+    parser.add_argument("--admins", type=int, default=1)
+    parser.add_argument("--acoes", type=int, default=20, help="interações por sessão")
+    parser.add_argument("--pratos", type=int, default=100)
+    parser.add_argument("--ingredientes", type=int, default=200)
+    parser.add_argument("--backend", choices=["json", "sqlite"], default="json")
+    parser.add_argument("--diario", action="store_true", help="baixa o estoque pelo diário de movimentos")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--json", help="grava o resultado neste arquivo")
+    args = parser.parse_args(argv)
+
+    from restaurante import armazenamento
+
+    pasta = tempfile.mkdtemp(prefix="carga-")
+    try:
+        pratos, ingredientes = gerar_catalogo(args.pratos, args.ingredientes, semente=args.semente)
+        ambiente = {"BURGER_DADOS": pasta, "BURGER_ARMAZENAMENTO": args.backend}
+        if args.backend == "sqlite":
+            ambiente["BURGER_BANCO"] = os.path.join(pasta, "carga.db")
+            backend = armazenamento.ArmazenamentoSQLite(ambiente["BURGER_BANCO"])
+        else:
+            backend = armazenamento.ArmazenamentoJSON(pasta)
+        if args.diario:
+            ambiente["BURGER_DIARIO"] = os.path.join(pasta, "diario")
+        salvar_catalogo(backend, pratos, ingredientes)
+
+        sessoes = [("cliente", i) for i in range(args.clientes)] + [("admin", i) for i in range(args.admins)]
+        print(f"🧪 {args.clientes} clientes + {args.admins} admins x {args.acoes} ações | "
+              f"{args.pratos} pratos, {args.ingredientes} ingredientes | backend={args.backend}"
+              f"{' + diário' if args.diario else ''}")
+
+        contexto = multiprocessing.get_context("spawn")
+        with contexto.Pool(len(sessoes), initializer=_iniciar_processo, initargs=(ambiente,)) as pool:
+            # Margem para os processos subirem antes da largada
+            inicio = time.time() + 5 + 0.1 * len(sessoes)
+            tarefas = [(tipo, i, args.acoes, args.semente, inicio) for tipo, i in sessoes]
+            resultados = pool.map(_executar_sessao, tarefas)
+            duracao = time.time() - inicio
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+    por_acao, todos, erros = {}, [], []
+    rss = {"cliente": [], "admin": []}
+    for tipo, tempos, rss_kb, erro in resultados:
+        rss[tipo].append(rss_kb)
+        if erro:
+            erros.append(erro)
+        for acao, segundos in tempos:
+            por_acao.setdefault(acao, []).append(segundos)
+            todos.append(segundos)
+
+    resultado = {
+        "config": vars(args),
+        "duracao_s": round(duracao, 2),
+        "reruns": len(todos),
+        "reruns_por_s": round(len(todos) / duracao, 1) if duracao > 0 else 0,
+        "geral": _resumo(todos),
+        "acoes": {acao: _resumo(t) for acao, t in sorted(por_acao.items())},
+        "rss_pico_mb": {tipo: round(max(v) / 1024, 1) for tipo, v in rss.items() if v},
+        "erros": erros,
+    }
+
+    print(f"⏱️  {resultado['reruns']} reruns em {resultado['duracao_s']}s ({resultado['reruns_por_s']}/s)")
+    print(f"{'ação':<15}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for acao, r in [("geral", resultado["geral"])] + list(resultado["acoes"].items()):
+        print(f"{acao:<15}{r['n']:>6}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{r['max_ms']:>10}")
+    print("💾 RSS de pico por sessão: " + ", ".join(f"{t}={mb} MB" for t, mb in resultado["rss_pico_mb"].items()))
+    for erro in erros:
+        print(f"❌ {erro}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2)
+    return 1 if erros else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
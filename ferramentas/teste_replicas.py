@@ -0,0 +1,182 @@
+# ferramentas/teste_replicas.py - PROPAGAÇÃO DE ALTERAÇÕES DO CATÁLOGO ENTRE PROCESSOS
+# Uso: python ferramentas/teste_replicas.py [--replicas 4] [--alteracoes 20] [--externas 5] [--backend sqlite]
+# Sobe N processos réplicas, cada um com seu cache quente do catálogo (e a matriz de custos derivada
+# dele), e altera o custo de um ingrediente pelo app (transação) e por fora (arquivo reescrito à
+# mão, só JSON). Cada réplica anota quando passou a enxergar cada valor; falha se alguma demorar
+# mais que o limite (alterações pelo app) ou que BURGER_VERIFICACAO + limite (alterações por fora).
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import random
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from catalogo_sintetico import gerar_catalogo, salvar_catalogo
+from restaurante import armazenamento, catalogo
+
+MARCADOR = "Ingrediente 00000"  # ingrediente cujo custo carrega o número da alteração
+
+def criar_backend(tipo, pasta):
+    if tipo == "sqlite":
+        return armazenamento.ArmazenamentoSQLite(os.path.join(pasta, "replicas.db"))
+    return armazenamento.ArmazenamentoJSON(pasta)
+
+def _replica(numero, tipo, pasta, pausa, resultados, parar):
+    from restaurante.custos import obter_custos
+
+    armazenamento.configurar(criar_backend(tipo, pasta))
+    vistos = {}  # valor do marcador -> instante em que a réplica o viu pela primeira vez
+    leituras = 0
+    while not parar.is_set():
+        custos = obter_custos()  # passa por catalogo.ler_tabela e pelas matrizes em cache
+        valor = int(custos.custos_unitarios[custos.receitas.coluna[MARCADOR]])
+        if valor not in vistos:
+            vistos[valor] = time.time()
+            resultados.put(("visto", numero, valor, vistos[valor]))
+        leituras += 1
+        time.sleep(pausa)
+    resultados.put(("fim", numero, leituras, None))
+
+def _alterar_por_fora(pasta, valor):
+    """Reescreve ingredientes.json sem passar pelo armazenamento (como um editor faria)"""
+    caminho = os.path.join(pasta, "ingredientes.json")
+    with open(caminho, "r", encoding="utf-8") as f:
+        ingredientes = json.load(f)
+    for ing in ingredientes:
+        if ing["nome"] == MARCADOR:
+            ing["custo"] = valor
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(ingredientes, f, ensure_ascii=False, indent=2)
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))] if ordenados else 0.0
+
+def _custo_por_chamada(funcao, repeticoes=100_000):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - inicio) / repeticoes * 1e6
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Réplicas com cache quente enxergando alterações do catálogo")
+    parser.add_argument("--replicas", type=int, default=4)
+    parser.add_argument("--alteracoes", type=int, default=20, help="alterações pelo app (transação)")
+    parser.add_argument("--externas", type=int, default=5, help="alterações por fora do app (só JSON)")
+    parser.add_argument("--pratos", type=int, default=500)
+    parser.add_argument("--ingredientes", type=int, default=1000)
+    parser.add_argument("--backend", choices=["json", "sqlite"], default="json")
+    parser.add_argument("--intervalo", type=float, default=0.5, help="BURGER_VERIFICACAO das réplicas (s)")
+    parser.add_argument("--pausa", type=float, default=0.005, help="pausa entre leituras de cada réplica (s)")
+    parser.add_argument("--limite", type=float, default=0.5, help="atraso máximo aceito além do intervalo (s)")
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args(argv)
+    externas = args.externas if args.backend == "json" else 0
+
+    os.environ["BURGER_VERIFICACAO"] = str(args.intervalo)  # herdado pelas réplicas (spawn)
+    aleatorio = random.Random(args.semente)
+    with tempfile.TemporaryDirectory() as pasta:
+        pratos, ingredientes = gerar_catalogo(args.pratos, args.ingredientes, semente=args.semente)
+        for ing in ingredientes:
+            if ing["nome"] == MARCADOR:
+                ing["custo"] = 0
+        backend = criar_backend(args.backend, pasta)
+        salvar_catalogo(backend, pratos, ingredientes)
+
+        contexto = multiprocessing.get_context("spawn")
+        resultados, parar = contexto.Queue(), contexto.Event()
+        replicas = [contexto.Process(target=_replica, args=(n, args.backend, pasta, args.pausa, resultados, parar))
+                    for n in range(args.replicas)]
+        for processo in replicas:
+            processo.start()
+
+        vistos = {n: {} for n in range(args.replicas)}
+        leituras = {}
+
+        def receber(ate):
+            while True:
+                try:
+                    tipo, numero, valor, instante = resultados.get(timeout=max(0.0, ate - time.time()))
+                except queue.Empty:
+                    return
+                if tipo == "visto":
+                    vistos[numero][valor] = instante
+                else:
+                    leituras[numero] = valor
+
+        def todas_viram(valor):
+            return all(valor in vistos[n] for n in vistos)
+
+        # Espera as réplicas carregarem o catálogo (valor 0)
+        prazo = time.time() + 60
+        while not todas_viram(0) and time.time() < prazo:
+            receber(time.time() + 0.1)
+
+        # Alterações intercaladas: pelo app e por fora; o instante vale depois da gravação
+        plano = ["app"] * args.alteracoes + ["externa"] * externas
+        aleatorio.shuffle(plano)
+        gravados = {}
+        for valor, origem in enumerate(plano, 1):
+            if origem == "app":
+                with backend.transacao() as tx:
+                    tx.atualizar("ingredientes", MARCADOR, {"custo": valor})
+            else:
+                _alterar_por_fora(pasta, valor)
+            gravados[valor] = (origem, time.time())
+            # Espera todas verem antes da próxima (senão uma réplica pode pular um valor)
+            prazo = time.time() + args.intervalo + args.limite + 5
+            while not todas_viram(valor) and time.time() < prazo:
+                receber(time.time() + 0.05)
+            receber(time.time() + aleatorio.uniform(0.05, 0.2))
+
+        parar.set()
+        prazo = time.time() + 10
+        while len(leituras) < args.replicas and time.time() < prazo:
+            receber(time.time() + 0.1)
+        for processo in replicas:
+            processo.join(timeout=5)
+
+        # Custo da revalidação por leitura no processo principal (cache quente)
+        armazenamento.configurar(backend)
+        catalogo.ler_tabela("ingredientes")
+        custo_assinatura = _custo_por_chamada(lambda: backend.assinatura("ingredientes"))
+        custo_versao = _custo_por_chamada(lambda: backend.versao("ingredientes"))
+        custo_leitura = _custo_por_chamada(lambda: catalogo.ler_tabela("ingredientes"))
+
+    atrasos = {"app": [], "externa": []}
+    erros = []
+    for valor, (origem, gravado) in gravados.items():
+        limite = args.limite + (args.intervalo if origem == "externa" else 0)
+        for n in range(args.replicas):
+            if valor not in vistos[n]:
+                erros.append(f"réplica {n} nunca viu a alteração {valor} ({origem})")
+                continue
+            atraso = max(0.0, vistos[n][valor] - gravado)
+            atrasos[origem].append(atraso)
+            if atraso > limite:
+                erros.append(f"réplica {n} viu a alteração {valor} ({origem}) depois de {atraso * 1000:.0f} ms")
+
+    print(f"backend={args.backend} replicas={args.replicas} alteracoes={args.alteracoes} externas={externas} "
+          f"intervalo={args.intervalo}s pausa={args.pausa * 1000:.0f}ms")
+    for origem, valores in atrasos.items():
+        if valores:
+            print(f"atraso {origem:8s} p50={_percentil(valores, 50) * 1000:.1f}ms "
+                  f"p95={_percentil(valores, 95) * 1000:.1f}ms max={max(valores) * 1000:.1f}ms ({len(valores)} observações)")
+    print(f"leituras por réplica: {sorted(leituras.values())}")
+    print(f"revalidação por leitura: assinatura {custo_assinatura:.2f}µs, versão compartilhada {custo_versao:.2f}µs, "
+          f"ler_tabela com cache quente {custo_leitura:.2f}µs")
+    if erros:
+        print("❌ ALTERAÇÃO NÃO PROPAGADA A TEMPO: " + "; ".join(erros[:10]))
+        return 1
+    print("✅ Todas as réplicas viram todas as alterações dentro do limite")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,155 +1,169 @@
 # pages/admin.py - PAINEL ADMIN COM CONTROLE DE INGREDIENTES
 import streamlit as st
-import json
+import csv
+import io
 import os
-import base64
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
 
 st.set_page_config(page_title="Admin • Burger Express", page_icon="🔒", layout="centered")
 
 # =============== CONFIGURAÇÃO DE CAMINHOS ===============
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-PRATOS_FILE = os.path.join(BASE_DIR, "pratos.json")
-ESTOQUE_FILE = os.path.join(BASE_DIR, "estoque.json")
-INGREDIENTES_FILE = os.path.join(BASE_DIR, "ingredientes.json")
-IMAGES_DIR = os.path.join(BASE_DIR, "images")
-BACKGROUND_IMAGE = os.path.join(BASE_DIR, "images", "background-login.jpg")
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from restaurante import armazenamento, catalogo, estaticos, imagens, metricas, perfil, previsao, producao
+from restaurante.diario import obter_diario
+from restaurante.disponibilidade import obter_disponibilidade
+from restaurante.indice import obter_indice
+from restaurante.busca import normalizar, obter_busca_ingredientes
+from restaurante.custos import obter_custos
+from restaurante.pedidos import ajustar_ingredientes, receber_entrega
 
-# Função para converter imagem em base64
-def get_base64_image(image_path):
-    if os.path.exists(image_path):
-        with open(image_path, "rb") as img_file:
-            return base64.b64encode(img_file.read()).decode()
-    return None
+perfil.iniciar("pages/admin.py")
+previsao.iniciar_periodico()
+
+BACKGROUND_IMAGE = os.path.join(BASE_DIR, "images", "background-login.jpg")
 
 # =============== FUNÇÕES AUXILIARES ===============
-def verificar_disponibilidade_prato(prato, ingredientes):
+def verificar_disponibilidade_prato(prato, disponibilidade):
     """Verifica se há ingredientes suficientes para fazer o prato"""
-    faltantes = []
-    for ing_prato in prato.get('ingredientes', []):
-        ingrediente = next((i for i in ingredientes if i['nome'] == ing_prato['nome']), None)
-        if not ingrediente or ingrediente['estoque'] < ing_prato['quantidade']:
-            faltantes.append(ing_prato['nome'])
+    faltantes = list(disponibilidade.faltantes(prato['nome']))
     return len(faltantes) == 0, faltantes
 
-def calcular_custo_prato(prato, ingredientes):
-    """Calcula custo estimado baseado nos ingredientes (valores fictícios)"""
-    precos_ingredientes = {
-        "Pão de Hambúrguer": 1.50, "Pão Brioche": 2.00, "Carne Bovina 180g": 6.00,
-        "Queijo Cheddar": 1.50, "Queijo Mussarela": 1.20, "Bacon": 2.00,
-        "Alface": 0.50, "Tomate": 0.30, "Cebola Roxa": 0.20, "Molho Especial": 1.00,
-        "Maionese": 0.80, "Ketchup": 0.30, "Mostarda": 0.30, "Batata Palha": 1.50,
-        "Coca-Cola 2L": 8.00, "Guaraná 2L": 7.00
-    }
+def numero(valor):
+    """Número vindo da grade/CSV como int quando for inteiro (o JSON guarda 10, não 10.0)"""
+    valor = float(valor)
+    return int(valor) if valor.is_integer() else valor
+
+def ler_nota_entrega(conteudo, indice):
+    """Lê o CSV de uma nota de entrega (nome, quantidade). Devolve ({ingrediente: quantidade}, erros)"""
+    texto = conteudo.decode("utf-8-sig", errors="replace")
+    try:
+        dialeto = csv.Sniffer().sniff(texto[:4096], delimiters=",;\t")
+    except csv.Error:
+        dialeto = csv.excel
+    linhas = [(numero_linha, linha) for numero_linha, linha in enumerate(csv.reader(io.StringIO(texto), dialeto), 1)
+              if any(c.strip() for c in linha)]
+    if not linhas:
+        return {}, ["❌ Arquivo vazio"]
     
-    custo_total = 0
-    for ing_prato in prato.get('ingredientes', []):
-        preco_unitario = precos_ingredientes.get(ing_prato['nome'], 1.00)
-        custo_total += preco_unitario * ing_prato['quantidade']
+    # Cabeçalho opcional: procura as colunas pelo nome; sem cabeçalho, nome e quantidade são as duas primeiras
+    col_nome, col_qtd = 0, 1
+    cabecalho = [normalizar(c.strip()) for c in linhas[0][1]]
+    if any(c in ("nome", "ingrediente", "produto") for c in cabecalho):
+        col_nome = next(i for i, c in enumerate(cabecalho) if c in ("nome", "ingrediente", "produto"))
+        col_qtd = next((i for i, c in enumerate(cabecalho) if c in ("quantidade", "qtd", "qtde")), 1)
+        linhas = linhas[1:]
     
-    return custo_total
+    por_nome = {normalizar(ing['nome']): ing['nome'] for ing in indice.ingredientes}
+    entradas, erros = {}, []
+    for numero_linha, linha in linhas:
+        if len(linha) <= max(col_nome, col_qtd):
+            erros.append(f"Linha {numero_linha}: faltam colunas")
+            continue
+        nome = por_nome.get(normalizar(linha[col_nome].strip()))
+        if nome is None:
+            erros.append(f"Linha {numero_linha}: ingrediente '{linha[col_nome].strip()}' não cadastrado")
+            continue
+        try:
+            quantidade = numero(linha[col_qtd].strip().replace(",", "."))
+        except ValueError:
+            erros.append(f"Linha {numero_linha}: quantidade inválida '{linha[col_qtd].strip()}'")
+            continue
+        if quantidade <= 0:
+            erros.append(f"Linha {numero_linha}: quantidade deve ser positiva")
+            continue
+        entradas[nome] = entradas.get(nome, 0) + quantidade
+    return entradas, erros
+
+# =============== MONTADOR DE RECEITAS ===============
+# A receita em edição fica em st.session_state[chave] ({ingrediente: quantidade}). A busca usa o
+# índice de ingredientes e só os ingredientes escolhidos viram widgets, então o custo de
+# desenhar o montador não cresce com o catálogo
+LIMITE_SUGESTOES = 20
+
+@perfil.callback("pages/admin.py")
+def adicionar_ingrediente(chave):
+    escolhido = st.session_state[f"{chave}_escolha"]
+    if escolhido is not None:
+        st.session_state[chave].setdefault(escolhido, 1)
+        st.session_state[f"{chave}_escolha"] = None
+
+@perfil.callback("pages/admin.py")
+def remover_ingrediente(chave, nome):
+    st.session_state[chave].pop(nome, None)
+
+@st.fragment
+@perfil.fragmento("pages/admin.py (receita)")
+def montar_receita(chave, receita_inicial=()):
+    """Busca de ingredientes + quantidades dos escolhidos; adicionar/remover reexecuta só este trecho"""
+    if chave not in st.session_state:
+        st.session_state[chave] = {ing['nome']: ing['quantidade'] for ing in receita_inicial}
+    receita = st.session_state[chave]
+    indice = obter_indice()
+
+    col_busca, col_escolha = st.columns(2)
+    with col_busca:
+        termo = st.text_input("Buscar ingrediente", key=f"{chave}_busca", placeholder="Ex: queijo").strip()
+    encontrados = obter_busca_ingredientes().buscar(termo) if termo else ()
+    with col_escolha:
+        st.selectbox(
+            "Adicionar à receita",
+            [ing['nome'] for ing in encontrados[:LIMITE_SUGESTOES] if ing['nome'] not in receita],
+            index=None,
+            placeholder=f"{len(encontrados)} encontrado(s)" if termo else "Digite para buscar",
+            key=f"{chave}_escolha",
+            on_change=adicionar_ingrediente,
+            args=(chave,),
+        )
+
+    if not receita:
+        st.caption("Nenhum ingrediente na receita.")
+    for nome, quantidade in list(receita.items()):
+        col_nome, col_qtd, col_remover = st.columns([3, 1, 1])
+        with col_nome:
+            st.write(f"{nome} ({indice.unidade(nome)})")
+        with col_qtd:
+            receita[nome] = st.number_input("Qtd", min_value=1 if isinstance(quantidade, int) else 0.01,
+                                            value=quantidade, key=f"{chave}_qtd_{nome}",
+                                            label_visibility="collapsed")
+        with col_remover:
+            st.button("❌", key=f"{chave}_remover_{nome}", on_click=remover_ingrediente, args=(chave, nome))
+
+def receita_para_prato(receita):
+    return [{"nome": nome, "quantidade": quantidade} for nome, quantidade in receita.items()]
+
+@perfil.callback("pages/admin.py")
+def editar_prato(nome):
+    st.session_state.prato_editando = nome
+
+@perfil.callback("pages/admin.py")
+def encerrar_edicao():
+    nome = st.session_state.pop("prato_editando", None)
+    st.session_state.pop(f"receita_{nome}", None)
 
 # =============== FUNÇÕES DE DADOS ===============
+# As funções abaixo devolvem cópias editáveis do snapshot compartilhado pelo processo;
+# as gravações passam por armazenamento.obter().transacao(), registro a registro
 def carregar_ingredientes():
-    if os.path.exists(INGREDIENTES_FILE):
-        try:
-            with open(INGREDIENTES_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except:
-            return []
-    else:
-        ingredientes_iniciais = [
-            {"nome": "Pão de Hambúrguer", "categoria": "paes", "unidade": "unidade", "estoque": 100, "minimo": 20},
-            {"nome": "Pão Brioche", "categoria": "paes", "unidade": "unidade", "estoque": 80, "minimo": 15},
-            {"nome": "Carne Bovina 180g", "categoria": "carnes", "unidade": "unidade", "estoque": 50, "minimo": 10},
-            {"nome": "Queijo Cheddar", "categoria": "queijos", "unidade": "fatia", "estoque": 200, "minimo": 30},
-            {"nome": "Queijo Mussarela", "categoria": "queijos", "unidade": "fatia", "estoque": 150, "minimo": 25},
-            {"nome": "Bacon", "categoria": "complementos", "unidade": "fatia", "estoque": 120, "minimo": 20},
-            {"nome": "Alface", "categoria": "saladas", "unidade": "porção", "estoque": 30, "minimo": 5},
-            {"nome": "Tomate", "categoria": "saladas", "unidade": "fatia", "estoque": 100, "minimo": 15},
-            {"nome": "Cebola Roxa", "categoria": "saladas", "unidade": "fatia", "estoque": 80, "minimo": 10},
-            {"nome": "Molho Especial", "categoria": "molhos", "unidade": "porção", "estoque": 50, "minimo": 8},
-            {"nome": "Maionese", "categoria": "molhos", "unidade": "porção", "estoque": 40, "minimo": 6},
-            {"nome": "Ketchup", "categoria": "molhos", "unidade": "sache", "estoque": 200, "minimo": 30},
-            {"nome": "Mostarda", "categoria": "molhos", "unidade": "sache", "estoque": 180, "minimo": 25},
-            {"nome": "Batata Palha", "categoria": "acompanhamentos", "unidade": "porção", "estoque": 25, "minimo": 5},
-            {"nome": "Coca-Cola 2L", "categoria": "bebidas", "unidade": "unidade", "estoque": 30, "minimo": 6},
-            {"nome": "Guaraná 2L", "categoria": "bebidas", "unidade": "unidade", "estoque": 25, "minimo": 5},
-        ]
-        with open(INGREDIENTES_FILE, "w", encoding="utf-8") as f:
-            json.dump(ingredientes_iniciais, f, ensure_ascii=False, indent=2)
-        return ingredientes_iniciais
+    return catalogo.editavel(catalogo.carregar_ingredientes())
 
 def carregar_estoque():
-    if os.path.exists(ESTOQUE_FILE):
-        try:
-            with open(ESTOQUE_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except:
-            return {}
-    else:
-        return {}
+    return catalogo.editavel(catalogo.carregar_estoque())
 
 def carregar_pratos():
-    if os.path.exists(PRATOS_FILE):
-        try:
-            with open(PRATOS_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception as e:
-            st.error(f"❌ Erro ao carregar pratos: {e}")
-            return []
-    else:
-        pratos_iniciais = [
-            {
-                "nome": "Burger Classic", 
-                "preco": 18.90, 
-                "cat": "hamburgers", 
-                "img": "burger-classic.jpg",
-                "ingredientes": [
-                    {"nome": "Pão de Hambúrguer", "quantidade": 1},
-                    {"nome": "Carne Bovina 180g", "quantidade": 1},
-                    {"nome": "Queijo Cheddar", "quantidade": 1},
-                    {"nome": "Alface", "quantidade": 1},
-                    {"nome": "Tomate", "quantidade": 2},
-                    {"nome": "Molho Especial", "quantidade": 1}
-                ]
-            },
-            {
-                "nome": "Burger Bacon", 
-                "preco": 22.90, 
-                "cat": "hamburgers", 
-                "img": "burger-bacon.jpg",
-                "ingredientes": [
-                    {"nome": "Pão Brioche", "quantidade": 1},
-                    {"nome": "Carne Bovina 180g", "quantidade": 1},
-                    {"nome": "Queijo Cheddar", "quantidade": 2},
-                    {"nome": "Bacon", "quantidade": 3},
-                    {"nome": "Alface", "quantidade": 1},
-                    {"nome": "Molho Especial", "quantidade": 1}
-                ]
-            },
-            {
-                "nome": "Double Cheese", 
-                "preco": 26.90, 
-                "cat": "hamburgers", 
-                "img": "cheese-duplo.jpg",
-                "ingredientes": [
-                    {"nome": "Pão de Hambúrguer", "quantidade": 1},
-                    {"nome": "Carne Bovina 180g", "quantidade": 2},
-                    {"nome": "Queijo Cheddar", "quantidade": 2},
-                    {"nome": "Queijo Mussarela", "quantidade": 2},
-                    {"nome": "Cebola Roxa", "quantidade": 3},
-                    {"nome": "Molho Especial", "quantidade": 1}
-                ]
-            },
-        ]
-        with open(PRATOS_FILE, "w", encoding="utf-8") as f:
-            json.dump(pratos_iniciais, f, ensure_ascii=False, indent=2)
-        return pratos_iniciais
+    return catalogo.editavel(catalogo.carregar_pratos())
 
-# Carregar imagem de background
-background_b64 = get_base64_image(BACKGROUND_IMAGE)
-if background_b64:
-    background_css = f"url('data:image/jpeg;base64,{background_b64}')"
+# Imagem de background: preparada uma vez por processo; com o static serving ligado
+# o CSS só leva a URL versionada em vez da imagem inteira em base64
+background_url = estaticos.url_imagem(BACKGROUND_IMAGE, servir_estatico=st.get_option("server.enableStaticServing"))
+if background_url:
+    background_css = f"url('{background_url}')"
 else:
     background_css = "url('https://images.unsplash.com/photo-1553979459-d2229ba7433b?ixlib=rb-4.0.3&auto=format&fit=crop&w=1350&q=80')"
 
@@ -274,20 +288,34 @@ if not st.session_state.admin_logado:
 else:
     st.markdown("<h1 style='color:white;text-align:center;margin-bottom:30px;text-shadow: 2px 2px 4px rgba(0,0,0,0.5);'>🍔 Painel Administrativo - Controle Completo</h1>", unsafe_allow_html=True)
     
+    # Catálogo ausente ou corrompido: erro com o arquivo e o problema; se há versão boa, ela continua no ar
+    try:
+        catalogo.verificar()
+    except catalogo.CatalogoInvalido as erro:
+        st.error(f"❌ Catálogo inválido: {erro}. Corrija e recarregue a página.")
+        perfil.concluir()
+        st.stop()
+    for tabela, erro in catalogo.problemas().items():
+        st.warning(f"⚠️ {erro}. Servindo a última versão válida de {tabela} até o arquivo ser corrigido.")
+
     # Carregar dados
-    ingredientes = carregar_ingredientes()
-    pratos = carregar_pratos()
-    estoque_pratos = carregar_estoque()
+    with metricas.span("admin.dados"):
+        ingredientes = carregar_ingredientes()
+        pratos = carregar_pratos()
+        estoque_pratos = carregar_estoque()
+        indice = obter_indice()
+        disponibilidade = obter_disponibilidade()
     
     # =============== ABA DE INGREDIENTES ===============
-    tab1, tab2, tab3 = st.tabs(["📦 Controle de Ingredientes", "🍔 Gestão de Pratos", "📊 Estoque & Relatórios"])
+    tab1, tab2, tab3, tab4 = st.tabs(["📦 Controle de Ingredientes", "🍔 Gestão de Pratos",
+                                      "📊 Estoque & Relatórios", "⏱️ Performance"])
     
-    with tab1:
+    with tab1, metricas.span("admin.ingredientes"):
         st.subheader("🧮 Controle de Ingredientes")
         
         # Formulário para novo ingrediente
         with st.form("novo_ingrediente"):
-            col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+            col1, col2, col3, col4, col5 = st.columns([2, 1, 1, 1, 1])
             with col1:
                 novo_nome = st.text_input("Nome do Ingrediente", placeholder="Ex: Pão Brioche")
             with col2:
@@ -297,6 +325,9 @@ else:
                 nova_unidade = st.selectbox("Unidade", ["unidade", "kg", "litro", "fatia", "porção", "sache", "gramas"])
             with col4:
                 novo_estoque = st.number_input("Estoque Inicial", min_value=0, value=10)
+            with col5:
+                novo_custo = st.number_input("Custo (R$)", min_value=0.0, value=1.0, step=0.1, format="%.2f",
+                                             help="Custo de uma unidade do ingrediente")
             
             if st.form_submit_button("➕ Adicionar Ingrediente"):
                 if novo_nome:
@@ -309,82 +340,127 @@ else:
                             "categoria": nova_categoria,
                             "unidade": nova_unidade,
                             "estoque": novo_estoque,
-                            "minimo": 5
+                            "minimo": 5,
+                            "custo": round(novo_custo, 2)
                         }
                         ingredientes.append(novo_ingrediente)
-                        with open(INGREDIENTES_FILE, "w", encoding="utf-8") as f:
-                            json.dump(ingredientes, f, ensure_ascii=False, indent=2)
+                        with armazenamento.obter().transacao() as tx:
+                            tx.gravar("ingredientes", novo_nome, novo_ingrediente)
                         st.success(f"✅ {novo_nome} adicionado!")
                         st.rerun()
                 else:
                     st.error("❌ Digite o nome do ingrediente")
         
-        # Lista de ingredientes por categoria
-        categorias_ing = list(set(ing['categoria'] for ing in ingredientes))
-        for categoria in categorias_ing:
-            st.subheader(f"📁 {categoria.title()}")
-            ingredientes_cat = [ing for ing in ingredientes if ing['categoria'] == categoria]
+        # =============== ESTOQUE EM LOTE ===============
+        # Uma única grade (em vez de dois campos e botões por ingrediente); só as linhas alteradas
+        # são gravadas, todas juntas, quando o formulário é enviado
+        st.subheader("📋 Estoque dos Ingredientes")
+        aviso = st.session_state.pop("aviso_ingredientes", None)
+        if aviso:
+            st.success(aviso)
+        
+        categorias_ing = sorted(set(ing['categoria'] for ing in ingredientes))
+        filtro = st.selectbox("Categoria", ["todas"] + categorias_ing, format_func=str.title, key="filtro_ingredientes")
+        visiveis = [ing for ing in ingredientes if filtro == "todas" or ing['categoria'] == filtro]
+        
+        with st.form("estoque_em_lote"):
+            grade = pd.DataFrame([{
+                "nome": ing['nome'],
+                "categoria": ing['categoria'],
+                "unidade": ing['unidade'],
+                "estoque": ing['estoque'],
+                "minimo": ing['minimo'],
+                "custo": ing.get('custo'),
+                "nivel": min(ing['estoque'] / ing['minimo'] * 100, 100) if ing['minimo'] > 0 else 0,
+            } for ing in visiveis], columns=["nome", "categoria", "unidade", "estoque", "minimo", "custo", "nivel"])
+            editado = st.data_editor(
+                grade,
+                column_config={
+                    "nome": st.column_config.TextColumn("Ingrediente"),
+                    "categoria": st.column_config.TextColumn("Categoria"),
+                    "unidade": st.column_config.TextColumn("Unidade"),
+                    "estoque": st.column_config.NumberColumn("Estoque", min_value=0, required=True),
+                    "minimo": st.column_config.NumberColumn("Mínimo", min_value=1, required=True),
+                    "custo": st.column_config.NumberColumn("Custo (R$)", min_value=0, format="%.2f"),
+                    "nivel": st.column_config.ProgressColumn("Nível", min_value=0, max_value=100, format="%.0f%%"),
+                },
+                disabled=["nome", "categoria", "unidade", "nivel"],
+                hide_index=True,
+                use_container_width=True,
+                key="grade_estoque",
+            )
             
-            for i, ingrediente in enumerate(ingredientes_cat):
-                col1, col2, col3, col4, col5 = st.columns([3, 1, 1, 1, 1])
-                
-                with col1:
-                    st.write(f"**{ingrediente['nome']}**")
-                    st.caption(f"Unidade: {ingrediente['unidade']}")
-                
-                with col2:
-                    novo_estoque = st.number_input(
-                        "Estoque",
-                        min_value=0,
-                        value=ingrediente['estoque'],
-                        key=f"est_{ingrediente['nome']}",
-                        label_visibility="collapsed"
-                    )
-                
-                with col3:
-                    novo_minimo = st.number_input(
-                        "Mínimo",
-                        min_value=1,
-                        value=ingrediente['minimo'],
-                        key=f"min_{ingrediente['nome']}",
-                        label_visibility="collapsed"
-                    )
-                
-                with col4:
-                    if st.button("💾", key=f"save_ing_{ingrediente['nome']}"):
-                        ingredientes[i]['estoque'] = novo_estoque
-                        ingredientes[i]['minimo'] = novo_minimo
-                        with open(INGREDIENTES_FILE, "w", encoding="utf-8") as f:
-                            json.dump(ingredientes, f, ensure_ascii=False, indent=2)
-                        st.success("✅ Atualizado!")
-                        st.rerun()
+            if st.form_submit_button("💾 Salvar alterações", type="primary"):
+                alteracoes = {}
+                for original, linha in zip(visiveis, editado.to_dict("records")):
+                    campos = {campo: numero(linha[campo]) for campo in ("estoque", "minimo")
+                              if numero(linha[campo]) != original[campo]}
+                    if not pd.isna(linha["custo"]) and numero(round(linha["custo"], 2)) != original.get('custo'):
+                        campos["custo"] = numero(round(linha["custo"], 2))
+                    if campos:
+                        alteracoes[original['nome']] = campos
+                if alteracoes:
+                    # Uma transação para todas as linhas (o estoque passa pelo diário se ligado)
+                    ajustar_ingredientes(alteracoes)
+                    st.session_state.aviso_ingredientes = f"✅ {len(alteracoes)} ingrediente(s) atualizado(s)!"
+                    st.rerun()
+                else:
+                    st.info("Nenhuma alteração para salvar.")
+        
+        # Exclusão
+        col_excluir, col_botao = st.columns([3, 1])
+        with col_excluir:
+            excluir = st.selectbox("Excluir ingrediente", [ing['nome'] for ing in visiveis], index=None,
+                                   placeholder="Escolha um ingrediente", key="excluir_ingrediente")
+        with col_botao:
+            st.write("")
+            if st.button("🗑️ Excluir", key="del_ing", disabled=excluir is None, use_container_width=True):
+                # Verifica se o ingrediente está sendo usado em algum prato
+                usado_em = list(disponibilidade.usado_em(excluir))
                 
-                with col5:
-                    if st.button("🗑️", key=f"del_ing_{ingrediente['nome']}"):
-                        # Verifica se o ingrediente está sendo usado em algum prato
-                        usado_em = []
-                        for prato in pratos:
-                            if any(ing['nome'] == ingrediente['nome'] for ing in prato.get('ingredientes', [])):
-                                usado_em.append(prato['nome'])
-                        
-                        if usado_em:
-                            st.error(f"❌ Não pode excluir! Usado em: {', '.join(usado_em)}")
-                        else:
-                            ingredientes.pop(i)
-                            with open(INGREDIENTES_FILE, "w", encoding="utf-8") as f:
-                                json.dump(ingredientes, f, ensure_ascii=False, indent=2)
-                            st.rerun()
+                if usado_em:
+                    st.error(f"❌ Não pode excluir! Usado em: {', '.join(usado_em)}")
+                else:
+                    with armazenamento.obter().transacao() as tx:
+                        tx.remover("ingredientes", excluir)
+                    st.rerun()
+        
+        # =============== NOTA DE ENTREGA (CSV) ===============
+        st.subheader("📄 Entrada por Nota de Entrega")
+        st.caption("CSV com as colunas nome e quantidade (separadas por vírgula ou ponto e vírgula); "
+                   "as quantidades são somadas ao estoque atual.")
+        nota = st.file_uploader("Nota de entrega", type=["csv"], key="nota_entrega")
+        if nota is not None:
+            conteudo = nota.getvalue()
+            entradas, erros = ler_nota_entrega(conteudo, indice)
+            for erro in erros:
+                st.warning(erro)
+            if entradas:
+                st.dataframe([{
+                    "ingrediente": nome,
+                    "estoque atual": indice.ingrediente(nome)['estoque'],
+                    "entrada": quantidade,
+                    "depois da entrada": indice.ingrediente(nome)['estoque'] + quantidade,
+                } for nome, quantidade in entradas.items()], use_container_width=True, hide_index=True)
                 
-                # Barra de estoque
-                percentual = min(novo_estoque / novo_minimo * 100, 100) if novo_minimo > 0 else 0
-                cor = "red" if novo_estoque <= novo_minimo else "green"
-                st.progress(percentual/100, text=f"Estoque: {novo_estoque} {ingrediente['unidade']} / Mínimo: {novo_minimo}")
-            
-            st.divider()
+                # A mesma nota não é lançada duas vezes nesta sessão
+                lancadas = st.session_state.setdefault("notas_lancadas", set())
+                assinatura_nota = imagens.hash_conteudo(conteudo)
+                if assinatura_nota in lancadas:
+                    st.info("✅ Esta nota já foi lançada.")
+                elif st.button(f"✅ Lançar entrada de {len(entradas)} ingrediente(s)", key="lancar_entrega", type="primary"):
+                    receber_entrega(entradas)
+                    lancadas.add(assinatura_nota)
+                    st.session_state.aviso_ingredientes = f"✅ Entrada lançada para {len(entradas)} ingrediente(s)!"
+                    st.rerun()
     
-    with tab2:
+    with tab2, metricas.span("admin.pratos"):
         st.subheader("🍔 Gestão de Pratos")
         
+        # Receita do novo prato (fora do formulário: a busca precisa reexecutar ao digitar)
+        st.write("**Ingredientes do Prato:**")
+        montar_receita("receita_nova")
+        
         # Formulário de cadastro de prato
         with st.form("cadastro_prato", clear_on_submit=True):
             col1, col2 = st.columns(2)
@@ -392,26 +468,6 @@ else:
                 nome = st.text_input("Nome do Prato", placeholder="Ex: Burger Especial")
                 preco = st.number_input("Preço (R$)", min_value=1.0, value=20.0, step=0.5, format="%.2f")
                 
-                # Seleção de ingredientes
-                st.write("**Ingredientes do Prato:**")
-                ingredientes_selecionados = []
-                for ingrediente in ingredientes:
-                    col_ing1, col_ing2 = st.columns([3, 1])
-                    with col_ing1:
-                        if st.checkbox(ingrediente['nome'], key=f"chk_{ingrediente['nome']}"):
-                            with col_ing2:
-                                quantidade = st.number_input(
-                                    "Qtd",
-                                    min_value=1,
-                                    value=1,
-                                    key=f"qtd_{ingrediente['nome']}",
-                                    label_visibility="collapsed"
-                                )
-                                ingredientes_selecionados.append({
-                                    "nome": ingrediente['nome'],
-                                    "quantidade": quantidade
-                                })
-            
             with col2:
                 st.write("Categoria")
                 categoria_opcoes = {
@@ -431,22 +487,19 @@ else:
                 categoria = categoria_selecionada
                 
                 imagem = st.file_uploader("Imagem do Prato", type=["jpg", "jpeg", "png"])
-                
-                # Mostra ingredientes selecionados
-                if ingredientes_selecionados:
-                    st.write("**Ingredientes selecionados:**")
-                    for ing in ingredientes_selecionados:
-                        st.write(f"- {ing['nome']} ({ing['quantidade']} {next((i['unidade'] for i in ingredientes if i['nome'] == ing['nome']), 'un')})")
             
             submitted = st.form_submit_button("✅ Cadastrar Prato", type="primary")
             
             if submitted:
+                ingredientes_selecionados = receita_para_prato(st.session_state.receita_nova)
                 if not nome:
                     st.error("❌ Digite o nome do prato")
                 elif not preco:
                     st.error("❌ Digite o preço do prato")
                 elif not imagem:
                     st.error("❌ Selecione uma imagem")
+                elif imagem.size > imagens.TAMANHO_MAXIMO_UPLOAD:
+                    st.error(f"❌ Imagem muito grande (máximo {imagens.TAMANHO_MAXIMO_UPLOAD // (1024 * 1024)} MB)")
                 elif not ingredientes_selecionados:
                     st.error("❌ Selecione pelo menos um ingrediente")
                 else:
@@ -454,13 +507,10 @@ else:
                     if nome.lower() in nomes_existentes:
                         st.error("❌ Já existe um prato com este nome")
                     else:
-                        os.makedirs(IMAGES_DIR, exist_ok=True)
                         extensao = imagem.name.split('.')[-1]
-                        nome_imagem = f"{nome.lower().replace(' ', '_')}.{extensao}"
-                        caminho_imagem = os.path.join(IMAGES_DIR, nome_imagem)
-                        
-                        with open(caminho_imagem, "wb") as f:
-                            f.write(imagem.getbuffer())
+                        # Reaproveita imagem idêntica já enviada; a miniatura é gerada em segundo plano
+                        nome_imagem = imagens.salvar_upload(
+                            imagem.getvalue(), f"{nome.lower().replace(' ', '_')}.{extensao}")
                         
                         novo_prato = {
                             "nome": nome,
@@ -471,19 +521,50 @@ else:
                         }
                         
                         pratos.append(novo_prato)
-                        with open(PRATOS_FILE, "w", encoding="utf-8") as f:
-                            json.dump(pratos, f, ensure_ascii=False, indent=2)
-                        
-                        # Adiciona ao estoque de pratos
+                        # Adiciona ao estoque de pratos (mesma transação do prato)
                         estoque_pratos[nome] = {'quantidade': 10, 'minimo': 5, 'ativo': True}
-                        with open(ESTOQUE_FILE, "w", encoding="utf-8") as f:
-                            json.dump(estoque_pratos, f, ensure_ascii=False, indent=2)
+                        with armazenamento.obter().transacao() as tx:
+                            tx.gravar("pratos", nome, novo_prato)
+                            tx.gravar("estoque", nome, estoque_pratos[nome])
                         
+                        st.session_state.receita_nova = {}
                         st.success(f"🎉 Prato '{nome}' cadastrado com sucesso!")
                         st.balloons()
         
         # Lista de pratos com ingredientes
         st.subheader("📋 Pratos Cadastrados")
+        aviso = st.session_state.pop("aviso_pratos", None)
+        if aviso:
+            st.success(aviso)
+        
+        # Edição: só o registro do prato é atualizado (preço e receita)
+        editando = st.session_state.get("prato_editando")
+        prato_editado = indice.prato(editando) if editando else None
+        if prato_editado is not None:
+            with st.container(border=True):
+                st.markdown(f"**✏️ Editando: {editando}**")
+                novo_preco = st.number_input("Preço (R$)", min_value=1.0, value=float(prato_editado['preco']),
+                                             step=0.5, format="%.2f", key=f"preco_{editando}")
+                montar_receita(f"receita_{editando}", prato_editado.get('ingredientes', ()))
+                
+                col_salvar, col_cancelar = st.columns(2)
+                with col_salvar:
+                    if st.button("💾 Salvar prato", type="primary", key="salvar_edicao", use_container_width=True):
+                        receita = st.session_state[f"receita_{editando}"]
+                        if not receita:
+                            st.error("❌ A receita precisa de pelo menos um ingrediente")
+                        else:
+                            with armazenamento.obter().transacao() as tx:
+                                tx.atualizar("pratos", editando, {
+                                    "preco": float(novo_preco),
+                                    "ingredientes": receita_para_prato(receita),
+                                })
+                            st.session_state.pop("prato_editando", None)
+                            st.session_state.pop(f"receita_{editando}", None)
+                            st.session_state.aviso_pratos = f"✅ Prato '{editando}' atualizado!"
+                            st.rerun()
+                with col_cancelar:
+                    st.button("Cancelar", key="cancelar_edicao", on_click=encerrar_edicao, use_container_width=True)
         for i, prato in enumerate(pratos):
             with st.expander(f"🍔 {prato['nome']} - R$ {prato['preco']:.2f}"):
                 col1, col2 = st.columns(2)
@@ -492,33 +573,31 @@ else:
                     st.write(f"**Imagem:** {prato['img']}")
                     
                     # Verifica disponibilidade baseada nos ingredientes
-                    disponivel, faltantes = verificar_disponibilidade_prato(prato, ingredientes)
+                    disponivel, faltantes = verificar_disponibilidade_prato(prato, disponibilidade)
                     status = "✅ Disponível" if disponivel else f"❌ Faltam: {', '.join(faltantes)}"
                     st.write(f"**Status:** {status}")
                 
                 with col2:
                     st.write("**Ingredientes:**")
                     for ing in prato.get('ingredientes', []):
-                        ingrediente_info = next((i for i in ingredientes if i['nome'] == ing['nome']), None)
+                        ingrediente_info = indice.ingrediente(ing['nome'])
                         if ingrediente_info:
                             st.write(f"- {ing['nome']}: {ing['quantidade']} {ingrediente_info['unidade']}")
                 
                 col_btn1, col_btn2 = st.columns(2)
                 with col_btn1:
-                    if st.button("✏️ Editar", key=f"edit_{i}"):
-                        st.info("Funcionalidade de edição em desenvolvimento")
+                    st.button("✏️ Editar", key=f"edit_{i}", on_click=editar_prato, args=(prato['nome'],))
                 with col_btn2:
                     if st.button("🗑️ Excluir", key=f"del_{i}"):
                         if prato['nome'] in estoque_pratos:
                             del estoque_pratos[prato['nome']]
                         pratos.pop(i)
-                        with open(PRATOS_FILE, "w", encoding="utf-8") as f:
-                            json.dump(pratos, f, ensure_ascii=False, indent=2)
-                        with open(ESTOQUE_FILE, "w", encoding="utf-8") as f:
-                            json.dump(estoque_pratos, f, ensure_ascii=False, indent=2)
+                        with armazenamento.obter().transacao() as tx:
+                            tx.remover("pratos", prato['nome'])
+                            tx.remover("estoque", prato['nome'])
                         st.rerun()
     
-    with tab3:
+    with tab3, metricas.span("admin.relatorios"):
         st.subheader("📊 Relatórios & Alertas")
         
         # Alertas de estoque baixo
@@ -528,6 +607,54 @@ else:
             for ing in ingredientes_baixo:
                 st.write(f"❌ **{ing['nome']}**: {ing['estoque']} {ing['unidade']} (mínimo: {ing['minimo']})")
         
+        # Previsão de ruptura: calculada fora das requisições (linha de comando, thread periódica ou
+        # o botão abaixo); aqui só se lê o último resultado gravado
+        st.subheader("🔮 Previsão de Ruptura")
+        if obter_diario() is None:
+            st.info("A previsão usa o histórico de pedidos do diário. Inicie o app com BURGER_DIARIO=1.")
+        else:
+            resultado_previsao = previsao.ler()
+            col_info, col_botao = st.columns([3, 1])
+            with col_botao:
+                if st.button("🔄 Recalcular", key="recalcular_previsao", disabled=previsao.calculando(),
+                             use_container_width=True):
+                    previsao.atualizar_em_segundo_plano()
+                    st.toast("⏳ Recalculando em segundo plano; atualize a página em instantes.")
+            with col_info:
+                if resultado_previsao is None:
+                    st.info("Nenhuma previsão calculada ainda.")
+                else:
+                    gerado_em = datetime.fromtimestamp(resultado_previsao["gerado_em"])
+                    st.caption(f"Calculada em {gerado_em:%d/%m %H:%M} com {resultado_previsao['pedidos']} pedidos "
+                               f"dos últimos {resultado_previsao['janela_dias']:g} dias. Sugestão de compra: "
+                               f"consumo de {resultado_previsao['cobertura_dias']} dias + mínimo − estoque.")
+            
+            if resultado_previsao is not None:
+                previstos = pd.DataFrame(resultado_previsao["ingredientes"],
+                                         columns=["nome", "unidade", "estoque", "minimo", "consumo_dia", "acaba_em", "sugestao"])
+                previstos = previstos[previstos["acaba_em"].notna() | (previstos["sugestao"] > 0)]
+                previstos = previstos.sort_values("acaba_em", na_position="last")
+                horas_restantes = (previstos["acaba_em"] - resultado_previsao["gerado_em"]) / 3600
+                previstos.insert(5, "horas", horas_restantes.clip(lower=0))
+                previstos["acaba_em"] = pd.to_datetime(previstos["acaba_em"], unit="s", utc=True).dt.tz_convert(
+                    datetime.now().astimezone().tzinfo)
+                st.metric("Acabam em até 48h", int((horas_restantes <= 48).sum()))
+                st.dataframe(
+                    previstos,
+                    column_config={
+                        "nome": st.column_config.TextColumn("Ingrediente"),
+                        "unidade": st.column_config.TextColumn("Unidade"),
+                        "estoque": st.column_config.NumberColumn("Estoque"),
+                        "minimo": st.column_config.NumberColumn("Mínimo"),
+                        "consumo_dia": st.column_config.NumberColumn("Consumo/dia", format="%.1f"),
+                        "horas": st.column_config.NumberColumn("Horas até acabar", format="%.0f"),
+                        "acaba_em": st.column_config.DatetimeColumn("Acaba em", format="DD/MM HH:mm"),
+                        "sugestao": st.column_config.NumberColumn("Sugestão de compra"),
+                    },
+                    use_container_width=True,
+                    hide_index=True,
+                )
+        
         # Estatísticas
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -537,16 +664,118 @@ else:
         with col3:
             st.metric("Ingredientes em Alerta", len(ingredientes_baixo))
         
-        # Custo estimado dos pratos (exemplo simplificado)
+        # Custo, lucro e margem do cardápio inteiro numa única tabela (ordenável pelo cabeçalho)
         st.subheader("💲 Custo Estimado por Prato")
-        for prato in pratos:
-            custo_estimado = calcular_custo_prato(prato, ingredientes)
-            lucro = prato['preco'] - custo_estimado
-            margem = (lucro / prato['preco']) * 100 if prato['preco'] > 0 else 0
+        custos = obter_custos()
+        if len(custos.nomes):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Margem Média", f"{custos.margens.mean():.1f}%")
+            with col2:
+                st.metric("Pratos com Prejuízo", int((custos.lucros < 0).sum()))
+            with col3:
+                st.metric("Sem Custo Completo", int(custos.sem_custo.sum()),
+                          help="Pratos com ingrediente sem custo cadastrado (o custo mostrado fica abaixo do real)")
+            st.dataframe(
+                custos.tabela(),
+                column_config={
+                    "preço": st.column_config.NumberColumn("Preço", format="R$ %.2f"),
+                    "custo": st.column_config.NumberColumn("Custo", format="R$ %.2f"),
+                    "lucro": st.column_config.NumberColumn("Lucro", format="R$ %.2f"),
+                    "margem": st.column_config.ProgressColumn("Margem", min_value=0, max_value=100, format="%.1f%%"),
+                },
+                use_container_width=True,
+                hide_index=True,
+            )
+        
+        # Porções possíveis com o estoque atual e plano repartindo os ingredientes disputados
+        st.subheader("🍳 Produção Possível")
+        capacidade = producao.obter_producao()
+        if capacidade.receitas.com_receita.any():
+            registradas = producao.participacoes_registradas()
+            fonte = st.radio("Participação de cada prato na demanda",
+                             ["Igual para todos", "Histórico de pedidos"] if registradas is not None else ["Igual para todos"],
+                             horizontal=True, key="fonte_participacao")
+            if fonte == "Histórico de pedidos" and registradas.sum() > 0:
+                participacoes = registradas
+            else:
+                if fonte == "Histórico de pedidos":
+                    st.info("Ainda não há pedidos no diário; usando participação igual.")
+                participacoes = producao.participacoes_iguais(capacidade.receitas)
             
-            st.write(f"**{prato['nome']}**")
-            st.write(f"Preço: R$ {prato['preco']:.2f} | Custo: R$ {custo_estimado:.2f} | Lucro: R$ {lucro:.2f} ({margem:.1f}%)")
-            st.progress(min(margem/100, 1), text=f"Margem: {margem:.1f}%")
+            plano = capacidade.tabela(participacoes)
+            com_receita = plano[capacidade.receitas.com_receita]
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Pratos Esgotados", int((com_receita["porções possíveis"] == 0).sum()))
+            with col2:
+                st.metric(f"Até {producao.LIMITE_ULTIMAS} Porções", int(com_receita["porções possíveis"].between(1, producao.LIMITE_ULTIMAS).sum()))
+            with col3:
+                st.metric("Porções no Plano", int(com_receita["plano"].sum()),
+                          help="Total que o estoque rende repartido pela participação: menor que a soma das "
+                               "porções possíveis quando os pratos disputam ingredientes")
+            st.dataframe(
+                com_receita,
+                column_config={
+                    "participação": st.column_config.NumberColumn("Participação", format="%.1f%%"),
+                    "porções possíveis": st.column_config.NumberColumn("Porções (sozinho)", format="%d",
+                                                                       help="Máximo se só este prato fosse produzido"),
+                    "plano": st.column_config.NumberColumn("Plano", format="%d",
+                                                           help="Porções repartindo o estoque entre todos os pratos"),
+                },
+                use_container_width=True,
+                hide_index=True,
+            )
+        else:
+            st.info("Nenhum prato tem receita cadastrada.")
+
+    # =============== ABA DE PERFORMANCE ===============
+    with tab4:
+        st.subheader("⏱️ Tempo por Trecho (este processo)")
+        if not metricas.ATIVO:
+            st.info("Métricas desligadas. Inicie o app com BURGER_METRICAS=1 para medir "
+                    "carregamentos, disponibilidade, carrinho e cada seção das páginas.")
+        else:
+            linhas = metricas.resumo()
+            if linhas:
+                st.caption(f"Percentis das últimas {metricas.JANELA} amostras de cada trecho; "
+                           "a média considera todas as chamadas desde o início do processo.")
+                st.dataframe(linhas, use_container_width=True, hide_index=True)
+            else:
+                st.write("Nenhuma amostra ainda.")
+            if st.button("📤 Exportar para Prometheus", key="exportar_metricas"):
+                st.success(f"✅ Gravado em {metricas.exportar()}")
+
+        # Perfis só podem ser ligados daqui (atrás do login); valem para todas as sessões do processo
+        st.subheader("🔬 Perfis de Execução")
+        ligado = st.toggle("Perfilar as próximas execuções (cliente e admin)", value=perfil.ligado())
+        if ligado != perfil.ligado():
+            perfil.ligar(ligado)
+        registros = perfil.perfis()
+        if not registros:
+            st.write(f"Nenhum perfil guardado (são mantidos os últimos {perfil.MAXIMO_PERFIS}).")
+        else:
+            st.dataframe([{
+                "#": p.id,
+                "página": p.nome,
+                "início": time.strftime("%H:%M:%S", time.localtime(p.inicio)),
+                "duração (ms)": round(p.duracao * 1000, 1),
+                "amostras": len(p.amostras),
+                "situação": p.situacao,
+            } for p in registros], use_container_width=True, hide_index=True)
+            escolhido = perfil.obter(st.selectbox(
+                "Perfil", [p.id for p in registros],
+                format_func=lambda i: next(f"#{p.id} • {p.nome} • {p.duracao * 1000:.0f} ms" for p in registros if p.id == i)))
+            col_pstats, col_speedscope = st.columns(2)
+            with col_pstats:
+                st.download_button("⬇️ pstats", data=escolhido.pstats_bytes(), file_name=f"perfil-{escolhido.id}.pstats",
+                                   mime="application/octet-stream", use_container_width=True)
+            with col_speedscope:
+                st.download_button("⬇️ speedscope", data=escolhido.speedscope_json(),
+                                   file_name=f"perfil-{escolhido.id}.speedscope.json",
+                                   mime="application/json", use_container_width=True)
+            with st.expander("Funções com maior tempo acumulado"):
+                st.code(escolhido.texto())
 
 # =============== BOTÕES GLOBAIS ===============
 st.markdown("---")
@@ -560,4 +789,6 @@ with col2:
 with col3:
     if st.button("🚪 Logout", use_container_width=True):
         st.session_state.admin_logado = False
-        st.rerun()
\ No newline at end of file
+        st.rerun()
+
+perfil.concluir()
@@ -0,0 +1,89 @@
+# pages/cozinha.py - PAINEL DA COZINHA (FILA DE COMANDAS)
+import streamlit as st
+import os
+import sys
+import time
+
+st.set_page_config(page_title="Cozinha • Burger Express", page_icon="👨‍🍳", layout="wide")
+
+# =============== CONFIGURAÇÃO DE CAMINHOS ===============
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from restaurante import cozinha, metricas, perfil
+
+perfil.iniciar("pages/cozinha.py")
+cozinha.iniciar()
+
+ATUALIZAR_A_CADA = 2  # segundos; o painel só consulta o banco quando a fila muda de versão
+LIMITE_COLUNA = 30    # comandas mostradas por coluna
+
+# =============== FUNÇÕES AUXILIARES ===============
+def minutos(segundos):
+    return f"{max(0, round(segundos / 60))} min"
+
+def itens_texto(comanda):
+    return " • ".join(f"{quantidade}× {nome}" for nome, quantidade in comanda["itens"].items())
+
+@perfil.callback("pages/cozinha.py")
+def marcar(numero, estado):
+    cozinha.obter_fila().marcar(numero, estado)
+
+def cartao(comanda, agora, detalhe, botao=None):
+    with st.container(border=True):
+        st.markdown(f"**#{comanda['id']}** · há {minutos(agora - comanda['criada'])}  \n{itens_texto(comanda)}")
+        st.caption(detalhe)
+        if botao is not None:
+            rotulo, estado = botao
+            st.button(rotulo, key=f"{estado}_{comanda['id']}", use_container_width=True,
+                      on_click=marcar, args=(comanda["id"], estado))
+
+@st.fragment(run_every=ATUALIZAR_A_CADA)
+@perfil.fragmento("pages/cozinha.py (painel)")
+def painel():
+    fila = cozinha.obter_fila()
+    with metricas.span("cozinha.pagina"):
+        dados = fila.painel(LIMITE_COLUNA)
+        agora = time.time()
+        contagem = dados["contagem"]
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric(cozinha.ESTADOS["recebido"], contagem["recebido"])
+        col2.metric(cozinha.ESTADOS["em_preparo"], contagem["em_preparo"])
+        col3.metric(cozinha.ESTADOS["pronto"], contagem["pronto"])
+
+        espera, preparo, prontas = st.columns(3)
+        with espera:
+            st.subheader("Próximas")
+            for comanda in dados["recebido"]:
+                previsto = comanda["previsto"]
+                cartao(comanda, agora, f"pronta em ~{minutos(previsto - agora)}" if previsto else "aguardando agendamento")
+            if contagem["recebido"] > len(dados["recebido"]):
+                st.caption(f"... e mais {contagem['recebido'] - len(dados['recebido'])}")
+        with preparo:
+            st.subheader("Em preparo")
+            for comanda in dados["em_preparo"]:
+                restante = comanda["previsto"] - agora
+                estacoes = ", ".join(comanda["tarefas"])
+                detalhe = f"{estacoes} · " + (f"pronta em ~{minutos(restante)}" if restante >= 0
+                                              else f"⚠️ atrasada {minutos(-restante)}")
+                cartao(comanda, agora, detalhe, ("✅ Pronta", "pronto"))
+        with prontas:
+            st.subheader("Aguardando entrega")
+            for comanda in dados["pronto"]:
+                cartao(comanda, agora, f"pronta há {minutos(agora - comanda['pronta'])}", ("🛵 Saiu para entrega", "saiu"))
+
+# =============== PÁGINA ===============
+st.title("👨‍🍳 Cozinha")
+
+if cozinha.obter_fila() is None:
+    st.info("Fila da cozinha desligada. Inicie o app com BURGER_COZINHA=1 para acompanhar as comandas.")
+elif not st.session_state.get("admin_logado"):
+    st.warning("🔒 Entre pelo painel administrativo para ver as comandas.")
+    if st.button("Ir para o login"):
+        st.switch_page("pages/admin.py")
+else:
+    painel()
+
+perfil.concluir()
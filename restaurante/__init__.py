@@ -0,0 +1 @@
+# restaurante - SERVIÇOS COMPARTILHADOS ENTRE app.py E pages/admin.py
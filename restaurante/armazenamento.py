@@ -0,0 +1,463 @@
+# restaurante/armazenamento.py - CAMADA DE ARMAZENAMENTO (JSON OU SQLITE WAL)
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from restaurante import padrao, snapshot, travas, versoes
+from restaurante.snapshot import CatalogoInvalido
+
+# =============== CONFIGURAÇÃO DE CAMINHOS ===============
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BANCO_FILE = os.path.join(BASE_DIR, "restaurante.db")
+
+# pratos e ingredientes são listas de registros com "nome"; estoque é um dict nome -> registro
+TABELAS = {"pratos": list, "ingredientes": list, "estoque": dict}
+
+def _para_registros(tabela, dados):
+    if TABELAS[tabela] is dict:
+        return dict(dados)
+    return {registro['nome']: registro for registro in dados}
+
+def _de_registros(tabela, registros):
+    if TABELAS[tabela] is dict:
+        return dict(registros)
+    return list(registros.values())
+
+def _copiar(registro):
+    return json.loads(json.dumps(registro))
+
+# =============== TRANSAÇÕES ===============
+class _Transacao:
+    """Operações por registro dentro de uma transação; nada é gravado se ocorrer exceção"""
+
+    def ler(self, tabela):
+        raise NotImplementedError
+
+    def obter(self, tabela, nome):
+        raise NotImplementedError
+
+    def gravar(self, tabela, nome, registro):
+        """Insere ou substitui um registro (mantém a posição se já existir)"""
+        raise NotImplementedError
+
+    def remover(self, tabela, nome):
+        raise NotImplementedError
+
+    def substituir(self, tabela, dados):
+        """Troca a tabela inteira (usado na importação e nos dados iniciais)"""
+        raise NotImplementedError
+
+    def atualizar(self, tabela, nome, campos):
+        registro = self.obter(tabela, nome)
+        if registro is None:
+            raise KeyError(f"{tabela}: '{nome}' não encontrado")
+        registro.update(campos)
+        self.gravar(tabela, nome, registro)
+        return registro
+
+class _TransacaoJSON(_Transacao):
+    def __init__(self, backend):
+        self.backend = backend
+        self._tabelas = {}
+        self._alteradas = set()
+
+    def _registros(self, tabela):
+        if tabela not in self._tabelas:
+            self._tabelas[tabela] = _para_registros(tabela, self.backend.ler(tabela))
+        return self._tabelas[tabela]
+
+    def ler(self, tabela):
+        return _copiar(_de_registros(tabela, self._registros(tabela)))
+
+    def obter(self, tabela, nome):
+        registro = self._registros(tabela).get(nome)
+        return _copiar(registro) if registro is not None else None
+
+    def gravar(self, tabela, nome, registro):
+        self._registros(tabela)[nome] = _copiar(registro)
+        self._alteradas.add(tabela)
+
+    def remover(self, tabela, nome):
+        self._registros(tabela).pop(nome, None)
+        self._alteradas.add(tabela)
+
+    def substituir(self, tabela, dados):
+        self._tabelas[tabela] = _para_registros(tabela, _copiar(dados))
+        self._alteradas.add(tabela)
+
+    def _confirmar(self):
+        self.backend._escrever({tabela: _de_registros(tabela, self._tabelas[tabela]) for tabela in self._alteradas})
+
+class _TransacaoSQLite(_Transacao):
+    def __init__(self, conexao):
+        self.conexao = conexao
+        self._alteradas = set()
+
+    def ler(self, tabela):
+        linhas = self.conexao.execute(f"SELECT nome, dados FROM {tabela} ORDER BY posicao").fetchall()
+        return _de_registros(tabela, {nome: json.loads(dados) for nome, dados in linhas})
+
+    def obter(self, tabela, nome):
+        linha = self.conexao.execute(f"SELECT dados FROM {tabela} WHERE nome = ?", (nome,)).fetchone()
+        return json.loads(linha[0]) if linha else None
+
+    def gravar(self, tabela, nome, registro):
+        self.conexao.execute(
+            f"INSERT INTO {tabela} (nome, posicao, dados) "
+            f"VALUES (?, (SELECT COALESCE(MAX(posicao), 0) + 1 FROM {tabela}), ?) "
+            f"ON CONFLICT(nome) DO UPDATE SET dados = excluded.dados",
+            (nome, json.dumps(registro, ensure_ascii=False)),
+        )
+        self._alteradas.add(tabela)
+
+    def remover(self, tabela, nome):
+        self.conexao.execute(f"DELETE FROM {tabela} WHERE nome = ?", (nome,))
+        self._alteradas.add(tabela)
+
+    def substituir(self, tabela, dados):
+        self.conexao.execute(f"DELETE FROM {tabela}")
+        self.conexao.executemany(
+            f"INSERT INTO {tabela} (nome, posicao, dados) VALUES (?, ?, ?)",
+            [(nome, posicao, json.dumps(registro, ensure_ascii=False))
+             for posicao, (nome, registro) in enumerate(_para_registros(tabela, dados).items(), 1)],
+        )
+        self._alteradas.add(tabela)
+
+    def _confirmar(self):
+        self.conexao.executemany(
+            "UPDATE versoes SET versao = versao + 1 WHERE tabela = ?",
+            [(tabela,) for tabela in self._alteradas],
+        )
+
+# =============== BACKEND JSON ===============
+class ArmazenamentoJSON:
+    """Arquivos JSON no formato original. Cada escrita troca o arquivo atomicamente (os.replace)
+    e as transações são serializadas por uma trava entre threads e entre processos (flock).
+    Transações que alteram várias tabelas gravam todos os temporários e só então um manifesto
+    (.catalogo.confirmacao), que é o ponto de confirmação: se o processo cair no meio das trocas,
+    o próximo a abrir o catálogo ou a pegar a trava termina as trocas a partir dele.
+    A versão de cada tabela, compartilhada entre processos, fica em .catalogo.versao.
+    Cada JSON tem um snapshot binário validado (.pratos.snap, ver restaurante/snapshot.py) de onde
+    as leituras vêm enquanto o arquivo não muda; BURGER_SNAPSHOT=0 desliga."""
+
+    def __init__(self, base_dir=BASE_DIR):
+        self.base_dir = base_dir
+        self.arquivos = {tabela: os.path.join(base_dir, f"{tabela}.json") for tabela in TABELAS}
+        self.snapshots = None
+        if os.environ.get("BURGER_SNAPSHOT", "1") != "0":
+            self.snapshots = {tabela: os.path.join(base_dir, f".{tabela}.snap") for tabela in TABELAS}
+        self.arquivo_trava = os.path.join(base_dir, ".catalogo.lock")
+        self.manifesto = os.path.join(base_dir, ".catalogo.confirmacao")
+        self.versoes = versoes.abrir(os.path.join(base_dir, ".catalogo.versao"), TABELAS)
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        if os.path.exists(self.manifesto):  # confirmação interrompida: termina antes da primeira leitura
+            with self._lock, self._trava_processos():
+                self._recuperar()
+
+    def existe(self, tabela):
+        return os.path.exists(self.arquivos[tabela])
+
+    def assinatura(self, tabela):
+        caminho = self.arquivos[tabela]
+        try:
+            info = os.stat(caminho)
+        except OSError:
+            return None
+        return (caminho, info.st_mtime_ns, info.st_size, info.st_ino)
+
+    def versao(self, tabela):
+        """Versão barata (leitura de memória) para revalidar caches; ver restaurante/versoes.py"""
+        if self.versoes is None:
+            return self.assinatura(tabela)
+        return (self.base_dir, self.versoes.versao(tabela, self.assinatura))
+
+    def ler(self, tabela):
+        """Lê a tabela do snapshot, se ele corresponde ao arquivo atual; senão do JSON, que é
+        validado e vira o novo snapshot. Levanta CatalogoInvalido se o JSON estiver corrompido."""
+        assinatura = self.assinatura(tabela)
+        if assinatura is None:
+            return TABELAS[tabela]()
+        if self.snapshots is None:
+            return self.ler_fonte(tabela)
+        dados = snapshot.ler(self.snapshots[tabela], assinatura)
+        if dados is None:
+            dados = self.ler_fonte(tabela)
+            snapshot.gravar(self.snapshots[tabela], assinatura, dados)
+        return dados
+
+    def ler_fonte(self, tabela):
+        """Lê e valida o arquivo JSON, sem passar pelo snapshot"""
+        caminho = self.arquivos[tabela]
+        with open(caminho, "rb") as f:
+            conteudo = f.read()
+        try:
+            dados = json.loads(conteudo.decode("utf-8"))
+        except UnicodeDecodeError as erro:
+            raise CatalogoInvalido(f"{os.path.basename(caminho)}: não está em UTF-8 (byte {erro.start})") from erro
+        except json.JSONDecodeError as erro:
+            raise CatalogoInvalido(f"{os.path.basename(caminho)}: JSON inválido na linha {erro.lineno}, "
+                                   f"coluna {erro.colno} ({erro.msg})") from erro
+        snapshot.validar(tabela, dados, caminho)
+        return dados
+
+    def _temporario(self, tabela, dados):
+        fd, temporario = tempfile.mkstemp(dir=self.base_dir, prefix=f".{tabela}.", suffix=".tmp")
+        try:
+            os.chmod(temporario, 0o644)  # mkstemp cria com 0600
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(dados, f, ensure_ascii=False, indent=2)
+        except BaseException:
+            os.remove(temporario)
+            raise
+        return temporario
+
+    def _escrever(self, dados_por_tabela):
+        """Grava as tabelas alteradas; com mais de uma, confirma pelo manifesto (tudo ou nada)"""
+        temporarios, manifesto = {}, None
+        try:
+            for tabela, dados in dados_por_tabela.items():
+                temporarios[tabela] = self._temporario(tabela, dados)
+            if len(temporarios) > 1:
+                manifesto = self._temporario("catalogo", {t: os.path.basename(c) for t, c in temporarios.items()})
+                os.replace(manifesto, self.manifesto)
+        except BaseException:
+            for temporario in [*temporarios.values(), manifesto]:
+                if temporario is not None and os.path.exists(temporario):
+                    os.remove(temporario)
+            raise
+        # Daqui em diante a transação está confirmada: uma falha nas trocas é terminada por _recuperar
+        for tabela, temporario in temporarios.items():
+            os.replace(temporario, self.arquivos[tabela])
+        if len(temporarios) > 1:
+            os.remove(self.manifesto)
+        if self.snapshots is not None:  # dados gerados pelo app: snapshot sem revalidar
+            for tabela, dados in dados_por_tabela.items():
+                snapshot.gravar(self.snapshots[tabela], self.assinatura(tabela), dados)
+
+    def _recuperar(self):
+        """Termina as trocas de uma confirmação interrompida (chamado com a trava entre processos)"""
+        try:
+            with open(self.manifesto, "r", encoding="utf-8") as f:
+                temporarios = json.load(f)
+        except FileNotFoundError:
+            return
+        for tabela, nome in temporarios.items():
+            temporario = os.path.join(self.base_dir, nome)
+            if os.path.exists(temporario):
+                os.replace(temporario, self.arquivos[tabela])
+        os.remove(self.manifesto)
+        if self.versoes is not None:
+            self.versoes.publicar(list(temporarios), self.assinatura)
+
+    def _trava_processos(self):
+        return travas.exclusiva_em(self.arquivo_trava)
+
+    @contextmanager
+    def transacao(self):
+        atual = getattr(self._local, "transacao", None)
+        if atual is not None:  # transação aninhada reaproveita a externa
+            yield atual
+            return
+        with self._lock, self._trava_processos():
+            if os.path.exists(self.manifesto):
+                self._recuperar()
+            tx = _TransacaoJSON(self)
+            self._local.transacao = tx
+            try:
+                yield tx
+                tx._confirmar()
+                if self.versoes is not None:
+                    self.versoes.publicar(tx._alteradas, self.assinatura)
+            finally:
+                self._local.transacao = None
+
+# =============== BACKEND SQLITE ===============
+class ArmazenamentoSQLite:
+    """Banco SQLite em modo WAL: leitores não bloqueiam durante escritas, atualizações são por
+    registro e uma transação pode alterar várias tabelas de forma atômica."""
+
+    def __init__(self, caminho=BANCO_FILE):
+        self.caminho = caminho
+        self._local = threading.local()
+        self._criar_esquema()
+        self.versoes = versoes.abrir(caminho + ".versao", TABELAS)
+
+    def _conexao(self):
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.caminho, timeout=30, isolation_level=None)
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("PRAGMA synchronous=NORMAL")
+            self._local.conexao = conexao
+        return conexao
+
+    def _criar_esquema(self):
+        conexao = self._conexao()
+        conexao.execute("BEGIN IMMEDIATE")
+        try:
+            for tabela in TABELAS:
+                conexao.execute(
+                    f"CREATE TABLE IF NOT EXISTS {tabela} "
+                    f"(nome TEXT PRIMARY KEY, posicao INTEGER NOT NULL, dados TEXT NOT NULL)"
+                )
+            conexao.execute("CREATE TABLE IF NOT EXISTS versoes (tabela TEXT PRIMARY KEY, versao INTEGER NOT NULL)")
+            conexao.executemany("INSERT OR IGNORE INTO versoes VALUES (?, 0)", [(t,) for t in TABELAS])
+            conexao.execute("COMMIT")
+        except BaseException:
+            conexao.execute("ROLLBACK")
+            raise
+
+    def existe(self, tabela):
+        return self.assinatura(tabela)[1] > 0
+
+    def assinatura(self, tabela):
+        linha = self._conexao().execute("SELECT versao FROM versoes WHERE tabela = ?", (tabela,)).fetchone()
+        return (self.caminho, linha[0])
+
+    def versao(self, tabela):
+        """Versão barata (sem SELECT a cada leitura); ver restaurante/versoes.py"""
+        if self.versoes is None:
+            return self.assinatura(tabela)
+        return (self.caminho, self.versoes.versao(tabela, self.assinatura))
+
+    def ler(self, tabela):
+        return _TransacaoSQLite(self._conexao()).ler(tabela)
+
+    @contextmanager
+    def transacao(self):
+        conexao = self._conexao()
+        if conexao.in_transaction:  # transação aninhada reaproveita a externa
+            yield self._local.transacao
+            return
+        conexao.execute("BEGIN IMMEDIATE")
+        tx = _TransacaoSQLite(conexao)
+        self._local.transacao = tx
+        try:
+            yield tx
+            tx._confirmar()
+            conexao.execute("COMMIT")
+        except BaseException:
+            conexao.execute("ROLLBACK")
+            raise
+        finally:
+            self._local.transacao = None
+        if self.versoes is not None:
+            self.versoes.publicar(tx._alteradas, self.assinatura)
+
+# =============== IMPORTAÇÃO / EXPORTAÇÃO ===============
+def copiar(origem, destino):
+    """Copia todas as tabelas existentes de um backend para outro numa única transação"""
+    with destino.transacao() as tx:
+        for tabela in TABELAS:
+            if origem.existe(tabela):
+                tx.substituir(tabela, origem.ler(tabela))
+
+def criar_padrao(backend):
+    """Grava o catálogo padrão (restaurante/padrao.py) nas tabelas que ainda não existem, numa
+    única transação. As páginas nunca criam o catálogo; devolve as tabelas criadas."""
+    with backend.transacao() as tx:
+        criadas = [tabela for tabela in padrao.CATALOGO if not backend.existe(tabela)]
+        for tabela in criadas:
+            tx.substituir(tabela, _copiar(padrao.CATALOGO[tabela]))
+    return criadas
+
+def migrar_json_para_sqlite(base_dir=BASE_DIR, caminho_banco=BANCO_FILE):
+    destino = ArmazenamentoSQLite(caminho_banco)
+    copiar(ArmazenamentoJSON(base_dir), destino)
+    criar_padrao(destino)
+    return destino
+
+# =============== BACKEND DO PROCESSO ===============
+_lock = threading.Lock()
+_backend = None
+
+def obter():
+    """Backend configurado por BURGER_ARMAZENAMENTO ("json", padrão, ou "sqlite").
+
+    BURGER_DADOS troca a pasta dos arquivos JSON (padrão: a raiz do projeto).
+    """
+    global _backend
+    if _backend is None:
+        with _lock:
+            if _backend is None:
+                pasta_json = os.environ.get("BURGER_DADOS", BASE_DIR)
+                if os.environ.get("BURGER_ARMAZENAMENTO", "json").lower() == "sqlite":
+                    caminho = os.environ.get("BURGER_BANCO", BANCO_FILE)
+                    backend = ArmazenamentoSQLite(caminho)
+                    # Primeiro uso: importa os JSON existentes
+                    if not any(backend.existe(t) for t in TABELAS):
+                        copiar(ArmazenamentoJSON(pasta_json), backend)
+                else:
+                    backend = ArmazenamentoJSON(pasta_json)
+                _backend = backend
+    return _backend
+
+def configurar(backend):
+    """Troca o backend do processo (ferramentas e benchmarks)"""
+    global _backend
+    with _lock:
+        _backend = backend
+
+def gerar_snapshots(base_dir=BASE_DIR):
+    """Valida cada JSON e regrava o snapshot binário a partir dele: tabela -> erro (ou None)"""
+    backend = ArmazenamentoJSON(base_dir)
+    erros = {}
+    for tabela in TABELAS:
+        assinatura = backend.assinatura(tabela)
+        if assinatura is None:
+            continue
+        try:
+            dados = backend.ler_fonte(tabela)
+        except (OSError, ValueError) as erro:
+            erros[tabela] = str(erro)
+            continue
+        erros[tabela] = None
+        if backend.snapshots is not None:
+            snapshot.gravar(backend.snapshots[tabela], assinatura, dados)
+    return erros
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cria, importa e exporta o catálogo entre JSON e SQLite")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    iniciar = sub.add_parser("iniciar", help="cria o catálogo padrão nas tabelas que ainda não existem")
+    iniciar.add_argument("--banco", default=None, help="banco SQLite (sem ele, os arquivos JSON de --dir)")
+    migrar = sub.add_parser("migrar", help="importa os arquivos JSON para o banco SQLite "
+                                           "(tabelas ausentes recebem o catálogo padrão)")
+    exportar = sub.add_parser("exportar", help="exporta o banco SQLite para arquivos JSON")
+    gerar = sub.add_parser("snapshot", help="valida os arquivos JSON e gera os snapshots binários")
+    for p in (migrar, exportar):
+        p.add_argument("--banco", default=BANCO_FILE)
+    for p in (iniciar, migrar, exportar, gerar):
+        p.add_argument("--dir", default=BASE_DIR, help="pasta dos arquivos JSON")
+    args = parser.parse_args(argv)
+
+    if args.comando == "iniciar":
+        if not args.banco:
+            os.makedirs(args.dir, exist_ok=True)
+        destino = ArmazenamentoSQLite(args.banco) if args.banco else ArmazenamentoJSON(args.dir)
+        criadas = criar_padrao(destino)
+        print(f"✅ Catálogo padrão criado: {', '.join(criadas)}" if criadas
+              else "✅ Catálogo já existe; nada foi alterado")
+        return 0
+
+    if args.comando == "snapshot":
+        erros = gerar_snapshots(args.dir)
+        for tabela, erro in erros.items():
+            print(f"❌ {erro}" if erro else f"✅ {tabela}: snapshot gerado")
+        return 1 if any(erros.values()) else 0
+    if args.comando == "migrar":
+        migrar_json_para_sqlite(args.dir, args.banco)
+        print(f"✅ Catálogo importado para {args.banco}")
+    else:
+        os.makedirs(args.dir, exist_ok=True)
+        copiar(ArmazenamentoSQLite(args.banco), ArmazenamentoJSON(args.dir))
+        print(f"✅ Catálogo exportado para {args.dir}")
+
+if __name__ == "__main__":
+    sys.exit(main())
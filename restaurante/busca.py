@@ -0,0 +1,152 @@
+# restaurante/busca.py - BUSCA NO CARDÁPIO (ÍNDICE INVERTIDO, SEM ACENTOS, POR PREFIXO)
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import OrderedDict
+from collections.abc import Sequence
+from itertools import accumulate, chain
+
+import numpy as np
+
+from restaurante import catalogo
+
+_PALAVRA = re.compile(r"[0-9a-z]+")
+LIMITE_CACHE = 256  # prefixos já resolvidos guardados por índice
+# Conferir um candidato termo a termo custa ~centenas de vezes marcar uma postagem no vetor:
+# abaixo desta proporção candidatos/estimativa do prefixo, filtra registro a registro
+PROPORCAO_FILTRO = 256
+
+def normalizar(texto):
+    """Minúsculas e sem acentos: "Pão Brioche" -> "pao brioche" """
+    decomposto = unicodedata.normalize("NFKD", texto.casefold())
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+def termos(texto):
+    return _PALAVRA.findall(normalizar(texto))
+
+def termos_do_prato(prato):
+    """Nome, categoria e ingredientes da receita"""
+    do_prato = set(termos(prato['nome'])) | set(termos(prato.get('cat', '')))
+    for ing_prato in prato.get('ingredientes', ()):
+        do_prato.update(termos(ing_prato['nome']))
+    return do_prato
+
+def termos_do_ingrediente(ingrediente):
+    return set(termos(ingrediente['nome'])) | set(termos(ingrediente.get('categoria', '')))
+
+class IndiceBusca:
+    """Termo -> posições dos registros que o contêm (por padrão pratos: nome, categoria e receita).
+
+    O vocabulário fica ordenado, então todos os termos com um prefixo formam um intervalo
+    contíguo achado por busca binária. As postagens ficam concatenadas num vetor do numpy na
+    mesma ordem, e as de um prefixo são uma fatia dele: juntar e cruzar prefixos largos é marcar
+    um vetor booleano, sem montar conjuntos em Python.
+    """
+
+    def __init__(self, registros, extrair=termos_do_prato):
+        self.registros = registros
+        postagens = {}
+        self.termos_por_registro = []
+        for posicao, registro in enumerate(registros):
+            do_registro = extrair(registro)
+            self.termos_por_registro.append(tuple(do_registro))
+            for termo in do_registro:
+                postagens.setdefault(termo, []).append(posicao)
+        self.vocabulario = sorted(postagens)
+        # Soma acumulada do tamanho das postagens: estima em O(log n) quantos registros um prefixo pega
+        self._acumulado = [0, *accumulate(len(postagens[t]) for t in self.vocabulario)]
+        self._postagens = np.fromiter(chain.from_iterable(postagens[t] for t in self.vocabulario),
+                                      dtype=np.intp, count=self._acumulado[-1])
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _intervalo(self, prefixo):
+        inicio = bisect_left(self.vocabulario, prefixo)
+        return inicio, bisect_left(self.vocabulario, prefixo + "\uffff", inicio)
+
+    def _estimativa(self, prefixo):
+        """Limite superior de registros com o prefixo (soma das postagens do intervalo)"""
+        inicio, fim = self._intervalo(prefixo)
+        return self._acumulado[fim] - self._acumulado[inicio]
+
+    def _marcados(self, inicio, fim):
+        """Vetor booleano por registro: True nos que têm algum termo do intervalo do vocabulário"""
+        marcados = np.zeros(len(self.registros), dtype=bool)
+        marcados[self._postagens[self._acumulado[inicio]:self._acumulado[fim]]] = True
+        return marcados
+
+    def _com_prefixo(self, prefixo):
+        """Posições (em ordem do catálogo) dos registros com algum termo começando por `prefixo`"""
+        with self._lock:
+            posicoes = self._cache.get(prefixo)
+            if posicoes is not None:
+                self._cache.move_to_end(prefixo)
+                return posicoes
+        inicio, fim = self._intervalo(prefixo)
+        if fim - inicio == 1:  # um termo só: as postagens já estão em ordem
+            posicoes = self._postagens[self._acumulado[inicio]:self._acumulado[fim]]
+        else:
+            posicoes = np.flatnonzero(self._marcados(inicio, fim))
+        with self._lock:
+            self._cache[prefixo] = posicoes
+            if len(self._cache) > LIMITE_CACHE:
+                self._cache.popitem(last=False)
+        return posicoes
+
+    def buscar(self, consulta):
+        """Registros que têm todos os termos da consulta (cada um como prefixo), na ordem do catálogo"""
+        consulta = sorted((self._estimativa(t), t) for t in set(termos(consulta)))
+        if not consulta:
+            return ResultadoBusca(self.registros, np.zeros(0, dtype=np.intp))
+        # Parte do termo mais seletivo e filtra pelos demais: registro a registro enquanto os
+        # candidatos forem muito menos que as postagens do prefixo, senão pelo vetor marcado
+        candidatos = self._com_prefixo(consulta[0][1])
+        for estimativa, termo in consulta[1:]:
+            if not len(candidatos):
+                break
+            if len(candidatos) * PROPORCAO_FILTRO < estimativa:
+                termos_por_registro = self.termos_por_registro
+                candidatos = np.array([p for p in candidatos.tolist()
+                                       if any(t.startswith(termo) for t in termos_por_registro[p])], dtype=np.intp)
+            else:
+                candidatos = candidatos[self._marcados(*self._intervalo(termo))[candidatos]]
+        return ResultadoBusca(self.registros, candidatos)
+
+class ResultadoBusca(Sequence):
+    """Registros encontrados, montados só quando acessados (a página exibida é uma fatia)"""
+
+    def __init__(self, registros, posicoes):
+        self._registros = registros
+        self._posicoes = posicoes
+
+    def __len__(self):
+        return len(self._posicoes)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return tuple(self._registros[p] for p in self._posicoes[item].tolist())
+        return self._registros[int(self._posicoes[item])]
+
+# =============== ÍNDICE DO PROCESSO ===============
+_lock = threading.Lock()
+_atuais = {}
+
+def _obter(tabela, registros, extrair):
+    indice = _atuais.get(tabela)
+    if indice is not None and indice.registros is registros:
+        return indice
+    with _lock:
+        indice = _atuais.get(tabela)
+        if indice is None or indice.registros is not registros:
+            indice = _atuais[tabela] = IndiceBusca(registros, extrair)
+        return indice
+
+def obter_busca():
+    """Índice de busca do cardápio atual; reconstruído só quando os pratos mudam"""
+    return _obter("pratos", catalogo.carregar_pratos(), termos_do_prato)
+
+def obter_busca_ingredientes():
+    """Índice de busca dos ingredientes (nome e categoria) para o montador de receitas do admin.
+    Usa a tabela sem o estoque do diário, que muda a cada pedido sem mudar os nomes."""
+    return _obter("ingredientes", catalogo.ler_tabela("ingredientes"), termos_do_ingrediente)
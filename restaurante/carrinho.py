@@ -0,0 +1,56 @@
+# restaurante/carrinho.py - CARRINHO COM TOTAIS EXATOS (DECIMAL) MANTIDOS A CADA ALTERAÇÃO
+from decimal import Decimal
+
+CENTAVO = Decimal("0.01")
+TAXA_ENTREGA = Decimal("5.00")  # "Taxa: R$ 5,00" da seção Sobre
+
+def para_decimal(valor):
+    """Converte o preço do catálogo (float no JSON) para Decimal com 2 casas, sem erro binário"""
+    return Decimal(str(valor)).quantize(CENTAVO)
+
+class Carrinho(dict):
+    """Quantidades por prato (dict nome -> quantidade) com o subtotal mantido incrementalmente.
+
+    Cada item guarda o preço unitário com que entrou; `definir` só ajusta a diferença do item
+    alterado, então o total não é recalculado a cada renderização.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.subtotal = Decimal("0.00")
+        self.precos = {}
+
+    def definir(self, nome, quantidade, preco):
+        if nome in self:
+            self.subtotal -= self.precos[nome] * self[nome]
+        if quantidade > 0:
+            preco = para_decimal(preco)
+            self[nome] = quantidade
+            self.precos[nome] = preco
+            self.subtotal += preco * quantidade
+        else:
+            self.pop(nome, None)
+            self.precos.pop(nome, None)
+
+    def limpar(self):
+        self.clear()
+        self.precos.clear()
+        self.subtotal = Decimal("0.00")
+
+    def reprecificar(self, precos):
+        """Aplica preços novos do catálogo aos itens do carrinho (O(itens), só ajusta o que mudou)"""
+        for nome in self:
+            novo = precos.get(nome, Decimal("0.00"))
+            if novo != self.precos[nome]:
+                self.subtotal += (novo - self.precos[nome]) * self[nome]
+                self.precos[nome] = novo
+
+    def itens(self):
+        """(nome, quantidade, subtotal do item) na ordem em que foram adicionados"""
+        return [(nome, quantidade, self.precos[nome] * quantidade) for nome, quantidade in self.items()]
+
+    def taxa_entrega(self, taxa=TAXA_ENTREGA):
+        return taxa if self else Decimal("0.00")
+
+    def total(self, taxa=TAXA_ENTREGA):
+        return self.subtotal + self.taxa_entrega(taxa)
@@ -0,0 +1,133 @@
+# restaurante/catalogo.py - CACHE DE CATÁLOGO COMPARTILHADO POR PROCESSO
+import gc
+import threading
+from contextlib import contextmanager
+from types import MappingProxyType
+
+from restaurante import armazenamento, metricas
+from restaurante.diario import obter_diario
+from restaurante.snapshot import CatalogoInvalido
+
+# Um único cache por processo servidor: tabela -> (assinatura, dados congelados)
+_lock = threading.Lock()
+_cache = {}
+_problemas = {}  # tabela -> erro da última leitura que falhou (servindo a última versão boa)
+
+_ESCALARES = frozenset((str, int, float, bool, type(None)))
+
+# =============== SNAPSHOTS IMUTÁVEIS ===============
+def congelar(valor):
+    """Converte listas/dicts em tuplas/mappingproxy para poder compartilhar entre sessões"""
+    tipo = type(valor)
+    if tipo is dict:  # caminho rápido dos registros vindos do JSON/snapshot
+        return MappingProxyType({k: v if type(v) in _ESCALARES else congelar(v) for k, v in valor.items()})
+    if tipo is list:
+        return tuple([v if type(v) in _ESCALARES else congelar(v) for v in valor])
+    if isinstance(valor, dict):
+        return MappingProxyType({k: congelar(v) for k, v in valor.items()})
+    if isinstance(valor, (list, tuple)):
+        return tuple(congelar(v) for v in valor)
+    return valor
+
+def editavel(valor):
+    """Cópia mutável (listas/dicts comuns) de um snapshot, para quem precisa alterar e salvar"""
+    if isinstance(valor, MappingProxyType) or isinstance(valor, dict):
+        return {k: editavel(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [editavel(v) for v in valor]
+    return valor
+
+# =============== LEITURA COM REVALIDAÇÃO POR VERSÃO ===============
+@contextmanager
+def _sem_gc():
+    """Carga sem coletas do GC: só cria dicts/listas novos e sem ciclos, e com catálogos grandes
+    as coletas disparadas pelas alocações custavam mais que a própria carga"""
+    ligado = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if ligado:
+            gc.enable()
+
+def ler_tabela(tabela):
+    """Lê uma tabela do armazenamento uma única vez por versão e devolve um snapshot imutável.
+
+    A versão é o contador compartilhado entre processos (ver restaurante/versoes.py): gravações
+    feitas por qualquer processo aparecem na próxima leitura; arquivos alterados por fora do app,
+    em até BURGER_VERIFICACAO segundos.
+    """
+    backend = armazenamento.obter()
+    assinatura = backend.versao(tabela)
+    entrada = _cache.get(tabela)
+    if entrada is not None and entrada[0] == assinatura:
+        return entrada[1]
+
+    with _lock:
+        # Outra thread pode ter recarregado enquanto esperávamos o lock
+        entrada = _cache.get(tabela)
+        if entrada is not None and entrada[0] == assinatura:
+            return entrada[1]
+
+        try:
+            with metricas.span(f"carregar.{tabela}"), _sem_gc():
+                dados = congelar(backend.ler(tabela))
+        except (OSError, ValueError) as erro:
+            # Arquivo corrompido ou ilegível: mantém a última versão boa e não guarda a
+            # assinatura, para tentar de novo na próxima chamada. Sem versão boa neste processo,
+            # erro claro (em vez de um cardápio vazio).
+            _problemas[tabela] = str(erro)
+            if entrada is not None:
+                return entrada[1]
+            if isinstance(erro, CatalogoInvalido):
+                raise
+            raise CatalogoInvalido(f"{tabela}: não foi possível ler ({erro})") from erro
+
+        _problemas.pop(tabela, None)
+        _cache[tabela] = (assinatura, dados)
+        return dados
+
+# Sem cardápio não há o que servir; ingredientes e estoque ausentes são só listas vazias
+OBRIGATORIAS = ("pratos",)
+
+def verificar():
+    """Lê todas as tabelas (levanta CatalogoInvalido se alguma não tem versão boa ou se falta
+    uma tabela obrigatória: as páginas não criam o catálogo, o CLI de armazenamento cria)"""
+    backend = armazenamento.obter()
+    for tabela in armazenamento.TABELAS:
+        if tabela in OBRIGATORIAS and not backend.existe(tabela):
+            raise CatalogoInvalido(f"{tabela}: catálogo não encontrado (crie com "
+                                   f"'python -m restaurante.armazenamento iniciar')")
+        ler_tabela(tabela)
+
+def problemas():
+    """Tabelas cuja última leitura falhou e que estão servindo a última versão boa: tabela -> erro"""
+    return dict(_problemas)
+
+def invalidar(tabela=None):
+    """Descarta o cache de uma tabela (ou de todas)"""
+    with _lock:
+        if tabela is None:
+            _cache.clear()
+        else:
+            _cache.pop(tabela, None)
+
+def versao():
+    """Identifica a versão atual do catálogo (muda sempre que alguma tabela muda)"""
+    backend = armazenamento.obter()
+    diario = obter_diario()
+    return tuple(backend.versao(t) for t in armazenamento.TABELAS) + (diario.versao if diario else None,)
+
+# =============== ACESSO AO CATÁLOGO ===============
+def carregar_pratos():
+    return ler_tabela("pratos")
+
+def carregar_ingredientes():
+    # Com o diário ligado, o estoque de cada ingrediente vem dele (snapshot + cauda)
+    diario = obter_diario()
+    if diario is not None:
+        return diario.sobrepor(ler_tabela("ingredientes"))
+    return ler_tabela("ingredientes")
+
+def carregar_estoque():
+    return ler_tabela("estoque")
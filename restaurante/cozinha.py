@@ -0,0 +1,430 @@
+# restaurante/cozinha.py - FILA DA COZINHA (SQLITE) E AGENDADOR POR TEMPO DE PREPARO E ESTAÇÃO
+import heapq
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from restaurante import armazenamento, metricas, travas, versoes
+
+_log = logging.getLogger(__name__)
+
+# Tempo estimado por categoria (segundos): o maior "base" entre os itens da estação + "por_unidade"
+# de cada unidade pedida (a chapa faz vários hambúrgueres juntos, mas cada um acrescenta tempo)
+TEMPOS_PREPARO = {
+    "hamburgers": {"base": 360, "por_unidade": 60},
+    "acompanhamentos": {"base": 180, "por_unidade": 30},
+    "bebidas": {"base": 30, "por_unidade": 15},
+    "sobremesas": {"base": 120, "por_unidade": 30},
+}
+# Estação de cada categoria e quantas comandas ela prepara ao mesmo tempo
+ESTACOES = {
+    "chapa": {"categorias": ("hamburgers",), "capacidade": 4},
+    "fritadeira": {"categorias": ("acompanhamentos",), "capacidade": 2},
+    "bar": {"categorias": ("bebidas",), "capacidade": 2},
+    "confeitaria": {"categorias": ("sobremesas",), "capacidade": 1},
+}
+ESTACAO_PADRAO = "chapa"  # categoria nova ainda sem estação
+ESTACAO_DA_CATEGORIA = {cat: estacao for estacao, dados in ESTACOES.items() for cat in dados["categorias"]}
+
+ESTADOS = {"recebido": "📥 Recebido", "em_preparo": "🔥 Em preparo", "pronto": "✅ Pronto",
+           "saiu": "🛵 Saiu para entrega"}
+ABERTOS = ("recebido", "em_preparo")  # estados que o agendador acompanha
+
+INTERVALO = 0.5          # segundos entre passos do agendador (novas comandas acordam antes)
+TOLERANCIA_PREVISAO = 30 # só regrava a previsão de quem espera se ela mudar mais que isso (s)
+LOTE_CONSULTA = 500      # ids por SELECT ... IN (...)
+ESPERA_LIDER = 5         # segundos entre tentativas de virar o agendador da pasta
+
+def tarefas_do_pedido(itens, indice):
+    """Segundos de preparo por estação para os itens ({prato: quantidade}) de uma comanda"""
+    bases, adicionais = {}, {}
+    for nome, quantidade in itens.items():
+        prato = indice.prato(nome)
+        categoria = prato['cat'] if prato else None
+        estacao = ESTACAO_DA_CATEGORIA.get(categoria, ESTACAO_PADRAO)
+        tempo = TEMPOS_PREPARO.get(categoria, TEMPOS_PREPARO[ESTACOES[ESTACAO_PADRAO]["categorias"][0]])
+        bases[estacao] = max(bases.get(estacao, 0), tempo["base"])
+        adicionais[estacao] = adicionais.get(estacao, 0) + tempo["por_unidade"] * quantidade
+    return {estacao: bases[estacao] + adicionais[estacao] for estacao in bases}
+
+# =============== FILA DURÁVEL ===============
+class FilaCozinha:
+    """Comandas num banco SQLite (WAL, synchronous=FULL: a comanda confirmada sobrevive a uma
+    queda). Quem não é o agendador (checkout, botões da cozinha) registra também em `mudancas`,
+    que o agendador lê em lote a cada passo; toda escrita publica uma versão compartilhada,
+    para o painel só consultar o banco quando algo mudou."""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._local = threading.local()
+        self._criar_esquema()
+        self.versoes = versoes.abrir(caminho + ".versao", ("comandas",))
+        self.acordar = threading.Event()  # o agendador deste processo reage sem esperar o intervalo
+        self._lock = threading.Lock()
+        self._escrita = threading.Lock()
+        self._cond = threading.Condition()
+        self._pendentes = []  # comandas esperando o próximo commit em grupo
+        self._gravando = False
+        self._painel = None  # (versão, limite, painel)
+
+    def _conexao(self):
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.caminho, timeout=30, isolation_level=None)
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("PRAGMA synchronous=FULL")
+            self._local.conexao = conexao
+        return conexao
+
+    def _criar_esquema(self):
+        conexao = self._conexao()
+        conexao.executescript("""
+            CREATE TABLE IF NOT EXISTS comandas (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, criada REAL NOT NULL, itens TEXT NOT NULL,
+                tarefas TEXT NOT NULL, prazo REAL NOT NULL, estado TEXT NOT NULL,
+                inicio REAL, previsto REAL, pronta REAL, saida REAL);
+            CREATE INDEX IF NOT EXISTS comandas_estado ON comandas (estado, prazo);
+            CREATE TABLE IF NOT EXISTS mudancas (seq INTEGER PRIMARY KEY AUTOINCREMENT, comanda INTEGER NOT NULL);
+        """)
+
+    def assinatura(self, tabela=None):
+        linhas = self._conexao().execute("SELECT name, seq FROM sqlite_sequence ORDER BY name").fetchall()
+        return (self.caminho, tuple(linhas))
+
+    def versao(self):
+        if self.versoes is None:
+            return self.assinatura()
+        return self.versoes.versao("comandas", self.assinatura)
+
+    def _publicar(self, acordar=True):
+        if self.versoes is not None:
+            self.versoes.publicar(("comandas",), self.assinatura)
+        if acordar:
+            self.acordar.set()
+
+    def _escrever(self, operacao, acordar=True):
+        # As threads do processo esperam na trava (em ordem), não no busy timeout do SQLite
+        conexao = self._conexao()
+        with self._escrita:
+            conexao.execute("BEGIN IMMEDIATE")
+            try:
+                resultado = operacao(conexao)
+                conexao.execute("COMMIT")
+            except BaseException:
+                conexao.execute("ROLLBACK")
+                raise
+        self._publicar(acordar)
+        return resultado
+
+    # =============== ESCRITA (CHECKOUT E COZINHA) ===============
+    def enfileirar(self, itens, tarefas, agora=None):
+        """Cria a comanda e devolve o número dela. O prazo virtual (chegada + tempo estimado)
+        ordena a espera: pedido rápido passa na frente de um demorado que chegou há pouco,
+        mas nunca de um que já espera mais do que o próprio preparo.
+
+        Commit em grupo: a primeira thread que chega vira líder e grava numa única transação
+        (um fsync) tudo o que as outras enfileiraram enquanto a gravação anterior rodava."""
+        if not itens:
+            raise ValueError("comanda sem itens")
+        agora = time.time() if agora is None else agora
+        prazo = agora + max(tarefas.values(), default=0)
+        pedido = {"linha": (agora, json.dumps(itens, ensure_ascii=False), json.dumps(tarefas), prazo)}
+
+        with metricas.span("cozinha.enfileirar"), self._cond:
+            self._pendentes.append(pedido)
+            while "numero" not in pedido and "erro" not in pedido:
+                if self._gravando:
+                    self._cond.wait()
+                    continue
+                self._gravando = True
+                lote, self._pendentes = self._pendentes, []
+                self._cond.release()
+                try:
+                    numeros = self._escrever(lambda conexao: [_inserir(conexao, p["linha"]) for p in lote])
+                    for p, numero in zip(lote, numeros):
+                        p["numero"] = numero
+                except Exception as erro:
+                    for p in lote:
+                        p["erro"] = erro
+                finally:
+                    self._cond.acquire()
+                    self._gravando = False
+                    self._cond.notify_all()
+        if "erro" in pedido:
+            raise pedido["erro"]
+        return pedido["numero"]
+
+    def marcar(self, numero, estado, agora=None):
+        """Avanço feito pela cozinha: "pronto" ou "saiu" (para entrega)"""
+        coluna = {"pronto": "pronta", "saiu": "saida"}[estado]
+        agora = time.time() if agora is None else agora
+
+        def atualizar(conexao):
+            conexao.execute(f"UPDATE comandas SET estado = ?, {coluna} = ? WHERE id = ?", (estado, agora, numero))
+            conexao.execute("INSERT INTO mudancas (comanda) VALUES (?)", (numero,))
+
+        self._escrever(atualizar)
+
+    # =============== LEITURA ===============
+    def comanda(self, numero):
+        linha = self._conexao().execute(f"SELECT {_COLUNAS} FROM comandas WHERE id = ?", (numero,)).fetchone()
+        return _comanda(linha) if linha else None
+
+    def painel(self, limite=30):
+        """Contagem por estado, comandas em preparo, prontas aguardando entrega e as próximas da
+        espera (na ordem do agendador); consulta o banco só quando a versão da fila muda"""
+        versao = self.versao()
+        cache = self._painel
+        if cache is not None and cache[:2] == (versao, limite):
+            return cache[2]
+        conexao = self._conexao()
+        consulta = f"SELECT {_COLUNAS} FROM comandas WHERE estado = ? ORDER BY {{}} LIMIT ?"
+        with metricas.span("cozinha.painel"):
+            painel = {
+                "contagem": {estado: conexao.execute("SELECT COUNT(*) FROM comandas WHERE estado = ?",
+                                                     (estado,)).fetchone()[0]
+                             for estado in ("recebido", "em_preparo", "pronto")},
+                "em_preparo": [_comanda(l) for l in conexao.execute(consulta.format("previsto, id"), ("em_preparo", limite))],
+                "pronto": [_comanda(l) for l in conexao.execute(consulta.format("pronta, id"), ("pronto", limite))],
+                "recebido": [_comanda(l) for l in conexao.execute(consulta.format("prazo, id"), ("recebido", limite))],
+            }
+        with self._lock:
+            self._painel = (versao, limite, painel)
+        return painel
+
+def _inserir(conexao, linha):
+    cursor = conexao.execute(
+        "INSERT INTO comandas (criada, itens, tarefas, prazo, estado) VALUES (?, ?, ?, ?, 'recebido')", linha)
+    conexao.execute("INSERT INTO mudancas (comanda) VALUES (?)", (cursor.lastrowid,))
+    return cursor.lastrowid
+
+_COLUNAS = "id, criada, itens, tarefas, prazo, estado, inicio, previsto, pronta, saida"
+
+def _comanda(linha):
+    comanda = dict(zip(_COLUNAS.split(", "), linha))
+    comanda["itens"] = json.loads(comanda["itens"])
+    comanda["tarefas"] = json.loads(comanda["tarefas"])
+    return comanda
+
+# =============== AGENDADOR ===============
+class Agendador:
+    """Decide quando cada comanda começa, olhando só a memória (as comandas abertas).
+
+    A cada passo: lê em lote as mudanças desde o último passo; monta, para cada estação, quando
+    cada vaga fica livre (comandas em preparo ocupam a vaga até início + tempo da estação);
+    começa as comandas que cabem agora, na ordem do prazo virtual, e dá aos demais uma
+    previsão de pronto. Com `automatico`, a comanda em preparo fica pronta na previsão (sem o
+    toque da cozinha).
+    """
+
+    def __init__(self, fila, estacoes=ESTACOES, automatico=False, relogio=time.time):
+        self.fila = fila
+        self.estacoes = estacoes
+        self.automatico = automatico
+        self.relogio = relogio
+        self.abertas = {}  # número -> comanda (só recebido / em preparo)
+        self.ultima_mudanca = 0
+        self._proximo_evento = 0.0  # antes disso, sem mudanças, um passo não teria o que fazer
+        self._ultimo = None
+
+    def carregar(self):
+        """Estado inicial (partida ou troca de agendador): comandas abertas e a última mudança"""
+        conexao = self.fila._conexao()
+        conexao.execute("BEGIN")
+        try:
+            linhas = conexao.execute(f"SELECT {_COLUNAS} FROM comandas WHERE estado IN (?, ?)", ABERTOS).fetchall()
+            self.ultima_mudanca = conexao.execute("SELECT COALESCE(MAX(seq), 0) FROM mudancas").fetchone()[0]
+        finally:
+            conexao.execute("COMMIT")
+        self.abertas = {linha[0]: _comanda(linha) for linha in linhas}
+
+    def _ler_mudancas(self):
+        conexao = self.fila._conexao()
+        mudancas = conexao.execute("SELECT seq, comanda FROM mudancas WHERE seq > ? ORDER BY seq",
+                                   (self.ultima_mudanca,)).fetchall()
+        if not mudancas:
+            return 0
+        self.ultima_mudanca = mudancas[-1][0]
+        numeros = list({numero for _, numero in mudancas})
+        for lote in range(0, len(numeros), LOTE_CONSULTA):
+            parte = numeros[lote:lote + LOTE_CONSULTA]
+            linhas = conexao.execute(f"SELECT {_COLUNAS} FROM comandas WHERE id IN ({','.join('?' * len(parte))})",
+                                     parte).fetchall()
+            for linha in linhas:
+                comanda = _comanda(linha)
+                if comanda["estado"] in ABERTOS:
+                    self.abertas[comanda["id"]] = comanda
+                else:
+                    self.abertas.pop(comanda["id"], None)
+        return len(mudancas)
+
+    def _vagas(self, agora, em_preparo):
+        vagas = {estacao: [agora] * dados["capacidade"] for estacao, dados in self.estacoes.items()}
+        for comanda in em_preparo:
+            for estacao, duracao in comanda["tarefas"].items():
+                restante = comanda["inicio"] + duracao - agora
+                if restante > 0:
+                    heap = vagas.setdefault(estacao, [agora])
+                    heapq.heappush(heap, heapq.heappop(heap) + restante)
+        return vagas
+
+    def passo(self, agora=None):
+        """Um passo do agendador; devolve o que mudou (para logs e benchmark)"""
+        agora = self.relogio() if agora is None else agora
+        mudancas = self._ler_mudancas()
+        if not mudancas and agora < self._proximo_evento:
+            return {**self._ultimo, "mudancas": 0, "iniciadas": 0, "prontas": 0}
+
+        em_preparo = [c for c in self.abertas.values() if c["estado"] == "em_preparo"]
+        prontas = [c for c in em_preparo if c["previsto"] <= agora] if self.automatico else []
+        if prontas:
+            concluidas = {c["id"] for c in prontas}
+            em_preparo = [c for c in em_preparo if c["id"] not in concluidas]
+        vagas = self._vagas(agora, em_preparo)
+
+        # Despacho: na ordem do prazo virtual, começa agora quem tem vaga em todas as estações
+        # de que precisa. Comanda já atrasada (passou do prazo) que não coube reserva as estações
+        # que lhe faltam: as mais novas não passam mais na frente dela nelas.
+        esperando = sorted((c for c in self.abertas.values() if c["estado"] == "recebido"),
+                           key=lambda c: (c["prazo"], c["id"]))
+        livres = {estacao: sum(1 for livre in heap if livre <= agora) for estacao, heap in vagas.items()}
+        total_livres = sum(livres.values())
+        reservadas = set()
+        iniciadas, restantes = [], []
+        for posicao, comanda in enumerate(esperando):
+            if not total_livres:
+                restantes.extend(esperando[posicao:])
+                break
+            tarefas = comanda["tarefas"]
+            for estacao in tarefas:
+                if estacao not in vagas:  # estação que saiu da configuração: uma vaga
+                    vagas[estacao], livres[estacao] = [agora], 1
+                    total_livres += 1
+            faltam = [e for e in tarefas if not livres[e] or e in reservadas]
+            if not faltam:
+                for estacao, duracao in tarefas.items():
+                    livres[estacao] -= 1
+                    total_livres -= 1
+                    heapq.heapreplace(vagas[estacao], agora + duracao)
+                previsto = agora + max(tarefas.values(), default=0)
+                iniciadas.append((agora, previsto, comanda["id"]))
+                comanda.update(estado="em_preparo", inicio=agora, previsto=previsto)
+                continue
+            if comanda["prazo"] <= agora:
+                reservadas.update(faltam)
+            restantes.append(comanda)
+        self._proximo_evento = min((livre for heap in vagas.values() for livre in heap if livre > agora),
+                                   default=float("inf"))
+
+        # Previsão de quem espera: cada uma, na mesma ordem, pega a vaga que libera primeiro em
+        # cada estação e começa quando a última delas libera (as partes saem juntas)
+        previsoes = []
+        for comanda in restantes:
+            tarefas = comanda["tarefas"]
+            heaps = [vagas.setdefault(estacao, [agora]) for estacao in tarefas]
+            inicio = max(heap[0] for heap in heaps)
+            for heap, duracao in zip(heaps, tarefas.values()):
+                heapq.heapreplace(heap, inicio + duracao)
+            previsto = inicio + max(tarefas.values())
+            if comanda["previsto"] is None or abs(previsto - comanda["previsto"]) >= TOLERANCIA_PREVISAO:
+                previsoes.append((previsto, comanda["id"]))
+                comanda["previsto"] = previsto
+
+        for comanda in prontas:
+            del self.abertas[comanda["id"]]
+        if iniciadas or previsoes or prontas or mudancas:
+            self._gravar(iniciadas, previsoes, [(c["previsto"], c["id"]) for c in prontas], mudancas)
+        self._ultimo = {"mudancas": mudancas, "iniciadas": len(iniciadas), "prontas": len(prontas),
+                        "esperando": len(restantes), "em_preparo": len(em_preparo) + len(iniciadas)}
+        return self._ultimo
+
+    def _gravar(self, iniciadas, previsoes, prontas, mudancas):
+        def gravar(conexao):
+            conexao.executemany("UPDATE comandas SET estado = 'em_preparo', inicio = ?, previsto = ? "
+                                "WHERE id = ? AND estado = 'recebido'", iniciadas)
+            conexao.executemany("UPDATE comandas SET previsto = ? WHERE id = ? AND estado = 'recebido'", previsoes)
+            conexao.executemany("UPDATE comandas SET estado = 'pronto', pronta = ? "
+                                "WHERE id = ? AND estado = 'em_preparo'", prontas)
+            if mudancas:  # já aplicadas na memória
+                conexao.execute("DELETE FROM mudancas WHERE seq <= ?", (self.ultima_mudanca,))
+
+        if iniciadas or previsoes or prontas:
+            self.fila._escrever(gravar, acordar=False)
+        else:
+            with self.fila._escrita:  # só a limpeza: não muda o que o painel mostra
+                self.fila._conexao().execute("DELETE FROM mudancas WHERE seq <= ?", (self.ultima_mudanca,))
+
+    def executar(self, parar=None, intervalo=INTERVALO):
+        parar = parar or threading.Event()
+        while not parar.is_set():
+            self.fila.acordar.clear()
+            try:
+                with metricas.span("cozinha.agendar"):
+                    self.passo()
+            except sqlite3.Error:
+                pass  # banco ocupado/travado: tenta no próximo passo
+            except Exception:
+                # Erro inesperado não pode matar a thread: sem ela as comandas param em "recebido"
+                _log.exception("agendador da cozinha: passo falhou; tenta de novo no próximo")
+            self.fila.acordar.wait(intervalo)
+
+# =============== FILA E AGENDADOR DO PROCESSO ===============
+_lock = threading.Lock()
+_fila = None
+_configurada = False
+_agendador = None
+
+def obter_fila():
+    """Fila por BURGER_COZINHA: vazio/"0" desliga (padrão), "1" usa cozinha.db na pasta de dados,
+    outro valor é o caminho do banco. Desligada, nenhum processo cria o banco nem sobe o agendador."""
+    global _fila, _configurada
+    if not _configurada:
+        with _lock:
+            if not _configurada:
+                valor = os.environ.get("BURGER_COZINHA", "")
+                if valor not in ("", "0"):
+                    pasta = os.environ.get("BURGER_DADOS", armazenamento.BASE_DIR)
+                    _fila = FilaCozinha(os.path.join(pasta, "cozinha.db") if valor == "1" else valor)
+                _configurada = True
+    return _fila
+
+def configurar_fila(fila):
+    """Troca a fila do processo (None desliga)"""
+    global _fila, _configurada
+    with _lock:
+        _fila = fila
+        _configurada = True
+
+def enviar_pedido(itens):
+    """Manda os itens atendidos de um pedido para a cozinha; número da comanda (None se desligada)"""
+    from restaurante.indice import obter_indice
+
+    fila = obter_fila()
+    if fila is None or not itens:
+        return None
+    return fila.enfileirar(itens, tarefas_do_pedido(itens, obter_indice()))
+
+def _liderar(fila, automatico):
+    """Só um processo por fila agenda: quem conseguir a trava do arquivo .lider"""
+    with open(fila.caminho + ".lider", "a") as trava:
+        while not travas.tentar(trava):  # sem flock (Windows) todo processo se considera líder
+            time.sleep(ESPERA_LIDER)
+        agendador = Agendador(fila, automatico=automatico)
+        agendador.carregar()
+        agendador.executar()
+
+def iniciar():
+    """Thread do agendador neste processo (uma por processo; agenda só se for o líder da fila).
+    BURGER_COZINHA_AUTOMATICA=1 marca as comandas como prontas na previsão (demonstração)."""
+    global _agendador
+    fila = obter_fila()
+    if fila is None or _agendador is not None:
+        return
+    automatico = os.environ.get("BURGER_COZINHA_AUTOMATICA", "") not in ("", "0")
+    with _lock:
+        if _agendador is None:
+            _agendador = threading.Thread(target=_liderar, args=(fila, automatico), name="agendador-cozinha", daemon=True)
+            _agendador.start()
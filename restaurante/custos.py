@@ -0,0 +1,59 @@
+# restaurante/custos.py - CUSTO E MARGEM DO CARDÁPIO INTEIRO (MATRIZ DE RECEITAS NO NUMPY)
+import threading
+
+import numpy as np
+import pandas as pd
+
+from restaurante.receitas import obter_receitas
+
+class MatrizCustos:
+    """Custo de todos os pratos num único produto matriz-vetor: receitas × custos unitários.
+
+    Ingrediente sem "custo" cadastrado (ou que não existe mais) entra como NaN: o prato fica
+    marcado em `sem_custo` em vez de parecer mais barato do que é.
+    """
+
+    def __init__(self, receitas):
+        self.receitas = receitas
+        self.nomes = receitas.nomes
+        self.categorias = receitas.categorias
+        self.precos = receitas.precos
+        self.custos_unitarios = receitas.por_ingrediente(receitas.ingredientes, 'custo', np.nan)
+        self._calcular()
+
+    def _calcular(self):
+        parcelas = self.receitas.quantidades * self.custos_unitarios[self.receitas.colunas]
+        faltando = np.isnan(parcelas)
+        self.custos = self.receitas.somar_por_prato(np.where(faltando, 0.0, parcelas))
+        self.sem_custo = self.receitas.somar_por_prato(faltando) > 0
+        self.lucros = self.precos - self.custos
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.margens = np.where(self.precos > 0, self.lucros / self.precos * 100, 0.0)
+
+    def tabela(self):
+        """Um DataFrame com uma linha por prato (para st.dataframe)"""
+        return pd.DataFrame({
+            "prato": self.nomes,
+            "categoria": self.categorias,
+            "preço": self.precos,
+            "custo": self.custos,
+            "lucro": self.lucros,
+            "margem": self.margens,
+            "custo completo": ~self.sem_custo,
+        })
+
+# =============== MATRIZ DO PROCESSO ===============
+_lock = threading.Lock()
+_atual = None
+
+def obter_custos():
+    """Custos do catálogo atual; refeitos só quando a matriz de receitas muda"""
+    global _atual
+    receitas = obter_receitas()
+    matriz = _atual
+    if matriz is not None and matriz.receitas is receitas:
+        return matriz
+    with _lock:
+        if _atual is None or _atual.receitas is not receitas:
+            _atual = MatrizCustos(receitas)
+        return _atual
@@ -0,0 +1,322 @@
+# restaurante/diario.py - DIÁRIO (APPEND-ONLY) DE PEDIDOS E MOVIMENTOS DE ESTOQUE
+import argparse
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from types import MappingProxyType
+
+from restaurante import armazenamento, travas
+
+DIARIO_DIR = os.path.join(armazenamento.BASE_DIR, "diario")
+
+# Cada linha do diário é um evento JSON. O campo "estoque" traz os valores absolutos resultantes,
+# então reconstruir o estado é só aplicar os eventos em ordem (dict.update), sem depender da base.
+#   {"tipo": "pedido", "ts": ..., "itens": {prato: qtd}, "movimentos": {ing: -qtd}, "estoque": {ing: valor}}
+#   {"tipo": "ajuste", "ts": ..., "movimentos": {ing: delta}, "estoque": {ing: valor}}
+#   {"tipo": "entrega", "ts": ..., "movimentos": {ing: +qtd}, "estoque": {ing: valor}}
+#   {"tipo": "estorno", "ts": ..., "itens": {prato: qtd}, "movimentos": {ing: +qtd}, "estoque": {ing: valor}}
+
+class _TransacaoDiario:
+    def __init__(self, diario):
+        self.diario = diario
+        self.eventos = []
+        self._estoque = {}
+
+    def estoque(self, nome, padrao=None):
+        """Estoque atual do ingrediente (o diário só conhece os que já movimentaram)"""
+        if nome in self._estoque:
+            return self._estoque[nome]
+        return self.diario._estado.get(nome, padrao)
+
+    def registrar(self, tipo, estoque, **dados):
+        evento = {"tipo": tipo, "ts": time.time(), **dados, "estoque": estoque}
+        self.eventos.append(evento)
+        self._estoque.update(estoque)
+        return evento
+
+class Diario:
+    """Diário de eventos com commit em grupo, snapshots periódicos e compactação.
+
+    - Escritas: sob uma trava (threads + flock entre processos) o processo alcança o fim do
+      arquivo, valida e faz um único write() com O_APPEND; o fsync é feito fora da trava por
+      um "líder" que sincroniza de uma vez tudo o que as outras threads já escreveram.
+    - Snapshot: a cada `eventos_por_snapshot` eventos grava o estado em snapshot.json, devolve
+      o estoque para o armazenamento e começa um novo segmento; o segmento antigo vai para
+      arquivo/ (histórico de pedidos) ou é apagado.
+    - Partida: carrega o último snapshot e reaplica só a cauda do segmento atual.
+    """
+
+    def __init__(self, pasta=DIARIO_DIR, eventos_por_snapshot=1000, manter_historico=True):
+        self.pasta = pasta
+        self.eventos_por_snapshot = eventos_por_snapshot
+        self.manter_historico = manter_historico
+        self.arquivo_snapshot = os.path.join(pasta, "snapshot.json")
+        self.arquivo_trava = os.path.join(pasta, ".trava")
+        self.pasta_arquivo = os.path.join(pasta, "arquivo")
+        os.makedirs(self.pasta_arquivo, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._estado = {}
+        self._segmento = 0
+        self._posicao = 0
+        self._pendentes_snapshot = 0
+        self.versao = 0
+        self._fd = None
+        self._sobreposicao = None
+
+        # Commit em grupo: bytes escritos por este processo x bytes já com fsync
+        self._cond = threading.Condition()
+        self._escrito = 0
+        self._sincronizado = 0
+        self._sincronizando = False
+
+        with self._lock:
+            self._carregar_snapshot()
+            self._alcancar()
+
+    # =============== ARQUIVOS ===============
+    def _caminho_segmento(self, segmento):
+        return os.path.join(self.pasta, f"diario-{segmento:06d}.jsonl")
+
+    def _abrir_segmento(self):
+        if self._fd is not None:
+            # Espera um fsync em andamento e garante o que este processo já escreveu
+            with self._cond:
+                while self._sincronizando:
+                    self._cond.wait()
+                os.fsync(self._fd)
+                self._sincronizado = self._escrito
+            os.close(self._fd)
+        self._fd = os.open(self._caminho_segmento(self._segmento), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def _assinatura_snapshot(self):
+        try:
+            info = os.stat(self.arquivo_snapshot)
+        except OSError:
+            return None
+        return (info.st_mtime_ns, info.st_ino)
+
+    def _carregar_snapshot(self):
+        snapshot = {"segmento": 0, "posicao": 0, "estoque": {}}
+        self._snapshot_lido = self._assinatura_snapshot()
+        if self._snapshot_lido is not None:
+            with open(self.arquivo_snapshot, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        self._estado = dict(snapshot["estoque"])
+        self._segmento = snapshot["segmento"]
+        self._posicao = snapshot["posicao"]
+        self.versao += 1
+        self._abrir_segmento()
+
+    def _alcancar(self):
+        """Aplica os eventos que outros processos (ou threads) já escreveram no segmento"""
+        caminho = self._caminho_segmento(self._segmento)
+        try:
+            tamanho = os.path.getsize(caminho)
+        except OSError:
+            tamanho = 0
+        if tamanho < self._posicao or self._assinatura_snapshot() != self._snapshot_lido:
+            # Outro processo compactou: recomeça pelo snapshot novo
+            self._carregar_snapshot()
+            return self._alcancar()
+        if tamanho == self._posicao:
+            return
+        with open(caminho, "rb") as f:
+            f.seek(self._posicao)
+            dados = f.read(tamanho - self._posicao)
+        fim = dados.rfind(b"\n") + 1  # ignora linha incompleta (escrita em andamento)
+        for linha in dados[:fim].splitlines():
+            if linha.strip():
+                self._estado.update(json.loads(linha)["estoque"])
+        if fim:
+            self._posicao += fim
+            self.versao += 1
+
+    def _reparar_cauda(self):
+        """Descarta uma última linha incompleta deixada por uma queda no meio de um write()"""
+        caminho = self._caminho_segmento(self._segmento)
+        tamanho = os.path.getsize(caminho)
+        if tamanho > self._posicao:
+            os.truncate(caminho, self._posicao)
+
+    def _trava_processos(self):
+        return travas.exclusiva_em(self.arquivo_trava)
+
+    # =============== ESCRITA COM COMMIT EM GRUPO ===============
+    @contextmanager
+    def transacao(self):
+        """Lê o estoque atual e registra eventos; só retorna depois do fsync (durável)"""
+        with self._lock, self._trava_processos():
+            self._alcancar()
+            self._reparar_cauda()
+            tx = _TransacaoDiario(self)
+            yield tx
+            if not tx.eventos:
+                return
+            conteudo = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in tx.eventos).encode("utf-8")
+            os.write(self._fd, conteudo)
+            self._posicao += len(conteudo)
+            for evento in tx.eventos:
+                self._estado.update(evento["estoque"])
+            self.versao += 1
+            self._pendentes_snapshot += len(tx.eventos)
+            with self._cond:
+                self._escrito += len(conteudo)
+                alvo = self._escrito
+        self._sincronizar_ate(alvo)
+        if self._pendentes_snapshot >= self.eventos_por_snapshot:
+            self.compactar(se_necessario=True)
+
+    def _sincronizar_ate(self, alvo):
+        with self._cond:
+            while self._sincronizado < alvo:
+                if self._sincronizando:
+                    self._cond.wait()
+                    continue
+                # Esta thread vira líder e faz o fsync de tudo que já foi escrito
+                self._sincronizando = True
+                limite, fd = self._escrito, self._fd
+                self._cond.release()
+                try:
+                    os.fsync(fd)
+                finally:
+                    self._cond.acquire()
+                    self._sincronizando = False
+                    self._sincronizado = max(self._sincronizado, limite)
+                    self._cond.notify_all()
+
+    # =============== SNAPSHOT E COMPACTAÇÃO ===============
+    def compactar(self, se_necessario=False):
+        """Grava o estado atual como snapshot, devolve o estoque ao armazenamento e troca de segmento"""
+        with self._lock, self._trava_processos():
+            if se_necessario and self._pendentes_snapshot < self.eventos_por_snapshot:
+                return  # outra thread já compactou
+            self._alcancar()
+            antigo = self._segmento
+            snapshot = {"segmento": antigo + 1, "posicao": 0, "ts": time.time(), "estoque": self._estado}
+            temporario = self.arquivo_snapshot + ".tmp"
+            with open(temporario, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporario, self.arquivo_snapshot)
+            self._snapshot_lido = self._assinatura_snapshot()
+            self._segmento, self._posicao = antigo + 1, 0
+            self._pendentes_snapshot = 0
+            self._abrir_segmento()
+
+            caminho_antigo = self._caminho_segmento(antigo)
+            if os.path.exists(caminho_antigo):
+                if self.manter_historico:
+                    os.replace(caminho_antigo, os.path.join(self.pasta_arquivo, os.path.basename(caminho_antigo)))
+                else:
+                    os.remove(caminho_antigo)
+
+            # Mantém o arquivo do armazenamento próximo do estado real
+            with armazenamento.obter().transacao() as tx:
+                for nome, estoque in self._estado.items():
+                    if tx.obter("ingredientes", nome) is not None:
+                        tx.atualizar("ingredientes", nome, {"estoque": estoque})
+
+    # =============== LEITURA ===============
+    def estoque(self):
+        with self._lock:
+            self._alcancar()
+            return dict(self._estado)
+
+    def sobrepor(self, ingredientes):
+        """Snapshot de ingredientes com o estoque vindo do diário (cacheado por versão)"""
+        with self._lock:
+            self._alcancar()
+            cache = self._sobreposicao
+            if cache is not None and cache[0] is ingredientes and cache[1] == self.versao:
+                return cache[2]
+            estado = self._estado
+            resultado = tuple(
+                MappingProxyType({**ing, "estoque": estado[ing['nome']]}) if ing['nome'] in estado else ing
+                for ing in ingredientes
+            )
+            self._sobreposicao = (ingredientes, self.versao, resultado)
+            return resultado
+
+    def eventos(self, incluir_arquivo=True):
+        """Percorre os eventos em ordem (histórico arquivado + segmento atual)"""
+        caminhos = []
+        if incluir_arquivo:
+            caminhos += [os.path.join(self.pasta_arquivo, n) for n in sorted(os.listdir(self.pasta_arquivo))]
+        caminhos += [os.path.join(self.pasta, n) for n in sorted(os.listdir(self.pasta))
+                     if n.startswith("diario-") and n.endswith(".jsonl")]
+        for caminho in caminhos:
+            with open(caminho, "rb") as f:
+                for linha in f:
+                    if linha.endswith(b"\n") and linha.strip():
+                        yield json.loads(linha)
+
+    def eventos_desde(self, cursor=(0, 0)):
+        """Eventos completos gravados depois de `cursor` (segmento, posição) e o cursor seguinte.
+
+        Para quem acompanha o histórico aos poucos: lê só os bytes novos (segmentos só crescem e
+        os arquivados mantêm o número). Um segmento que some entre a listagem e a leitura (foi
+        arquivado nesse meio tempo) para a leitura ali; a próxima chamada continua dele.
+        """
+        segmento_inicial, posicao = cursor
+        segmentos = {}
+        for pasta in (self.pasta_arquivo, self.pasta):
+            for nome in os.listdir(pasta):
+                if nome.startswith("diario-") and nome.endswith(".jsonl") and int(nome[7:-6]) >= segmento_inicial:
+                    segmentos[int(nome[7:-6])] = os.path.join(pasta, nome)
+        eventos = []
+        for numero in sorted(segmentos):
+            inicio = posicao if numero == segmento_inicial else 0
+            try:
+                with open(segmentos[numero], "rb") as f:
+                    f.seek(inicio)
+                    dados = f.read()
+            except FileNotFoundError:
+                break
+            fim = dados.rfind(b"\n") + 1  # cauda sem \n ainda está sendo escrita
+            eventos += [json.loads(linha) for linha in dados[:fim].splitlines() if linha.strip()]
+            cursor = (numero, inicio + fim)
+        return eventos, cursor
+
+# =============== DIÁRIO DO PROCESSO ===============
+_lock = threading.Lock()
+_diario = None
+_configurado = False
+
+def obter_diario():
+    """Diário configurado por BURGER_DIARIO ("1" usa ./diario, outro valor é a pasta); None se desligado"""
+    global _diario, _configurado
+    if not _configurado:
+        with _lock:
+            if not _configurado:
+                valor = os.environ.get("BURGER_DIARIO", "")
+                if valor and valor != "0":
+                    _diario = Diario(DIARIO_DIR if valor == "1" else valor)
+                _configurado = True
+    return _diario
+
+def configurar_diario(diario):
+    """Troca o diário do processo (None desliga)"""
+    global _diario, _configurado
+    with _lock:
+        _diario = diario
+        _configurado = True
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manutenção do diário de pedidos e estoque")
+    parser.add_argument("comando", choices=["estado", "compactar"])
+    parser.add_argument("--pasta", default=DIARIO_DIR)
+    args = parser.parse_args(argv)
+
+    diario = Diario(args.pasta)
+    if args.comando == "compactar":
+        diario.compactar()
+        print(f"✅ Snapshot gravado; segmento atual: {diario._segmento}")
+    else:
+        print(json.dumps(diario.estoque(), ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
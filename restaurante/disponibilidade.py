@@ -0,0 +1,91 @@
+# restaurante/disponibilidade.py - DISPONIBILIDADE DOS PRATOS COM RECÁLCULO INCREMENTAL
+import threading
+
+from restaurante import catalogo, metricas
+
+class TabelaDisponibilidade:
+    """Índice reverso ingrediente -> pratos e tabela de faltantes por prato.
+
+    Quando o estoque muda, só os pratos que usam os ingredientes alterados são recalculados.
+    """
+
+    def __init__(self, pratos):
+        self.pratos = pratos
+        self.ingredientes = None
+        self.receitas = {p['nome']: tuple(p.get('ingredientes', ())) for p in pratos}
+        usos = {}
+        for prato in pratos:
+            for ing_prato in prato.get('ingredientes', ()):
+                usos.setdefault(ing_prato['nome'], {})[prato['nome']] = None
+        self.usos = {nome: tuple(pratos_ing) for nome, pratos_ing in usos.items()}
+        self._estoque = {}
+        self._faltantes = {}
+
+    def _recalcular(self, nomes_pratos):
+        for nome in nomes_pratos:
+            faltantes = []
+            for ing_prato in self.receitas[nome]:
+                estoque = self._estoque.get(ing_prato['nome'])
+                if estoque is None or estoque < ing_prato['quantidade']:
+                    faltantes.append(ing_prato['nome'])
+            self._faltantes[nome] = tuple(faltantes)
+
+    def pratos_afetados(self, nomes_ingredientes):
+        afetados = {}
+        for nome in nomes_ingredientes:
+            for nome_prato in self.usos.get(nome, ()):
+                afetados[nome_prato] = None
+        return list(afetados)
+
+    def aplicar_estoque(self, mudancas):
+        """Aplica {ingrediente: novo estoque (ou None se removido)} e recalcula só os pratos afetados"""
+        for nome, estoque in mudancas.items():
+            if estoque is None:
+                self._estoque.pop(nome, None)
+            else:
+                self._estoque[nome] = estoque
+        afetados = self.pratos_afetados(mudancas)
+        self._recalcular(afetados)
+        return afetados
+
+    def sincronizar(self, ingredientes):
+        """Compara com um novo snapshot de ingredientes e aplica só as diferenças"""
+        novo = {i['nome']: i['estoque'] for i in ingredientes}
+        if self.ingredientes is None:
+            self._estoque = novo
+            self._recalcular(self.receitas)
+            afetados = list(self.receitas)
+        else:
+            mudancas = {nome: novo.get(nome) for nome in self._estoque.keys() | novo.keys()
+                        if novo.get(nome) != self._estoque.get(nome)}
+            afetados = self.aplicar_estoque(mudancas)
+        self.ingredientes = ingredientes
+        return afetados
+
+    def faltantes(self, nome_prato):
+        return self._faltantes.get(nome_prato, ())
+
+    def disponivel(self, nome_prato):
+        return not self._faltantes.get(nome_prato)
+
+    def usado_em(self, nome_ingrediente):
+        return self.usos.get(nome_ingrediente, ())
+
+# =============== TABELA DO PROCESSO ===============
+_lock = threading.Lock()
+_tabela = None
+
+def obter_disponibilidade():
+    """Tabela de disponibilidade do catálogo atual, atualizada de forma incremental"""
+    global _tabela
+    pratos = catalogo.carregar_pratos()
+    ingredientes = catalogo.carregar_ingredientes()
+    tabela = _tabela
+    if tabela is not None and tabela.pratos is pratos and tabela.ingredientes is ingredientes:
+        return tabela
+    with _lock, metricas.span("disponibilidade.atualizar"):
+        if _tabela is None or _tabela.pratos is not pratos:
+            _tabela = TabelaDisponibilidade(pratos)
+        if _tabela.ingredientes is not ingredientes:
+            _tabela.sincronizar(ingredientes)
+        return _tabela
@@ -0,0 +1,126 @@
+# restaurante/envio.py - ENVIO ASSÍNCRONO DE PEDIDOS (POOL LIMITADO DE THREADS) E SITUAÇÃO DO PEDIDO
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from restaurante import cozinha, metricas
+from restaurante.pedidos import estornar_pedido, finalizar_pedido
+
+TRABALHADORES = 8     # finalizações simultâneas (BURGER_CHECKOUT_THREADS; 0 = no próprio clique)
+FILA_MAXIMA = 64      # pedidos esperando um trabalhador antes de recusar (BURGER_CHECKOUT_FILA)
+MAXIMO_PEDIDOS = 10000  # pedidos lembrados para consulta de situação (os mais antigos saem)
+
+# "enviando" é do envio; recebido / em preparo / pronto / saiu vêm da fila da cozinha
+# ("aceito" quando a fila da cozinha está desligada e não há comanda para acompanhar)
+FINAIS = ("saiu", "aceito", "recusado", "erro")
+
+class Pedido:
+    """Um pedido enviado: código, itens e, depois de processado, o resultado da finalização"""
+
+    def __init__(self, codigo, itens, parcial):
+        self.codigo = codigo
+        self.itens = itens
+        self.parcial = parcial
+        self.criado = time.time()
+        self.situacao = "enviando"
+        self.resultado = None  # ResultadoPedido
+        self.erro = None
+        self.baixado = False   # estoque baixado e não estornado: os itens não podem voltar ao carrinho
+        self.concluido = threading.Event()
+
+class EnvioPedidos:
+    """Finaliza pedidos num pool limitado de threads: o clique em "Finalizar" só registra o
+    pedido e volta na hora com um código; baixa de estoque, diário e comanda da cozinha
+    (gravações em disco) rodam no pool. Com o pool e a fila de espera cheios, `enviar`
+    devolve None (o cliente tenta de novo) em vez de acumular pedidos sem limite."""
+
+    def __init__(self, trabalhadores=TRABALHADORES, fila_maxima=FILA_MAXIMA):
+        self.trabalhadores = trabalhadores
+        self._executor = ThreadPoolExecutor(trabalhadores, thread_name_prefix="checkout") if trabalhadores else None
+        self._vagas = threading.BoundedSemaphore(trabalhadores + fila_maxima) if trabalhadores else None
+        self._lock = threading.Lock()
+        self._pedidos = OrderedDict()
+
+    def enviar(self, carrinho, parcial=False):
+        """Código do pedido, ou None se o envio está saturado"""
+        if self._vagas is not None and not self._vagas.acquire(blocking=False):
+            metricas.observar("pedido.recusado_sobrecarga", 0.0)
+            return None
+        pedido = Pedido(uuid.uuid4().hex[:8].upper(), dict(carrinho), parcial)
+        with self._lock:
+            self._pedidos[pedido.codigo] = pedido
+            while len(self._pedidos) > MAXIMO_PEDIDOS:
+                self._pedidos.popitem(last=False)
+        if self._executor is None:
+            self._processar(pedido)
+        else:
+            self._executor.submit(self._processar, pedido)
+        return pedido.codigo
+
+    def _processar(self, pedido):
+        try:
+            metricas.observar("pedido.espera", time.time() - pedido.criado)
+            resultado = finalizar_pedido(pedido.itens, parcial=pedido.parcial)
+            pedido.resultado = resultado
+            pedido.baixado = bool(resultado.consumo)
+            if resultado.atendidos and (resultado.aceito or pedido.parcial):
+                try:
+                    resultado.comanda = cozinha.enviar_pedido(resultado.atendidos)
+                except Exception:
+                    # Sem comanda o pedido não existe para a cozinha: devolve a baixa antes de o
+                    # cliente tentar de novo (se o estorno também falhar, `baixado` continua True)
+                    estornar_pedido(resultado)
+                    pedido.baixado = False
+                    raise
+            pedido.situacao = "recebido" if resultado.comanda or resultado.aceito else "recusado"
+        except Exception as erro:  # o cliente vê "erro" em vez de esperar para sempre
+            pedido.erro = erro
+            pedido.situacao = "erro"
+        finally:
+            if self._vagas is not None:
+                self._vagas.release()
+            pedido.concluido.set()
+
+    def pedido(self, codigo):
+        return self._pedidos.get(codigo)
+
+    def situacao(self, codigo):
+        """(situação, pedido); a situação segue a comanda na cozinha depois de recebido.
+        None se o código não é conhecido (processo reiniciado ou pedido muito antigo)."""
+        pedido = self._pedidos.get(codigo)
+        if pedido is None:
+            return None
+        if pedido.situacao != "recebido":
+            return pedido.situacao, pedido
+        if pedido.resultado.comanda is None:
+            return "aceito", pedido
+        fila = cozinha.obter_fila()
+        comanda = fila.comanda(pedido.resultado.comanda) if fila is not None else None
+        return (comanda["estado"] if comanda else pedido.situacao), pedido
+
+    def ocupacao(self):
+        """Pedidos no pool (em processamento ou esperando)"""
+        with self._lock:
+            return sum(1 for pedido in self._pedidos.values() if not pedido.concluido.is_set())
+
+# =============== ENVIO DO PROCESSO ===============
+_lock = threading.Lock()
+_envio = None
+
+def obter_envio():
+    global _envio
+    if _envio is None:
+        with _lock:
+            if _envio is None:
+                _envio = EnvioPedidos(int(os.environ.get("BURGER_CHECKOUT_THREADS", TRABALHADORES)),
+                                      int(os.environ.get("BURGER_CHECKOUT_FILA", FILA_MAXIMA)))
+    return _envio
+
+def configurar_envio(envio):
+    """Troca o envio do processo (ferramentas e benchmarks)"""
+    global _envio
+    with _lock:
+        _envio = envio
@@ -0,0 +1,58 @@
+# restaurante/estaticos.py - ARQUIVOS ESTÁTICOS (FUNDO DO LOGIN) PREPARADOS UMA VEZ POR PROCESSO
+import base64
+import hashlib
+import os
+import threading
+
+from restaurante import armazenamento, imagens
+
+# Pasta servida pelo Streamlit em app/static/ quando server.enableStaticServing está ligado
+STATIC_DIR = os.path.join(armazenamento.BASE_DIR, "static")
+LARGURA_FUNDO = 1600
+QUALIDADE_FUNDO = 60
+
+_lock = threading.Lock()
+_cache = {}  # (caminho, servir_estatico) -> (assinatura, url)
+
+def _preparar(caminho, servir_estatico):
+    with open(caminho, "rb") as f:
+        conteudo = f.read()
+    if imagens.Image is not None:
+        # O fundo fica atrás de um gradiente quase preto: 1600px em JPEG progressivo bastam
+        conteudo = imagens.gerar_derivado(conteudo, LARGURA_FUNDO, "jpeg", QUALIDADE_FUNDO)
+
+    if not servir_estatico:
+        return "data:image/jpeg;base64," + base64.b64encode(conteudo).decode()
+
+    # Nome com hash do conteúdo: o navegador pode guardar o arquivo em cache para sempre
+    base = os.path.splitext(os.path.basename(caminho))[0]
+    nome = f"{base}-{hashlib.sha256(conteudo).hexdigest()[:16]}.jpg"
+    destino = os.path.join(STATIC_DIR, nome)
+    if not os.path.exists(destino):
+        os.makedirs(STATIC_DIR, exist_ok=True)
+        temporario = f"{destino}.{threading.get_ident()}.tmp"
+        with open(temporario, "wb") as f:
+            f.write(conteudo)
+        os.replace(temporario, destino)
+    return f"app/static/{nome}"
+
+def url_imagem(caminho, servir_estatico=False):
+    """URL para usar em CSS: arquivo estático versionado ou data URI (fallback). None se não existir.
+
+    O resultado é recalculado só quando o arquivo de origem muda (mtime/tamanho).
+    """
+    try:
+        info = os.stat(caminho)
+    except OSError:
+        return None
+    assinatura = (info.st_mtime_ns, info.st_size)
+    chave = (caminho, servir_estatico)
+    entrada = _cache.get(chave)
+    if entrada is not None and entrada[0] == assinatura:
+        return entrada[1]
+    with _lock:
+        entrada = _cache.get(chave)
+        if entrada is None or entrada[0] != assinatura:
+            entrada = (assinatura, _preparar(caminho, servir_estatico))
+            _cache[chave] = entrada
+        return entrada[1]
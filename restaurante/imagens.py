@@ -0,0 +1,190 @@
+# restaurante/imagens.py - MINIATURAS (WEBP/JPEG PROGRESSIVO) COM CACHE EM MEMÓRIA E DISCO
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image, features
+except ImportError:  # sem Pillow as imagens originais são servidas como estão
+    Image = None
+
+from restaurante import armazenamento
+
+IMAGES_DIR = os.path.join(armazenamento.BASE_DIR, "images")
+CACHE_DIR = os.path.join(IMAGES_DIR, ".cache")
+
+# Os cards exibem a imagem com 180px de altura; 480px de largura cobre telas 2x
+LARGURA_MINIATURA = 480
+QUALIDADE = 80
+LIMITE_MEMORIA = 32 * 1024 * 1024
+LIMITE_DISCO = 64 * 1024 * 1024  # images/.cache: ao gravar, as miniaturas usadas há mais tempo saem
+TAMANHO_MAXIMO_UPLOAD = 5 * 1024 * 1024
+
+_lock = threading.Lock()
+_hashes = {}              # caminho -> ((mtime, tamanho), sha256)
+_lock_uploads = threading.Lock()
+_indice_uploads = {}      # sha256 -> nome em images/ (refeito só quando a pasta muda por fora)
+_mtime_pasta = None
+_memoria = OrderedDict()  # chave da miniatura -> bytes (LRU limitado por LIMITE_MEMORIA)
+_bytes_em_memoria = 0
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="miniaturas")
+
+def _formato():
+    if Image is not None and features.check("webp"):
+        return "webp"
+    return "jpeg"
+
+def hash_conteudo(conteudo):
+    return hashlib.sha256(conteudo).hexdigest()
+
+def _hash_arquivo(caminho):
+    """sha256 do arquivo, recalculado só quando mtime/tamanho mudam"""
+    try:
+        info = os.stat(caminho)
+    except OSError:
+        return None
+    assinatura = (info.st_mtime_ns, info.st_size)
+    entrada = _hashes.get(caminho)
+    if entrada is not None and entrada[0] == assinatura:
+        return entrada[1]
+    with open(caminho, "rb") as f:
+        digest = hash_conteudo(f.read())
+    _hashes[caminho] = (assinatura, digest)
+    return digest
+
+def _guardar_em_memoria(chave, dados):
+    global _bytes_em_memoria
+    with _lock:
+        if chave in _memoria:
+            return
+        _memoria[chave] = dados
+        _bytes_em_memoria += len(dados)
+        while _bytes_em_memoria > LIMITE_MEMORIA and len(_memoria) > 1:
+            _, removido = _memoria.popitem(last=False)
+            _bytes_em_memoria -= len(removido)
+
+def gerar_derivado(conteudo, largura, formato, qualidade=QUALIDADE):
+    """Reduz para no máximo `largura` px e recodifica em WebP ou JPEG progressivo"""
+    with Image.open(io.BytesIO(conteudo)) as original:
+        original.thumbnail((largura, largura * 4))
+        imagem = original.convert("RGB")
+    saida = io.BytesIO()
+    if formato == "webp":
+        imagem.save(saida, "WEBP", quality=qualidade, method=4)
+    else:
+        imagem.save(saida, "JPEG", quality=qualidade, optimize=True, progressive=True)
+    return saida.getvalue()
+
+def _derivado(caminho, largura):
+    """Miniatura do arquivo: memória -> disco -> gera e grava. Levanta exceção se falhar."""
+    digest = _hash_arquivo(caminho)
+    if digest is None:
+        return None
+    formato = _formato()
+    chave = f"{digest}-{largura}.{formato}"
+    with _lock:
+        dados = _memoria.get(chave)
+        if dados is not None:
+            _memoria.move_to_end(chave)
+            return dados
+
+    caminho_cache = os.path.join(CACHE_DIR, chave)
+    try:
+        with open(caminho_cache, "rb") as f:
+            dados = f.read()
+    except FileNotFoundError:
+        with open(caminho, "rb") as f:
+            dados = gerar_derivado(f.read(), largura, formato)
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        temporario = f"{caminho_cache}.{threading.get_ident()}.tmp"
+        with open(temporario, "wb") as f:
+            f.write(dados)
+        os.replace(temporario, caminho_cache)
+        _podar_cache()
+    else:
+        try:
+            os.utime(caminho_cache)  # o mtime marca o último uso, que é o que a poda ordena
+        except OSError:
+            pass
+    _guardar_em_memoria(chave, dados)
+    return dados
+
+def _podar_cache():
+    """Remove as miniaturas usadas há mais tempo até o cache em disco caber em LIMITE_DISCO.
+    Só roda ao gravar uma miniatura nova; outros processos podem estar podando ao mesmo tempo."""
+    arquivos, total = [], 0
+    with os.scandir(CACHE_DIR) as entradas:
+        for entrada in entradas:
+            if entrada.name.endswith(".tmp"):
+                continue
+            try:
+                info = entrada.stat()
+            except FileNotFoundError:
+                continue
+            arquivos.append((info.st_mtime_ns, info.st_size, entrada.path))
+            total += info.st_size
+    for _, tamanho, caminho in sorted(arquivos):
+        if total <= LIMITE_DISCO:
+            break
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
+        total -= tamanho
+
+def miniatura(nome_arquivo, largura=LARGURA_MINIATURA):
+    """Bytes da miniatura de images/<nome_arquivo>; o caminho original se não der para gerar;
+    None se o arquivo não existir."""
+    caminho = os.path.join(IMAGES_DIR, nome_arquivo)
+    if Image is None:
+        return caminho if os.path.exists(caminho) else None
+    try:
+        return _derivado(caminho, largura)
+    except Exception:
+        # Imagem que o Pillow não abre: serve a original
+        return caminho if os.path.exists(caminho) else None
+
+# =============== UPLOADS DO PAINEL ADMIN ===============
+def _imagem_existente(digest):
+    """Arquivo de images/ com o mesmo conteúdo, se houver. O índice sha256 -> nome é montado uma
+    vez e só refeito quando o mtime da pasta muda por fora (arquivo copiado ou apagado à mão)."""
+    global _mtime_pasta
+    mtime = os.stat(IMAGES_DIR).st_mtime_ns
+    if mtime != _mtime_pasta:
+        _indice_uploads.clear()
+        for nome in sorted(os.listdir(IMAGES_DIR), reverse=True):  # em empate, fica o primeiro nome
+            caminho = os.path.join(IMAGES_DIR, nome)
+            if os.path.isfile(caminho):
+                _indice_uploads[_hash_arquivo(caminho)] = nome
+        _mtime_pasta = mtime
+    nome = _indice_uploads.get(digest)
+    # Arquivo sobrescrito no lugar não muda o mtime da pasta: confere o conteúdo do candidato
+    if nome is not None and _hash_arquivo(os.path.join(IMAGES_DIR, nome)) != digest:
+        return None
+    return nome
+
+def salvar_upload(conteudo, nome_sugerido):
+    """Grava a imagem enviada (reaproveitando um arquivo idêntico já existente) e agenda a
+    geração da miniatura num worker em segundo plano. Devolve o nome do arquivo em images/."""
+    if len(conteudo) > TAMANHO_MAXIMO_UPLOAD:
+        raise ValueError(f"Imagem maior que {TAMANHO_MAXIMO_UPLOAD // (1024 * 1024)} MB")
+    global _mtime_pasta
+    os.makedirs(IMAGES_DIR, exist_ok=True)
+    digest = hash_conteudo(conteudo)
+    with _lock_uploads:
+        nome = _imagem_existente(digest)
+        if nome is None:
+            nome = nome_sugerido
+            novo = not os.path.exists(os.path.join(IMAGES_DIR, nome))
+            with open(os.path.join(IMAGES_DIR, nome), "wb") as f:
+                f.write(conteudo)
+            # A gravação muda o mtime da pasta; anotado aqui, o índice não é refeito no próximo upload
+            _indice_uploads[digest] = nome
+            if novo:
+                _mtime_pasta = os.stat(IMAGES_DIR).st_mtime_ns
+    if Image is not None:
+        _executor.submit(miniatura, nome)
+    return nome
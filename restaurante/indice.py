@@ -0,0 +1,55 @@
+# restaurante/indice.py - ÍNDICES DO CATÁLOGO (CONSTRUÍDOS UMA VEZ POR VERSÃO)
+import threading
+
+from restaurante import catalogo
+from restaurante.carrinho import para_decimal
+
+class IndiceCatalogo:
+    """Tabelas hash sobre um snapshot do catálogo: nome -> registro e categoria -> pratos"""
+
+    def __init__(self, pratos, ingredientes):
+        self.pratos = pratos
+        self.ingredientes = ingredientes
+        self.ingredientes_por_nome = {i['nome']: i for i in ingredientes}
+        self.pratos_por_nome = {p['nome']: p for p in pratos}
+        self.precos = {p['nome']: para_decimal(p['preco']) for p in pratos}
+        por_categoria = {}
+        for prato in pratos:
+            por_categoria.setdefault(prato['cat'], []).append(prato)
+        self.pratos_por_categoria = {cat: tuple(lista) for cat, lista in por_categoria.items()}
+
+    def ingrediente(self, nome):
+        return self.ingredientes_por_nome.get(nome)
+
+    def prato(self, nome):
+        return self.pratos_por_nome.get(nome)
+
+    def pratos_da_categoria(self, categoria):
+        return self.pratos_por_categoria.get(categoria, ())
+
+    def preco(self, nome_prato, padrao=0):
+        """Preço exato (Decimal) do prato"""
+        return self.precos.get(nome_prato, padrao)
+
+    def unidade(self, nome_ingrediente, padrao="un"):
+        ingrediente = self.ingredientes_por_nome.get(nome_ingrediente)
+        return ingrediente['unidade'] if ingrediente else padrao
+
+# =============== ÍNDICE DO PROCESSO ===============
+_lock = threading.Lock()
+_atual = None
+
+def obter_indice():
+    """Índice do catálogo atual; só é reconstruído quando um snapshot novo é carregado"""
+    global _atual
+    pratos = catalogo.carregar_pratos()
+    ingredientes = catalogo.carregar_ingredientes()
+    indice = _atual
+    if indice is not None and indice.pratos is pratos and indice.ingredientes is ingredientes:
+        return indice
+    with _lock:
+        indice = _atual
+        if indice is None or indice.pratos is not pratos or indice.ingredientes is not ingredientes:
+            indice = IndiceCatalogo(pratos, ingredientes)
+            _atual = indice
+        return indice
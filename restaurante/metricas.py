@@ -0,0 +1,177 @@
+# restaurante/metricas.py - SPANS COM HISTOGRAMAS POR PROCESSO E EXPORTAÇÃO PROMETHEUS
+import atexit
+import functools
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+from restaurante import armazenamento
+
+# BURGER_METRICAS: vazio/"0" desliga (padrão), "1" grava em ./metricas.prom, outro valor é o caminho.
+# Desligado, todas as entradas (observar, span, medido) custam zero: nada é criado nem gravado.
+# Com vários processos servindo o app, use "{pid}" no caminho para cada um ter o seu arquivo.
+_config = os.environ.get("BURGER_METRICAS", "")
+ATIVO = bool(_config) and _config != "0"
+ARQUIVO_PROMETHEUS = (os.path.join(armazenamento.BASE_DIR, "metricas.prom") if _config in ("", "0", "1")
+                      else _config.replace("{pid}", str(os.getpid())))
+
+# Limites dos buckets em segundos (de 0,5 ms a 10 s)
+LIMITES = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+JANELA = 1024              # amostras recentes por span (percentis "de agora")
+INTERVALO_EXPORTACAO = 15  # segundos entre gravações do arquivo Prometheus
+
+class Histograma:
+    """Buckets acumulados desde o início do processo + janela das últimas JANELA amostras"""
+
+    __slots__ = ("contagens", "soma", "total", "recentes")
+
+    def __init__(self):
+        self.contagens = [0] * (len(LIMITES) + 1)  # o último é o +Inf
+        self.soma = 0.0
+        self.total = 0
+        self.recentes = deque(maxlen=JANELA)
+
+    def observar(self, segundos):
+        self.contagens[bisect_left(LIMITES, segundos)] += 1
+        self.soma += segundos
+        self.total += 1
+        self.recentes.append(segundos)
+
+def _percentil(ordenadas, p):
+    if not ordenadas:
+        return 0.0
+    return ordenadas[min(len(ordenadas) - 1, int(p / 100 * len(ordenadas)))]
+
+_lock = threading.Lock()
+_histogramas = {}
+_exportador = None
+
+def observar(nome, segundos):
+    """Uma amostra no histograma `nome`; desligado (BURGER_METRICAS), não faz nada: nem histograma,
+    nem thread de exportação, nem metricas.prom"""
+    if not ATIVO:
+        return
+    with _lock:
+        histograma = _histogramas.get(nome)
+        if histograma is None:
+            histograma = _histogramas[nome] = Histograma()
+            _iniciar_exportador()
+        histograma.observar(segundos)
+
+# =============== SPANS ===============
+class _Span:
+    __slots__ = ("nome", "inicio")
+
+    def __init__(self, nome):
+        self.nome = nome
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observar(self.nome, time.perf_counter() - self.inicio)
+        return False
+
+class _SpanDesligado:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_DESLIGADO = _SpanDesligado()
+
+def span(nome):
+    """Context manager que mede o bloco; desligado, devolve sempre o mesmo objeto vazio"""
+    return _Span(nome) if ATIVO else _DESLIGADO
+
+def medido(nome):
+    """Decorador que mede cada chamada; desligado, devolve a própria função (custo zero)"""
+    def decorar(funcao):
+        if not ATIVO:
+            return funcao
+
+        @functools.wraps(funcao)
+        def medir(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                observar(nome, time.perf_counter() - inicio)
+        return medir
+    return decorar
+
+# =============== LEITURA E EXPORTAÇÃO ===============
+def resumo():
+    """Uma linha por span: contagem total e percentis da janela recente, em ms"""
+    with _lock:
+        copias = {nome: (h.total, h.soma, sorted(h.recentes)) for nome, h in _histogramas.items()}
+    linhas = []
+    for nome, (total, soma, recentes) in sorted(copias.items()):
+        linhas.append({
+            "span": nome,
+            "chamadas": total,
+            "média (ms)": round(soma / total * 1000, 3) if total else 0.0,
+            "p50 (ms)": round(_percentil(recentes, 50) * 1000, 3),
+            "p95 (ms)": round(_percentil(recentes, 95) * 1000, 3),
+            "p99 (ms)": round(_percentil(recentes, 99) * 1000, 3),
+            "máx (ms)": round(recentes[-1] * 1000, 3) if recentes else 0.0,
+        })
+    return linhas
+
+def texto_prometheus():
+    with _lock:
+        copias = {nome: (list(h.contagens), h.soma, h.total) for nome, h in _histogramas.items()}
+    linhas = [
+        "# HELP burger_span_seconds Duração dos trechos instrumentados do app",
+        "# TYPE burger_span_seconds histogram",
+    ]
+    pid = os.getpid()
+    for nome, (contagens, soma, total) in sorted(copias.items()):
+        rotulos = f'span="{nome}",pid="{pid}"'
+        acumulado = 0
+        for limite, contagem in zip(LIMITES + (float("inf"),), contagens):
+            acumulado += contagem
+            le = "+Inf" if limite == float("inf") else repr(limite)
+            linhas.append(f'burger_span_seconds_bucket{{{rotulos},le="{le}"}} {acumulado}')
+        linhas.append(f"burger_span_seconds_sum{{{rotulos}}} {soma}")
+        linhas.append(f"burger_span_seconds_count{{{rotulos}}} {total}")
+    return "\n".join(linhas) + "\n"
+
+def exportar(caminho=None):
+    """Grava o texto Prometheus atomicamente (para o textfile collector do node_exporter)"""
+    caminho = caminho or ARQUIVO_PROMETHEUS
+    pasta = os.path.dirname(os.path.abspath(caminho))
+    fd, temporario = tempfile.mkstemp(dir=pasta, prefix=".metricas.", suffix=".tmp")
+    try:
+        os.chmod(temporario, 0o644)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(texto_prometheus())
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    return caminho
+
+def _exportar_periodicamente():
+    while True:
+        time.sleep(INTERVALO_EXPORTACAO)
+        try:
+            exportar()
+        except OSError:
+            pass  # o arquivo anterior continua lá; a próxima exportação tenta de novo
+
+def _iniciar_exportador():
+    """Chamado com _lock tomado, na primeira amostra do processo"""
+    global _exportador
+    if _exportador is None:
+        _exportador = threading.Thread(target=_exportar_periodicamente, name="metricas", daemon=True)
+        _exportador.start()
+        atexit.register(exportar)
@@ -0,0 +1,59 @@
+# restaurante/padrao.py - CATÁLOGO PADRÃO (CRIADO PELO CLI DE ARMAZENAMENTO, NUNCA PELAS PÁGINAS)
+# Uso: python -m restaurante.armazenamento iniciar [--dir pasta | --banco restaurante.db]
+
+INGREDIENTES = [
+    {"nome": "Pão de Hambúrguer", "categoria": "paes", "unidade": "unidade", "estoque": 100, "minimo": 20, "custo": 1.50},
+    {"nome": "Pão Brioche", "categoria": "paes", "unidade": "unidade", "estoque": 80, "minimo": 15, "custo": 2.00},
+    {"nome": "Carne Bovina 180g", "categoria": "carnes", "unidade": "unidade", "estoque": 50, "minimo": 10, "custo": 6.00},
+    {"nome": "Queijo Cheddar", "categoria": "queijos", "unidade": "fatia", "estoque": 200, "minimo": 30, "custo": 1.50},
+    {"nome": "Queijo Mussarela", "categoria": "queijos", "unidade": "fatia", "estoque": 150, "minimo": 25, "custo": 1.20},
+    {"nome": "Bacon", "categoria": "complementos", "unidade": "fatia", "estoque": 120, "minimo": 20, "custo": 2.00},
+    {"nome": "Alface", "categoria": "saladas", "unidade": "porção", "estoque": 30, "minimo": 5, "custo": 0.50},
+    {"nome": "Tomate", "categoria": "saladas", "unidade": "fatia", "estoque": 100, "minimo": 15, "custo": 0.30},
+    {"nome": "Cebola Roxa", "categoria": "saladas", "unidade": "fatia", "estoque": 80, "minimo": 10, "custo": 0.20},
+    {"nome": "Molho Especial", "categoria": "molhos", "unidade": "porção", "estoque": 50, "minimo": 8, "custo": 1.00},
+    {"nome": "Maionese", "categoria": "molhos", "unidade": "porção", "estoque": 40, "minimo": 6, "custo": 0.80},
+    {"nome": "Ketchup", "categoria": "molhos", "unidade": "sache", "estoque": 200, "minimo": 30, "custo": 0.30},
+    {"nome": "Mostarda", "categoria": "molhos", "unidade": "sache", "estoque": 180, "minimo": 25, "custo": 0.30},
+    {"nome": "Batata Palha", "categoria": "acompanhamentos", "unidade": "porção", "estoque": 25, "minimo": 5, "custo": 1.50},
+    {"nome": "Coca-Cola 2L", "categoria": "bebidas", "unidade": "unidade", "estoque": 30, "minimo": 6, "custo": 8.00},
+    {"nome": "Guaraná 2L", "categoria": "bebidas", "unidade": "unidade", "estoque": 25, "minimo": 5, "custo": 7.00},
+]
+
+PRATOS = [
+    {"nome": "Burger Classic", "preco": 18.90, "cat": "hamburgers", "img": "burger-classic.jpg",
+     "ingredientes": [
+         {"nome": "Pão de Hambúrguer", "quantidade": 1},
+         {"nome": "Carne Bovina 180g", "quantidade": 1},
+         {"nome": "Queijo Cheddar", "quantidade": 1},
+         {"nome": "Alface", "quantidade": 1},
+         {"nome": "Tomate", "quantidade": 2},
+         {"nome": "Molho Especial", "quantidade": 1},
+     ]},
+    {"nome": "Burger Bacon", "preco": 22.90, "cat": "hamburgers", "img": "burger-bacon.jpg",
+     "ingredientes": [
+         {"nome": "Pão Brioche", "quantidade": 1},
+         {"nome": "Carne Bovina 180g", "quantidade": 1},
+         {"nome": "Queijo Cheddar", "quantidade": 2},
+         {"nome": "Bacon", "quantidade": 3},
+         {"nome": "Alface", "quantidade": 1},
+         {"nome": "Molho Especial", "quantidade": 1},
+     ]},
+    {"nome": "Double Cheese", "preco": 26.90, "cat": "hamburgers", "img": "cheese-duplo.jpg",
+     "ingredientes": [
+         {"nome": "Pão de Hambúrguer", "quantidade": 1},
+         {"nome": "Carne Bovina 180g", "quantidade": 2},
+         {"nome": "Queijo Cheddar", "quantidade": 2},
+         {"nome": "Queijo Mussarela", "quantidade": 2},
+         {"nome": "Cebola Roxa", "quantidade": 3},
+         {"nome": "Molho Especial", "quantidade": 1},
+     ]},
+    {"nome": "Refrigerante", "preco": 8.90, "cat": "bebidas", "img": "refri.jpg"},
+    {"nome": "Suco Natural", "preco": 12.90, "cat": "bebidas", "img": "suco.jpg"},
+    {"nome": "Batata Frita", "preco": 12.90, "cat": "acompanhamentos", "img": "batata-frita.jpg"},
+    {"nome": "Onion Rings", "preco": 15.90, "cat": "acompanhamentos", "img": "onion-rings.jpg"},
+    {"nome": "Milk Shake", "preco": 16.90, "cat": "sobremesas", "img": "milkshake.jpg"},
+    {"nome": "Brownie", "preco": 14.90, "cat": "sobremesas", "img": "brownie.jpg"},
+]
+
+CATALOGO = {"ingredientes": INGREDIENTES, "pratos": PRATOS}
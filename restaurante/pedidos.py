@@ -0,0 +1,204 @@
+# restaurante/pedidos.py - FINALIZAÇÃO DE PEDIDOS COM BAIXA ATÔMICA DE INGREDIENTES
+from restaurante import armazenamento, metricas
+from restaurante.diario import obter_diario
+from restaurante.indice import obter_indice
+
+class ResultadoPedido:
+    """Resultado de uma finalização: o que foi atendido, o que foi recusado e por quê"""
+
+    def __init__(self, atendidos, recusados, faltantes):
+        self.atendidos = atendidos    # {prato: quantidade baixada do estoque}
+        self.recusados = recusados    # {prato: quantidade não atendida}
+        self.faltantes = faltantes    # ingredientes que impediram o atendimento
+        self.comanda = None           # número na fila da cozinha, depois de enviado
+        self.consumo = {}             # {ingrediente: quantidade baixada} (para o estorno)
+
+    @property
+    def aceito(self):
+        return bool(self.atendidos) and not self.recusados
+
+    def __repr__(self):
+        return f"ResultadoPedido(atendidos={self.atendidos}, recusados={self.recusados}, faltantes={self.faltantes})"
+
+def _porcoes_possiveis(receita, estoque, maximo):
+    """Quantas porções (até `maximo`) cabem no estoque atual"""
+    possiveis = maximo
+    for ing_prato in receita:
+        disponivel = estoque.get(ing_prato['nome'])
+        if disponivel is None:
+            return 0
+        if ing_prato['quantidade'] > 0:
+            possiveis = min(possiveis, int(disponivel // ing_prato['quantidade']))
+    return max(possiveis, 0)
+
+def _reservar(carrinho, indice, ler_estoque):
+    """Calcula o que pode ser atendido; devolve também o estoque resultante e o consumo"""
+    atendidos, recusados, faltantes = {}, {}, []
+    estoque = {}
+    for nome_prato in carrinho:
+        prato = indice.prato(nome_prato)
+        for ing_prato in (prato.get('ingredientes', ()) if prato else ()):
+            if ing_prato['nome'] not in estoque:
+                estoque[ing_prato['nome']] = ler_estoque(ing_prato['nome'])
+
+    consumo = {}
+    for nome_prato, quantidade in carrinho.items():
+        if quantidade <= 0:
+            continue
+        prato = indice.prato(nome_prato)
+        if prato is None:
+            recusados[nome_prato] = quantidade
+            continue
+        receita = prato.get('ingredientes', ())
+        porcoes = _porcoes_possiveis(receita, estoque, quantidade)
+        if porcoes < quantidade:
+            recusados[nome_prato] = quantidade - porcoes
+            for ing_prato in receita:
+                disponivel = estoque.get(ing_prato['nome'])
+                if (disponivel is None or disponivel < ing_prato['quantidade'] * (porcoes + 1)) \
+                        and ing_prato['nome'] not in faltantes:
+                    faltantes.append(ing_prato['nome'])
+        if porcoes:
+            atendidos[nome_prato] = porcoes
+            for ing_prato in receita:
+                gasto = ing_prato['quantidade'] * porcoes
+                estoque[ing_prato['nome']] -= gasto
+                consumo[ing_prato['nome']] = consumo.get(ing_prato['nome'], 0) + gasto
+    return atendidos, recusados, faltantes, estoque, consumo
+
+@metricas.medido("pedido.finalizar")
+def finalizar_pedido(carrinho, parcial=False, backend=None):
+    """Valida o carrinho inteiro contra o estoque de ingredientes e dá baixa numa única transação.
+
+    Sem `parcial`, qualquer falta recusa o pedido todo e nada é baixado. Com `parcial`, cada item
+    é atendido até onde o estoque permitir (na ordem do carrinho). A transação (do diário, se
+    ligado, ou do armazenamento) serializa finalizações simultâneas de todas as sessões e processos.
+    """
+    indice = obter_indice()
+    diario = obter_diario()
+
+    if diario is not None:
+        with diario.transacao() as tx:
+            atendidos, recusados, faltantes, estoque, consumo = _reservar(
+                carrinho, indice, lambda nome: tx.estoque(nome, _estoque_catalogo(indice, nome)))
+            if recusados and not parcial:
+                return ResultadoPedido({}, dict(carrinho), faltantes)
+            if atendidos:
+                tx.registrar("pedido", {nome: estoque[nome] for nome in consumo},
+                             itens=atendidos, movimentos={nome: -gasto for nome, gasto in consumo.items()})
+        resultado = ResultadoPedido(atendidos, recusados, faltantes)
+        resultado.consumo = consumo
+        return resultado
+
+    backend = backend or armazenamento.obter()
+    with backend.transacao() as tx:
+        def ler_estoque(nome):
+            registro = tx.obter("ingredientes", nome)
+            return registro['estoque'] if registro else None
+
+        atendidos, recusados, faltantes, estoque, consumo = _reservar(carrinho, indice, ler_estoque)
+        if recusados and not parcial:
+            # Tudo ou nada: sai da transação sem gravar
+            return ResultadoPedido({}, dict(carrinho), faltantes)
+
+        for nome_ingrediente in consumo:
+            tx.atualizar("ingredientes", nome_ingrediente, {"estoque": estoque[nome_ingrediente]})
+
+    resultado = ResultadoPedido(atendidos, recusados, faltantes)
+    resultado.consumo = consumo
+    return resultado
+
+def estornar_pedido(resultado, backend=None):
+    """Devolve ao estoque exatamente o que a finalização baixou (pedido que não chegou à cozinha).
+
+    A soma é feita dentro da transação, como em receber_entrega: pedidos finalizados entre a
+    baixa e o estorno não são sobrescritos.
+    """
+    if not resultado.consumo:
+        return
+    diario = obter_diario()
+    if diario is not None:
+        indice = obter_indice()
+        with diario.transacao() as tx:
+            novo = {nome: (tx.estoque(nome, _estoque_catalogo(indice, nome)) or 0) + gasto
+                    for nome, gasto in resultado.consumo.items()}
+            tx.registrar("estorno", novo, itens=dict(resultado.atendidos), movimentos=dict(resultado.consumo))
+        return
+
+    backend = backend or armazenamento.obter()
+    with backend.transacao() as tx:
+        for nome, gasto in resultado.consumo.items():
+            registro = tx.obter("ingredientes", nome)
+            if registro is not None:
+                tx.atualizar("ingredientes", nome, {"estoque": registro['estoque'] + gasto})
+
+def _estoque_catalogo(indice, nome):
+    ingrediente = indice.ingrediente(nome)
+    return ingrediente['estoque'] if ingrediente else None
+
+def ajustar_estoque(mudancas, backend=None):
+    """Define o estoque absoluto de ingredientes ({nome: valor}), pelo diário se estiver ligado"""
+    diario = obter_diario()
+    if diario is not None:
+        indice = obter_indice()
+        with diario.transacao() as tx:
+            movimentos = {nome: valor - (tx.estoque(nome, _estoque_catalogo(indice, nome)) or 0)
+                          for nome, valor in mudancas.items()}
+            tx.registrar("ajuste", dict(mudancas), movimentos=movimentos)
+        return
+
+    backend = backend or armazenamento.obter()
+    with backend.transacao() as tx:
+        for nome, valor in mudancas.items():
+            tx.atualizar("ingredientes", nome, {"estoque": valor})
+
+def ajustar_ingredientes(alteracoes, backend=None):
+    """Aplica {nome: {"estoque": ..., "minimo": ...}} de uma vez (edição em lote do admin).
+
+    Sem o diário é uma única transação do armazenamento (um único rewrite no JSON); com o
+    diário, os demais campos vão numa transação e o estoque num único evento de ajuste.
+    """
+    estoque = {nome: campos["estoque"] for nome, campos in alteracoes.items() if "estoque" in campos}
+    outros = {nome: {k: v for k, v in campos.items() if k != "estoque"} for nome, campos in alteracoes.items()}
+    outros = {nome: campos for nome, campos in outros.items() if campos}
+    backend = backend or armazenamento.obter()
+
+    if obter_diario() is None:
+        with backend.transacao() as tx:
+            for nome, campos in alteracoes.items():
+                tx.atualizar("ingredientes", nome, campos)
+        return
+
+    if outros:
+        with backend.transacao() as tx:
+            for nome, campos in outros.items():
+                tx.atualizar("ingredientes", nome, campos)
+    if estoque:
+        ajustar_estoque(estoque, backend)
+
+def receber_entrega(entradas, backend=None):
+    """Soma as quantidades recebidas ({nome: quantidade}) ao estoque atual, numa única transação.
+
+    A soma é feita dentro da transação, então pedidos finalizados entre a leitura da nota e o
+    lançamento não são sobrescritos. Devolve o estoque resultante de cada ingrediente.
+    """
+    diario = obter_diario()
+    if diario is not None:
+        indice = obter_indice()
+        entradas = {nome: qtd for nome, qtd in entradas.items() if indice.ingrediente(nome) is not None}
+        with diario.transacao() as tx:
+            novo = {nome: (tx.estoque(nome, _estoque_catalogo(indice, nome)) or 0) + quantidade
+                    for nome, quantidade in entradas.items()}
+            tx.registrar("entrega", novo, movimentos=dict(entradas))
+        return novo
+
+    backend = backend or armazenamento.obter()
+    novo = {}
+    with backend.transacao() as tx:
+        for nome, quantidade in entradas.items():
+            registro = tx.obter("ingredientes", nome)
+            if registro is None:
+                continue
+            novo[nome] = registro['estoque'] + quantidade
+            tx.atualizar("ingredientes", nome, {"estoque": novo[nome]})
+    return novo
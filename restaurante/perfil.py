@@ -0,0 +1,224 @@
+# restaurante/perfil.py - PERFIS DE EXECUÇÃO SOB DEMANDA (PSTATS E SPEEDSCOPE)
+import cProfile
+import functools
+import io
+import itertools
+import json
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import deque
+
+# Desligado por padrão. BURGER_PERFIL=1 liga desde a partida; o admin pode ligar/desligar na aba
+# "⏱️ Performance". Ligado, cada execução das páginas (e cada rerun do fragmento do menu) roda
+# sob o cProfile (para o .pstats) e é amostrada por uma thread (para o .speedscope.json).
+MAXIMO_PERFIS = int(os.environ.get("BURGER_PERFIL_MAX", "20"))
+INTERVALO_AMOSTRAS = 0.001  # segundos
+
+_ligado = os.environ.get("BURGER_PERFIL", "") not in ("", "0")
+_lock = threading.Lock()
+_perfis = deque(maxlen=MAXIMO_PERFIS)
+_ids = itertools.count(1)
+_local = threading.local()  # execução aberta na thread do script (cada sessão tem a sua)
+
+def ligado():
+    return _ligado
+
+def ligar(valor=True):
+    global _ligado
+    _ligado = bool(valor)
+
+class Perfil:
+    """Uma execução perfilada: estatísticas do cProfile e pilhas amostradas"""
+
+    def __init__(self, id, nome, inicio, duracao, situacao, estatisticas, frames, amostras, pesos):
+        self.id = id
+        self.nome = nome
+        self.inicio = inicio
+        self.duracao = duracao
+        self.situacao = situacao    # "completa" ou "interrompida" (st.rerun/st.stop no meio)
+        self.estatisticas = estatisticas
+        self.frames = frames
+        self.amostras = amostras
+        self.pesos = pesos
+
+    def pstats_bytes(self):
+        """Conteúdo de um arquivo .pstats (o mesmo formato de Profile.dump_stats)"""
+        return marshal.dumps(self.estatisticas)
+
+    def speedscope_json(self):
+        documento = {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "exporter": "burger-express",
+            "name": f"{self.nome} #{self.id}",
+            "shared": {"frames": [{"name": nome, "file": arquivo, "line": linha} for nome, arquivo, linha in self.frames]},
+            "profiles": [{
+                "type": "sampled",
+                "name": self.nome,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(self.pesos),
+                "samples": self.amostras,
+                "weights": self.pesos,
+            }],
+        }
+        return json.dumps(documento).encode("utf-8")
+
+    def texto(self, limite=25):
+        """Funções com maior tempo acumulado, no formato do pstats"""
+        saida = io.StringIO()
+        pstats.Stats(_Estatisticas(self.estatisticas), stream=saida).sort_stats("cumulative").print_stats(limite)
+        return saida.getvalue()
+
+class _Estatisticas:
+    """Adapta o dicionário guardado à interface que pstats.Stats aceita (a de um Profile)"""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+class _Amostrador(threading.Thread):
+    """Copia a pilha da thread do script a cada INTERVALO_AMOSTRAS"""
+
+    def __init__(self, alvo):
+        super().__init__(name="perfil-amostras", daemon=True)
+        self.alvo = alvo
+        self.parar = threading.Event()
+        self.pilhas = []
+        self.instantes = []
+
+    def run(self):
+        while not self.parar.wait(INTERVALO_AMOSTRAS):
+            frame = sys._current_frames().get(self.alvo)
+            if frame is None:
+                break  # a thread do script terminou
+            pilha = []
+            while frame is not None:
+                codigo = frame.f_code
+                pilha.append((codigo.co_name, codigo.co_filename, codigo.co_firstlineno))
+                frame = frame.f_back
+            pilha.reverse()
+            self.pilhas.append(tuple(pilha))
+            self.instantes.append(time.perf_counter())
+
+class _Execucao:
+    def __init__(self, nome, dono):
+        self.nome = nome
+        self.dono = dono  # "callback", "script" ou "fragmento"
+        self.inicio = time.time()
+        self.comeco = time.perf_counter()
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+        self.amostrador = _Amostrador(threading.get_ident())
+        self.amostrador.start()
+
+    def encerrar(self, situacao):
+        self.profiler.disable()
+        self.amostrador.parar.set()
+        self.amostrador.join(1)
+        duracao = time.perf_counter() - self.comeco
+
+        indices, frames, amostras, pesos = {}, [], [], []
+        anterior = self.comeco
+        for pilha, instante in zip(self.amostrador.pilhas, self.amostrador.instantes):
+            amostra = []
+            for frame in pilha:
+                if frame not in indices:
+                    indices[frame] = len(frames)
+                    frames.append(frame)
+                amostra.append(indices[frame])
+            amostras.append(amostra)
+            pesos.append(instante - anterior)
+            anterior = instante
+
+        estatisticas = pstats.Stats(self.profiler).stats
+        with _lock:
+            _perfis.appendleft(Perfil(next(_ids), self.nome, self.inicio, duracao, situacao,
+                                      estatisticas, frames, amostras, pesos))
+
+def _abrir(nome, dono):
+    try:
+        _local.atual = _Execucao(nome, dono)
+    except ValueError:
+        _local.atual = None  # outro profiler já ativo nesta thread: não perfila
+
+def _fechar_pendente():
+    """Execução que não chegou ao fim (st.rerun/st.stop) é guardada como interrompida"""
+    atual = getattr(_local, "atual", None)
+    if atual is not None:
+        _local.atual = None
+        atual.encerrar("interrompida")
+
+# =============== PONTOS DE ENTRADA DAS PÁGINAS ===============
+def iniciar(nome):
+    """Primeira linha do script da página"""
+    atual = getattr(_local, "atual", None)
+    if atual is not None and atual.dono == "callback":
+        atual.dono = "script"  # o callback do widget abriu esta mesma execução
+        return
+    _fechar_pendente()
+    if _ligado:
+        _abrir(nome, "script")
+
+def concluir():
+    """Última linha do script da página"""
+    atual = getattr(_local, "atual", None)
+    if atual is not None:
+        _local.atual = None
+        atual.encerrar("completa")
+
+def callback(nome):
+    """Decorador para callbacks de widgets, que rodam antes do script na mesma execução;
+    desligado, devolve a própria função"""
+    def decorar(funcao):
+        if not _ligado:
+            return funcao
+
+        @functools.wraps(funcao)
+        def executar(*args, **kwargs):
+            atual = getattr(_local, "atual", None)
+            if atual is None or atual.dono != "callback":
+                _fechar_pendente()
+                _abrir(nome, "callback")
+            return funcao(*args, **kwargs)
+        return executar
+    return decorar
+
+def fragmento(nome):
+    """Decorador para fragmentos: num rerun só do fragmento o script não roda, então o
+    fragmento abre e fecha a própria execução; desligado, devolve a própria função"""
+    def decorar(funcao):
+        if not _ligado:
+            return funcao
+
+        @functools.wraps(funcao)
+        def executar(*args, **kwargs):
+            atual = getattr(_local, "atual", None)
+            if atual is not None and atual.dono == "script":
+                return funcao(*args, **kwargs)  # parte da execução do script inteiro
+            if atual is not None and atual.dono == "callback":
+                atual.dono, atual.nome = "fragmento", nome
+            else:
+                _fechar_pendente()
+                _abrir(nome, "fragmento")
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                concluir()
+        return executar
+    return decorar
+
+# =============== PERFIS GUARDADOS ===============
+def perfis():
+    """Os últimos MAXIMO_PERFIS perfis, do mais recente para o mais antigo"""
+    with _lock:
+        return list(_perfis)
+
+def obter(id):
+    with _lock:
+        return next((p for p in _perfis if p.id == id), None)
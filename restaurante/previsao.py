@@ -0,0 +1,237 @@
+# restaurante/previsao.py - PREVISÃO DE RUPTURA DE ESTOQUE E SUGESTÃO DE COMPRA (FORA DAS REQUISIÇÕES)
+# Uso: python -m restaurante.previsao [--pasta diario] [--janela 28] [--horizonte 14] [--cobertura 7]
+#      [--repetir MINUTOS]
+# Lê o consumo dos pedidos registrados no diário, estima a taxa de cada ingrediente por dia da
+# semana e hora (só nos horários de funcionamento) e grava previsao.json na pasta do diário.
+# O admin só lê esse arquivo; o cálculo roda por esta linha de comando, pelo botão do admin (numa
+# thread) ou periodicamente com BURGER_PREVISAO=<minutos>.
+import argparse
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from restaurante import catalogo, metricas
+from restaurante.diario import Diario, configurar_diario, obter_diario, DIARIO_DIR
+
+_log = logging.getLogger(__name__)
+
+# Horário de funcionamento por dia da semana (0 = segunda), horas [abre, fecha)
+FUNCIONAMENTO = {0: (11, 23), 1: (11, 23), 2: (11, 23), 3: (11, 23), 4: (11, 23), 5: (11, 23), 6: (12, 22)}
+HORAS_SEMANA = 7 * 24
+JANELA_DIAS = 28       # histórico usado para estimar as taxas
+HORIZONTE_DIAS = 14    # até onde a ruptura é procurada
+COBERTURA_DIAS = 7     # a sugestão de compra cobre este consumo + o mínimo
+LOTE = 4096            # ingredientes por bloco na projeção (matriz lote × horas do horizonte)
+
+ABERTO = np.zeros(HORAS_SEMANA, dtype=bool)
+for _dia, (_abre, _fecha) in FUNCIONAMENTO.items():
+    ABERTO[_dia * 24 + _abre:_dia * 24 + _fecha] = True
+
+def arquivo_previsao(diario):
+    return os.path.join(diario.pasta, "previsao.json")
+
+def _faixas(instantes):
+    """Faixa da semana (dia * 24 + hora, no horário local) de cada instante"""
+    faixas = np.empty(len(instantes), dtype=np.intp)
+    for k, instante in enumerate(instantes):
+        local = time.localtime(instante)
+        faixas[k] = local.tm_wday * 24 + local.tm_hour
+    return faixas
+
+def _consumo_historico(diario, coluna, inicio):
+    """Consumo por ingrediente e faixa da semana (matriz ingredientes × 168) e nº de pedidos"""
+    instantes, colunas, quantidades = [], [], []
+    pedidos = 0
+    for evento in diario.eventos():
+        tipo = evento.get("tipo")
+        if tipo not in ("pedido", "estorno") or evento.get("ts", 0) < inicio:
+            continue
+        # Estorno: pedido baixado que não chegou à cozinha; desconta o consumo e o pedido
+        pedidos += 1 if tipo == "pedido" else -1
+        for nome, movimento in evento.get("movimentos", {}).items():
+            j = coluna.get(nome)
+            if j is not None and movimento:
+                instantes.append(evento["ts"])
+                colunas.append(j)
+                quantidades.append(-movimento)
+    # Faixa calculada uma vez por hora cheia, não por movimento
+    horas = np.floor(np.asarray(instantes, dtype=float) / 3600).astype(np.int64)
+    unicas, posicoes = np.unique(horas, return_inverse=True)
+    faixas = _faixas(unicas * 3600)[posicoes] if len(horas) else np.zeros(0, dtype=np.intp)
+    consumo = np.bincount(np.asarray(colunas, dtype=np.intp) * HORAS_SEMANA + faixas,
+                          weights=np.asarray(quantidades, dtype=float),
+                          minlength=len(coluna) * HORAS_SEMANA).reshape(len(coluna), HORAS_SEMANA)
+    return consumo, pedidos
+
+def gerar(diario, ingredientes, agora=None, janela_dias=JANELA_DIAS, horizonte_dias=HORIZONTE_DIAS,
+          cobertura_dias=COBERTURA_DIAS):
+    """Previsão para todos os ingredientes de uma vez (dicionário pronto para gravar em JSON)"""
+    agora = time.time() if agora is None else agora
+    coluna = {ing['nome']: j for j, ing in enumerate(ingredientes)}
+    inicio = agora - janela_dias * 86400
+    consumo, pedidos = _consumo_historico(diario, coluna, inicio)
+
+    # Taxa por faixa = consumo na faixa / quantas vezes a faixa ocorreu na janela. Fora do horário
+    # de funcionamento é zero; faixa aberta que ainda não ocorreu usa a média das horas abertas.
+    primeira_hora = math.ceil(inicio / 3600) * 3600
+    ocorrencias = np.bincount(_faixas(np.arange(primeira_hora, agora, 3600)), minlength=HORAS_SEMANA)
+    horas_abertas = ocorrencias[ABERTO].sum()
+    media = consumo.sum(axis=1) / horas_abertas if horas_abertas else np.zeros(len(ingredientes))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        taxas = np.where(ocorrencias > 0, consumo / ocorrencias, media[:, None])
+    taxas[:, ~ABERTO] = 0.0
+
+    # Projeção hora a hora a partir da próxima hora cheia, em blocos de LOTE ingredientes
+    proxima_hora = math.floor(agora / 3600) * 3600 + 3600
+    futuras = _faixas(proxima_hora + 3600 * np.arange(horizonte_dias * 24))
+    horas_cobertura = cobertura_dias * 24
+    estoque = np.array([ing['estoque'] for ing in ingredientes], dtype=float)
+    minimo = np.array([ing.get('minimo', 0) for ing in ingredientes], dtype=float)
+    acaba_em = np.full(len(ingredientes), np.nan)
+    cobertura = np.zeros(len(ingredientes))
+    for lote in range(0, len(ingredientes), LOTE):
+        fatia = slice(lote, lote + LOTE)
+        acumulado = np.cumsum(taxas[fatia][:, futuras], axis=1)
+        cobertura[fatia] = acumulado[:, min(horas_cobertura, len(futuras)) - 1] if len(futuras) else 0.0
+        esgota = acumulado >= estoque[fatia, None]
+        alcanca = esgota.any(axis=1)
+        acaba_em[fatia] = np.where(alcanca, proxima_hora + 3600 * (esgota.argmax(axis=1) + 1), np.nan)
+    acaba_em[estoque <= 0] = agora
+    sugestao = np.ceil(np.maximum(cobertura + minimo - estoque, 0))
+
+    consumo_dia = taxas.sum(axis=1) / 7
+    return {
+        "gerado_em": agora,
+        "janela_dias": janela_dias,
+        "horizonte_dias": horizonte_dias,
+        "cobertura_dias": cobertura_dias,
+        "pedidos": pedidos,
+        "ingredientes": [
+            {
+                "nome": ing['nome'],
+                "unidade": ing.get('unidade', ''),
+                "estoque": ing['estoque'],
+                "minimo": ing.get('minimo', 0),
+                "consumo_dia": round(float(consumo_dia[j]), 3),
+                "acaba_em": None if math.isnan(acaba_em[j]) else float(acaba_em[j]),
+                "sugestao": int(sugestao[j]),
+            }
+            for j, ing in enumerate(ingredientes)
+        ],
+    }
+
+def salvar(resultado, caminho):
+    """Grava atomicamente (o admin pode estar lendo o arquivo anterior)"""
+    pasta = os.path.dirname(os.path.abspath(caminho))
+    fd, temporario = tempfile.mkstemp(dir=pasta, prefix=".previsao.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, ensure_ascii=False)
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    return caminho
+
+def calcular(diario, **opcoes):
+    with metricas.span("previsao.calcular"):
+        resultado = gerar(diario, catalogo.carregar_ingredientes(), **opcoes)
+        return salvar(resultado, arquivo_previsao(diario))
+
+# =============== LEITURA PELO ADMIN ===============
+_cache = None  # (caminho, mtime, tamanho, resultado)
+
+def ler():
+    """Última previsão gravada (None se o diário está desligado ou nunca foi calculada)"""
+    global _cache
+    diario = obter_diario()
+    if diario is None:
+        return None
+    caminho = arquivo_previsao(diario)
+    try:
+        estado = os.stat(caminho)
+    except FileNotFoundError:
+        return None
+    cache = _cache
+    if cache is not None and cache[:3] == (caminho, estado.st_mtime_ns, estado.st_size):
+        return cache[3]
+    with open(caminho, "r", encoding="utf-8") as f:
+        resultado = json.load(f)
+    _cache = (caminho, estado.st_mtime_ns, estado.st_size, resultado)
+    return resultado
+
+# =============== EXECUÇÃO EM SEGUNDO PLANO ===============
+_lock = threading.Lock()
+_calculando = None
+_periodico = None
+
+def atualizar_em_segundo_plano():
+    """Calcula numa thread; devolve False se o diário está desligado ou já há um cálculo rodando"""
+    global _calculando
+    diario = obter_diario()
+    if diario is None:
+        return False
+    with _lock:
+        if _calculando is not None and _calculando.is_alive():
+            return False
+        _calculando = threading.Thread(target=calcular, args=(diario,), name="previsao", daemon=True)
+        _calculando.start()
+    return True
+
+def calculando():
+    return _calculando is not None and _calculando.is_alive()
+
+def _repetir(minutos):
+    while True:
+        try:
+            calcular(obter_diario())
+        except Exception:
+            # Disco cheio ou evento malformado no diário: a thread segue viva e a página mostra a
+            # última previsão gravada até a próxima rodada
+            _log.exception("previsão periódica falhou; tenta de novo em %g min", minutos)
+        time.sleep(minutos * 60)
+
+def iniciar_periodico():
+    """Com BURGER_PREVISAO=<minutos> e o diário ligado, recalcula numa thread do processo"""
+    global _periodico
+    minutos = float(os.environ.get("BURGER_PREVISAO", "0") or 0)
+    if minutos <= 0 or _periodico is not None or obter_diario() is None:
+        return
+    with _lock:
+        if _periodico is None:
+            _periodico = threading.Thread(target=_repetir, args=(minutos,), name="previsao-periodica", daemon=True)
+            _periodico.start()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Previsão de ruptura de estoque pelo histórico do diário")
+    parser.add_argument("--pasta", help="pasta do diário (padrão: BURGER_DIARIO ou ./diario)")
+    parser.add_argument("--janela", type=float, default=JANELA_DIAS, help="dias de histórico")
+    parser.add_argument("--horizonte", type=int, default=HORIZONTE_DIAS, help="dias projetados")
+    parser.add_argument("--cobertura", type=int, default=COBERTURA_DIAS, help="dias que a sugestão de compra cobre")
+    parser.add_argument("--repetir", type=float, default=0, help="recalcula a cada N minutos")
+    args = parser.parse_args(argv)
+
+    diario = Diario(args.pasta) if args.pasta else obter_diario() or Diario(DIARIO_DIR)
+    configurar_diario(diario)  # o estoque atual vem deste mesmo diário
+    while True:
+        comeco = time.perf_counter()
+        resultado = gerar(diario, catalogo.carregar_ingredientes(), janela_dias=args.janela,
+                          horizonte_dias=args.horizonte, cobertura_dias=args.cobertura)
+        caminho = salvar(resultado, arquivo_previsao(diario))
+        em_risco = sum(1 for ing in resultado["ingredientes"]
+                       if ing["acaba_em"] is not None and ing["acaba_em"] - resultado["gerado_em"] <= 2 * 86400)
+        print(f"✅ {len(resultado['ingredientes'])} ingredientes, {resultado['pedidos']} pedidos na janela, "
+              f"{em_risco} acabam em até 48h -> {caminho} ({time.perf_counter() - comeco:.2f}s)")
+        if args.repetir <= 0:
+            break
+        time.sleep(args.repetir * 60)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+# restaurante/producao.py - PORÇÕES POSSÍVEIS POR PRATO E PLANO DE PRODUÇÃO COM DISPUTA DE INGREDIENTES
+import threading
+
+import numpy as np
+import pandas as pd
+
+from restaurante import catalogo, metricas
+from restaurante.diario import obter_diario
+from restaurante.receitas import obter_receitas
+
+LIMITE_ULTIMAS = 5  # o cardápio avisa "últimas N unidades" a partir daqui
+MAXIMO_RODADAS = 100
+
+class Producao:
+    """Quanto dá para fazer com o estoque de agora.
+
+    `porcoes[i]` é o máximo do prato i se só ele fosse produzido: min(estoque // quantidade)
+    sobre a receita (inf para prato sem receita). Como pratos disputam ingredientes (a carne
+    de todos os hambúrgueres), a soma dessas porções não é alcançável; `planejar` reparte o
+    estoque conforme a participação esperada de cada prato na demanda.
+    """
+
+    def __init__(self, receitas, ingredientes):
+        self.receitas = receitas
+        self.ingredientes = ingredientes
+        self.estoque = receitas.por_ingrediente(ingredientes, 'estoque', 0.0)
+        self.porcoes = self._possiveis(self.estoque)
+        self._planos = {}
+        self._lock = threading.Lock()
+
+    def _possiveis(self, estoque):
+        r = self.receitas
+        return r.minimo_por_prato(np.floor(np.maximum(estoque[r.colunas], 0) / r.quantidades))
+
+    def porcoes_do_prato(self, nome):
+        """Porções possíveis do prato; None se ele não tem receita (ou não existe)"""
+        i = self.receitas.posicao.get(nome)
+        if i is None or not np.isfinite(self.porcoes[i]):
+            return None
+        return int(self.porcoes[i])
+
+    def planejar(self, participacoes):
+        """Porções de cada prato repartindo o estoque pela participação na demanda (vetor por prato).
+
+        Enchimento progressivo: a cada rodada, os pratos ainda possíveis crescem juntos na
+        proporção da participação e cada um para quando acaba o seu ingrediente mais disputado
+        (nenhum ingrediente passa do estoque, porque todos os pratos que o usam param antes
+        de esgotá-lo); a sobra é repartida nas rodadas seguintes. Quando a proporção já não
+        rende uma porção inteira, uma passada gulosa dá mais uma porção a cada prato que ainda
+        couber, do mais atrasado em relação à sua participação para o menos. Pratos sem
+        receita ficam com NaN (não dependem do estoque).
+        """
+        r = self.receitas
+        pesos = np.where(r.com_receita, np.asarray(participacoes, dtype=float), 0.0)
+        chave = pesos.tobytes()
+        with self._lock:
+            if chave in self._planos:
+                return self._planos[chave]
+
+        plano = np.zeros(len(r.pratos))
+        restante = self.estoque.copy()
+        ativos = (pesos > 0) & (self.porcoes >= 1)
+        for _ in range(MAXIMO_RODADAS):
+            if not ativos.any():
+                break
+            ativos_pesos = np.where(ativos, pesos, 0.0)
+            demanda = r.consumo(ativos_pesos)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                folga = np.where(demanda > 0, restante / demanda, np.inf)
+            nivel = np.where(ativos, r.minimo_por_prato(folga[r.colunas], sem_receita=0.0), 0.0)
+            novo = np.floor(nivel * ativos_pesos)
+            if novo.any():
+                plano += novo
+                restante -= r.consumo(novo)
+            elif not self._passada_gulosa(plano, restante, ativos, ativos_pesos):
+                break
+            ativos &= self._possiveis(restante) >= 1
+        plano[~r.com_receita] = np.nan
+
+        with self._lock:
+            self._planos[chave] = plano
+        return plano
+
+    def _passada_gulosa(self, plano, restante, ativos, pesos):
+        """Uma porção a mais para cada prato ativo que ainda couber, do mais atrasado ao menos"""
+        r = self.receitas
+        candidatos = np.flatnonzero(ativos)
+        ordem = candidatos[np.argsort(-(pesos[candidatos] / (plano[candidatos] + 1)), kind="stable")]
+        fins = r.inicios + np.bincount(r.linhas, minlength=len(r.pratos))
+        colunas, quantidades, sobra = r.colunas.tolist(), r.quantidades.tolist(), restante.tolist()
+        avancou = False
+        for i in ordem.tolist():
+            entradas = range(r.inicios[i], fins[i])
+            if all(sobra[colunas[k]] >= quantidades[k] for k in entradas):
+                for k in entradas:
+                    sobra[colunas[k]] -= quantidades[k]
+                plano[i] += 1
+                avancou = True
+        restante[:] = sobra
+        return avancou
+
+    def tabela(self, participacoes):
+        """DataFrame com porções isoladas e o plano para a participação informada"""
+        plano = self.planejar(participacoes)
+        total = np.sum(participacoes)
+        return pd.DataFrame({
+            "prato": self.receitas.nomes,
+            "categoria": self.receitas.categorias,
+            "participação": np.asarray(participacoes, dtype=float) / total * 100 if total else 0.0,
+            "porções possíveis": np.where(np.isfinite(self.porcoes), self.porcoes, np.nan),
+            "plano": plano,
+        })
+
+def participacoes_iguais(receitas):
+    return np.ones(len(receitas.pratos))
+
+def _contar_pedidos(contagem, eventos):
+    """Soma em {prato: quantidade} os itens dos pedidos (estorno desconta um pedido que não chegou à cozinha)"""
+    for evento in eventos:
+        tipo = evento.get("tipo")
+        if tipo in ("pedido", "estorno"):
+            sinal = 1 if tipo == "pedido" else -1
+            for nome, quantidade in evento.get("itens", {}).items():
+                contagem[nome] = contagem.get(nome, 0) + sinal * quantidade
+    return contagem
+
+def _vetor(receitas, contagem):
+    return np.fromiter((contagem.get(nome, 0) for nome in receitas.nomes), dtype=float, count=len(receitas.nomes))
+
+def participacoes_do_historico(receitas, diario):
+    """Participação de cada prato nos pedidos registrados no diário (histórico arquivado + atual)"""
+    return _vetor(receitas, _contar_pedidos({}, diario.eventos()))
+
+# =============== PRODUÇÃO DO PROCESSO ===============
+_lock = threading.Lock()
+_atual = None
+# Participações do histórico: contagem por prato acompanhada a partir do último ponto lido do
+# diário (cada chamada lê só os eventos novos). Trava própria: a leitura do diário nunca segura
+# _lock, que as reruns do cardápio usam em obter_producao.
+_lock_historico = threading.Lock()
+_historico = None  # (diário, cursor, {prato: quantidade})
+_participacoes = None  # (receitas, diário, cursor, vetor)
+
+def obter_producao():
+    """Porções do estoque atual; recalculadas só quando o estoque (ou o catálogo) muda de versão"""
+    global _atual
+    receitas = obter_receitas()
+    ingredientes = catalogo.carregar_ingredientes()
+    producao = _atual
+    if producao is not None and producao.receitas is receitas and producao.ingredientes is ingredientes:
+        return producao
+    with _lock, metricas.span("producao.porcoes"):
+        if _atual is None or _atual.receitas is not receitas or _atual.ingredientes is not ingredientes:
+            _atual = Producao(receitas, ingredientes)
+        return _atual
+
+def participacoes_registradas():
+    """Participações pelo histórico do diário (None se desligado); lê só os eventos novos"""
+    global _historico, _participacoes
+    diario = obter_diario()
+    if diario is None:
+        return None
+    receitas = obter_receitas()
+    with _lock_historico:
+        if _historico is None or _historico[0] is not diario:
+            _historico = (diario, (0, 0), {})
+        _, cursor, contagem = _historico
+        eventos, cursor = diario.eventos_desde(cursor)
+        _historico = (diario, cursor, _contar_pedidos(contagem, eventos))
+        if _participacoes is None or _participacoes[:3] != (receitas, diario, cursor):
+            _participacoes = (receitas, diario, cursor, _vetor(receitas, contagem))
+        return _participacoes[3]
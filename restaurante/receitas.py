@@ -0,0 +1,77 @@
+# restaurante/receitas.py - MATRIZ DE RECEITAS (PRATOS × INGREDIENTES) NO NUMPY
+import threading
+
+import numpy as np
+
+from restaurante import catalogo, metricas
+
+class MatrizReceitas:
+    """Receitas como matriz esparsa pratos × ingredientes, guardada em três vetores (linha,
+    coluna, quantidade). As linhas de cada prato ficam contíguas, na ordem do catálogo.
+
+    Ingrediente da receita que não existe mais no catálogo vai para uma coluna extra (a última),
+    para a qual os vetores por ingrediente recebem um valor padrão (custo NaN, estoque 0...).
+    """
+
+    def __init__(self, pratos, ingredientes):
+        self.pratos = pratos
+        self.ingredientes = ingredientes
+        self.coluna = {ing['nome']: j for j, ing in enumerate(ingredientes)}
+        self.desconhecido = len(ingredientes)
+        self.posicao = {prato['nome']: i for i, prato in enumerate(pratos)}
+
+        por_prato = [prato.get('ingredientes', ()) for prato in pratos]
+        tamanhos = np.fromiter((len(receita) for receita in por_prato), dtype=np.intp, count=len(pratos))
+        self.linhas = np.repeat(np.arange(len(pratos)), tamanhos)
+        self.inicios = np.concatenate(([0], np.cumsum(tamanhos)[:-1])) if len(pratos) else np.zeros(0, np.intp)
+        self.com_receita = tamanhos > 0
+        self.colunas = np.fromiter((self.coluna.get(ing['nome'], self.desconhecido) for receita in por_prato for ing in receita),
+                                   dtype=np.intp, count=len(self.linhas))
+        self.quantidades = np.fromiter((ing['quantidade'] for receita in por_prato for ing in receita),
+                                       dtype=float, count=len(self.linhas))
+        self.nomes = [prato['nome'] for prato in pratos]
+        self.categorias = [prato['cat'] for prato in pratos]
+        self.precos = np.fromiter((prato['preco'] for prato in pratos), dtype=float, count=len(pratos))
+
+    def por_ingrediente(self, ingredientes, campo, padrao):
+        """Vetor (uma posição por coluna) com `campo` de cada ingrediente; ausentes ficam com `padrao`"""
+        vetor = np.full(self.desconhecido + 1, padrao, dtype=float)
+        for ing in ingredientes:
+            j = self.coluna.get(ing['nome'])
+            if j is not None and ing.get(campo) is not None:
+                vetor[j] = ing[campo]
+        return vetor
+
+    def somar_por_prato(self, valores):
+        """Soma um valor por entrada da matriz em cada prato (o produto matriz-vetor)"""
+        return np.bincount(self.linhas, weights=valores, minlength=len(self.pratos))
+
+    def consumo(self, porcoes):
+        """Quanto de cada ingrediente `porcoes` (uma por prato) gastam: transposta × vetor"""
+        return np.bincount(self.colunas, weights=self.quantidades * porcoes[self.linhas],
+                           minlength=self.desconhecido + 1)
+
+    def minimo_por_prato(self, valores, sem_receita=np.inf):
+        """Menor valor por entrada em cada prato; pratos sem receita recebem `sem_receita`"""
+        resultado = np.full(len(self.pratos), sem_receita, dtype=float)
+        if len(self.linhas):
+            resultado[self.com_receita] = np.minimum.reduceat(valores, self.inicios[self.com_receita])
+        return resultado
+
+# =============== MATRIZ DO PROCESSO ===============
+_lock = threading.Lock()
+_atual = None
+
+def obter_receitas():
+    """Matriz do catálogo atual; só é refeita quando pratos ou ingredientes mudam. Usa a tabela
+    de ingredientes sem o estoque do diário (que muda a cada pedido sem mudar as receitas)."""
+    global _atual
+    pratos = catalogo.carregar_pratos()
+    ingredientes = catalogo.ler_tabela("ingredientes")
+    matriz = _atual
+    if matriz is not None and matriz.pratos is pratos and matriz.ingredientes is ingredientes:
+        return matriz
+    with _lock, metricas.span("receitas.matriz"):
+        if _atual is None or _atual.pratos is not pratos or _atual.ingredientes is not ingredientes:
+            _atual = MatrizReceitas(pratos, ingredientes)
+        return _atual
@@ -0,0 +1,126 @@
+# restaurante/snapshot.py - SNAPSHOT BINÁRIO DO CATÁLOGO (VALIDADO NA GERAÇÃO, LIDO VIA MMAP)
+import hashlib
+import marshal
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import zlib
+
+# Um arquivo por tabela, ao lado do JSON (.pratos.snap). Cabeçalho:
+#   mágica | formato | versão do marshal | Python (maior, menor) | resumo da assinatura do JSON | tamanho | crc32
+# O corpo é o marshal dos dados. O marshal muda entre versões do Python: com outra versão, outro
+# formato, assinatura diferente (JSON alterado) ou crc errado o snapshot é ignorado e regerado do JSON.
+MAGICA = b"BURGSNAP"
+FORMATO = 2  # muda junto com o ESQUEMA: snapshots validados pelo esquema antigo são regerados
+_CABECALHO = struct.Struct("<8sHHBB16sQI")
+
+class CatalogoInvalido(ValueError):
+    """Arquivo do catálogo corrompido ou fora do esquema (a mensagem diz onde e o quê)"""
+
+# =============== VALIDAÇÃO (SÓ NA GERAÇÃO DO SNAPSHOT) ===============
+NUMERO = (int, float)
+
+# tabela -> campo -> (tipos aceitos, obrigatório). Obrigatório é o que as páginas leem sem .get
+# (o admin lista e filtra ingredientes por categoria, unidade e mínimo; o app testa ativo/quantidade)
+ESQUEMA = {
+    "pratos": {"nome": (str, True), "preco": (NUMERO, True), "cat": (str, True), "img": (str, False),
+               "ingredientes": (list, False)},
+    "ingredientes": {"nome": (str, True), "estoque": (NUMERO, True), "minimo": (NUMERO, True),
+                     "unidade": (str, True), "categoria": (str, True), "custo": (NUMERO, False)},
+    "estoque": {"quantidade": (NUMERO, True), "minimo": (NUMERO, False), "ativo": (bool, True)},
+}
+MAXIMO_PROBLEMAS = 5  # problemas listados na mensagem de erro
+
+def _tipo_errado(valor, tipos):
+    # bool é int em Python, mas true/false no lugar de um número é erro de digitação no JSON
+    return not isinstance(valor, tipos) or (isinstance(valor, bool) and tipos is NUMERO)
+
+def _problemas_registro(tabela, registro):
+    if not isinstance(registro, dict):
+        return [f"deve ser um objeto (recebido {type(registro).__name__})"]
+    problemas = []
+    for campo, (tipos, obrigatorio) in ESQUEMA[tabela].items():
+        if campo not in registro:
+            if obrigatorio:
+                problemas.append(f"falta o campo '{campo}'")
+        elif _tipo_errado(registro[campo], tipos):
+            problemas.append(f"campo '{campo}' com tipo {type(registro[campo]).__name__}")
+        elif campo in ("preco", "custo") and registro[campo] < 0:
+            problemas.append(f"campo '{campo}' negativo")
+    if tabela == "pratos":
+        for ing in registro.get("ingredientes") or []:
+            if not isinstance(ing, dict) or not isinstance(ing.get("nome"), str) \
+                    or _tipo_errado(ing.get("quantidade"), NUMERO) or ing["quantidade"] < 0:
+                problemas.append(f"ingrediente da receita inválido: {ing!r}")
+    return problemas
+
+def validar(tabela, dados, arquivo):
+    """Levanta CatalogoInvalido se os dados não seguem o esquema da tabela"""
+    nome_arquivo = os.path.basename(arquivo)
+    esperado = dict if tabela == "estoque" else list
+    if not isinstance(dados, esperado):
+        raise CatalogoInvalido(f"{nome_arquivo}: esperado {'um objeto' if esperado is dict else 'uma lista'} "
+                               f"no topo do arquivo, recebido {type(dados).__name__}")
+    problemas = []
+    if esperado is dict:
+        for nome, registro in dados.items():
+            problemas += [f"'{nome}': {p}" for p in _problemas_registro(tabela, registro)]
+    else:
+        vistos = set()
+        for posicao, registro in enumerate(dados, 1):
+            nome = registro.get("nome") if isinstance(registro, dict) else None
+            rotulo = f"registro {posicao}" + (f" ('{nome}')" if isinstance(nome, str) else "")
+            problemas += [f"{rotulo}: {p}" for p in _problemas_registro(tabela, registro)]
+            if isinstance(nome, str):
+                if nome in vistos:
+                    problemas.append(f"{rotulo}: nome repetido")
+                vistos.add(nome)
+    if problemas:
+        extras = len(problemas) - MAXIMO_PROBLEMAS
+        raise CatalogoInvalido(f"{nome_arquivo}: " + "; ".join(problemas[:MAXIMO_PROBLEMAS])
+                               + (f" (e mais {extras})" if extras > 0 else ""))
+
+# =============== LEITURA E GRAVAÇÃO ===============
+def _resumo(assinatura):
+    return hashlib.blake2b(repr(assinatura).encode("utf-8"), digest_size=16).digest()
+
+def ler(caminho, assinatura):
+    """Dados do snapshot se ele foi gerado a partir do arquivo com esta assinatura; senão None"""
+    try:
+        with open(caminho, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            if len(mapa) < _CABECALHO.size:
+                return None
+            magica, formato, versao_marshal, maior, menor, resumo, tamanho, crc = _CABECALHO.unpack_from(mapa)
+            if (magica, formato, versao_marshal, (maior, menor)) != (MAGICA, FORMATO, marshal.version, sys.version_info[:2]) \
+                    or resumo != _resumo(assinatura) or _CABECALHO.size + tamanho != len(mapa):
+                return None
+            with memoryview(mapa)[_CABECALHO.size:] as corpo:
+                if zlib.crc32(corpo) != crc:
+                    return None
+                return marshal.loads(corpo)
+    except (OSError, ValueError, EOFError, TypeError):  # ausente, vazio ou truncado: regera
+        return None
+
+def gravar(caminho, assinatura, dados):
+    """Grava o snapshot atomicamente; é só um cache do JSON, então falha de escrita é ignorada"""
+    corpo = marshal.dumps(dados)
+    cabecalho = _CABECALHO.pack(MAGICA, FORMATO, marshal.version, *sys.version_info[:2],
+                                _resumo(assinatura), len(corpo), zlib.crc32(corpo))
+    pasta = os.path.dirname(caminho)
+    try:
+        fd, temporario = tempfile.mkstemp(dir=pasta, prefix=".snapshot.", suffix=".tmp")
+    except OSError:
+        return False
+    try:
+        os.chmod(temporario, 0o644)
+        with os.fdopen(fd, "wb") as f:
+            f.write(cabecalho)
+            f.write(corpo)
+        os.replace(temporario, caminho)
+        return True
+    except OSError:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        return False
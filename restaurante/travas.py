@@ -0,0 +1,38 @@
+# restaurante/travas.py - TRAVA DE ARQUIVO ENTRE PROCESSOS (FLOCK)
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava entre processos; fica só a trava entre threads de quem chama
+    fcntl = None
+
+@contextmanager
+def exclusiva(arquivo):
+    """Trava exclusiva no arquivo já aberto enquanto o bloco roda"""
+    if fcntl is None:
+        yield
+        return
+    fcntl.flock(arquivo, fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(arquivo, fcntl.LOCK_UN)
+
+@contextmanager
+def exclusiva_em(caminho):
+    """Abre (criando, se preciso) o arquivo de trava e segura a trava exclusiva nele"""
+    if fcntl is None:
+        yield
+        return
+    with open(caminho, "a") as arquivo, exclusiva(arquivo):
+        yield
+
+def tentar(arquivo):
+    """Trava exclusiva sem esperar; True se conseguiu (sem flock, sempre True)"""
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(arquivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
@@ -0,0 +1,91 @@
+# restaurante/versoes.py - VERSÃO DO CATÁLOGO COMPARTILHADA ENTRE PROCESSOS (ARQUIVO MAPEADO EM MEMÓRIA)
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+from restaurante import travas
+
+# Segundos entre conferências das assinaturas reais (alterações feitas por fora do app)
+INTERVALO = float(os.environ.get("BURGER_VERIFICACAO", "1") or 0)
+
+# Por tabela, 16 bytes: contador de versão + hash da assinatura do dado publicado
+_REGISTRO = struct.Struct("<QQ")
+
+def _hash(assinatura):
+    return int.from_bytes(hashlib.blake2b(repr(assinatura).encode("utf-8"), digest_size=8).digest(), "little")
+
+class VersoesCompartilhadas:
+    """Contador de versão por tabela num arquivo pequeno mapeado em memória por todos os processos
+    que usam a mesma pasta de dados (réplicas atrás de um balanceador).
+
+    - Quem grava pelo app (transação) incrementa o contador das tabelas alteradas logo depois do
+      commit, junto com a assinatura do que gravou: os outros processos veem a mudança na
+      próxima leitura, sem esperar.
+    - Ler a versão é uma leitura de memória (sem stat/SELECT a cada acesso ao catálogo).
+    - Alteração feita por fora do app (arquivo editado à mão, outra ferramenta) é detectada na
+      leitura: no máximo a cada `intervalo` segundos o processo compara a assinatura real de
+      cada tabela com a publicada e publica a diferença (para todos os processos).
+    """
+
+    def __init__(self, caminho, tabelas, intervalo=None):
+        self.caminho = caminho
+        self.intervalo = INTERVALO if intervalo is None else intervalo
+        self._proxima_verificacao = 0.0
+        self.posicoes = {tabela: i * _REGISTRO.size for i, tabela in enumerate(tabelas)}
+        tamanho = len(self.posicoes) * _REGISTRO.size
+        self._lock = threading.Lock()
+        with open(caminho, "a+b") as f:
+            with self._trava(f):
+                if os.fstat(f.fileno()).st_size < tamanho:
+                    f.truncate(tamanho)
+            self._mapa = mmap.mmap(f.fileno(), tamanho)
+
+    @contextmanager
+    def _trava(self, arquivo=None):
+        with self._lock, (travas.exclusiva(arquivo) if arquivo is not None else travas.exclusiva_em(self.caminho)):
+            yield
+
+    def versao(self, tabela, assinatura):
+        """Contador atual da tabela; `assinatura(tabela)` só é chamada nas conferências periódicas"""
+        agora = time.monotonic()
+        if agora >= self._proxima_verificacao:
+            self._proxima_verificacao = agora + self.intervalo
+            self.verificar(assinatura)
+        return _REGISTRO.unpack_from(self._mapa, self.posicoes[tabela])[0]
+
+    def publicar(self, tabelas, assinatura):
+        """Nova versão das tabelas alteradas; `assinatura(tabela)` é a do dado já gravado"""
+        with self._trava():
+            for tabela in tabelas:
+                posicao = self.posicoes[tabela]
+                contador, _ = _REGISTRO.unpack_from(self._mapa, posicao)
+                _REGISTRO.pack_into(self._mapa, posicao, contador + 1, _hash(assinatura(tabela)))
+
+    def verificar(self, assinatura):
+        """Publica as tabelas cuja assinatura real difere da publicada; devolve quais mudaram"""
+        suspeitas = [t for t, posicao in self.posicoes.items()
+                     if _REGISTRO.unpack_from(self._mapa, posicao)[1] != _hash(assinatura(t))]
+        if not suspeitas:
+            return []
+        mudaram = []
+        with self._trava():
+            # Confere de novo sob a trava: outro processo pode ter publicado enquanto isso
+            for tabela in suspeitas:
+                posicao = self.posicoes[tabela]
+                contador, publicado = _REGISTRO.unpack_from(self._mapa, posicao)
+                atual = _hash(assinatura(tabela))
+                if publicado != atual:
+                    _REGISTRO.pack_into(self._mapa, posicao, contador + 1, atual)
+                    mudaram.append(tabela)
+        return mudaram
+
+def abrir(caminho, tabelas):
+    """Abre (ou cria) o arquivo de versões; None se a pasta não permite (somente leitura...)"""
+    try:
+        return VersoesCompartilhadas(caminho, tabelas)
+    except (OSError, ValueError):
+        return None